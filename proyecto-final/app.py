@@ -1,16 +1,107 @@
 from flask import Flask, jsonify, request, make_response
-from db_connect import get_connection
+from db_connect import (get_connection, obtener_conexion_pool, obtener_estadisticas_pool, registrar_conexion_peticion,
+                        despues_de_confirmar, punto_de_guardado)
 from flask_cors import CORS
-from datetime import datetime
+from datetime import datetime, timedelta
 import hashlib
-from models import (GestorContenido, GestorMateriales, Curso, Modulo, Leccion, Recurso,
+import threading
+import time
+from models import (GestorContenido, GestorMateriales, Curso, Modulo, Leccion, Recurso, ArbolDecision,
                    GestorProfesor, GestorCursosProfesor, GestorEvaluacionesProfesor, 
                    GestorEstudiantesProfesor, Profesor, Evaluacion, ResultadoEvaluacion, Matricula)
+from config_profesor import CARGA_ESTRUCTURA_CONFIG, BUSQUEDA_CONFIG, REGLAS_CONFIG, CARACTERISTICAS_CONFIG, COLA_PROGRESO_CONFIG
+from caracteristicas_estudiante import AlmacenCaracteristicas
+from cache_evaluaciones import CacheClavesRespuestas, CacheExamenes, CacheExamenesEstudiante
+from progreso_curso import (CacheTotalesCurso, ColaProgreso, aplicar_evento_progreso,
+                            calcular_progreso, curso_de, deltas_intento_evaluacion, marcar_leccion,
+                            reconciliar_progreso)
+from consultas_progreso import (estadisticas_evaluaciones_profesor, evaluaciones_curso_con_resultados,
+                                progreso_detallado_estudiante, progreso_modulos_estudiante)
+from recomendacion_lote import recomendar_curso, resumir
+from reglas_recomendacion import consultar_reglas, version_reglas
 
 app = Flask(__name__)
 CORS(app)  # Habilita CORS globalmente para todas las rutas y orígenes
 
 gestor_contenido = GestorContenido()
+gestor_materiales = GestorMateriales(gestor_contenido)
+almacen_caracteristicas = AlmacenCaracteristicas(CARACTERISTICAS_CONFIG['cache_max_edad'])
+claves_respuestas = CacheClavesRespuestas()
+examenes = CacheExamenes()
+examenes_estudiante = CacheExamenesEstudiante(examenes)
+totales_curso = CacheTotalesCurso()
+
+def invalidar_evaluacion(evaluacion_id):
+    """Descarta la clave de respuestas y los exámenes en caché de la evaluación cuando se confirme su edición"""
+    def invalidar():
+        claves_respuestas.invalidar(evaluacion_id)
+        examenes.invalidar(evaluacion_id)
+        examenes_estudiante.invalidar(evaluacion_id)
+    despues_de_confirmar(invalidar)
+
+def estructura_curso_modificada(curso_id):
+    """Cuando se confirme la edición de la estructura del curso descarta sus totales en caché
+    y encola el recálculo del progreso de sus matrículas"""
+    def recalcular():
+        totales_curso.invalidar(curso_id)
+        cola_progreso.encolar(None, curso_id)
+    despues_de_confirmar(recalcular)
+
+def refrescar_caracteristicas(estudiante_id):
+    """Encola el refresco de las características del estudiante una vez confirmada su actividad"""
+    despues_de_confirmar(lambda: cola_progreso.encolar(estudiante_id, None))
+
+def procesar_progreso(estudiante_id, curso_id):
+    """Trabajo de la cola de progreso
+
+    Con estudiante refresca sus características; con solo el curso recalcula el progreso de todas
+    sus matrículas tras un cambio de estructura. Usa una conexión propia del pool y la confirma:
+    en modo síncrono corre cuando la conexión de la petición ya se confirmó.
+    """
+    conn = obtener_conexion_pool()
+    if not conn:
+        raise ConnectionError('No se pudo conectar a la base de datos')
+    try:
+        if estudiante_id is not None:
+            actualizar_caracteristicas(conn, estudiante_id)
+        else:
+            reconciliar_progreso(conn, totales_curso, curso_id)
+        conn.commit()
+    finally:
+        conn.close()
+
+cola_progreso = ColaProgreso(procesar_progreso, hilos=COLA_PROGRESO_CONFIG['hilos'],
+                             sincrono=COLA_PROGRESO_CONFIG['modo'] == 'sincrono')
+
+# Estado de la carga inicial de la estructura (ver cargar_estructura_desde_bd)
+FASES_CARGA = ['cursos', 'modulos', 'lecciones', 'evaluaciones', 'recursos', 'armado']
+estado_carga = {
+    'estado': 'pendiente',
+    'fase': None,
+    'progreso': 0,
+    'total_cursos': 0,
+    'desde_snapshot': False,
+    'error': None,
+    'inicio': None,
+    'fin': None
+}
+estructura_lista = threading.Event()
+_reintento_carga = threading.Lock()
+
+def esperar_estructura():
+    """Espera a que la estructura esté cargada; devuelve una respuesta 503 si no lo está
+
+    Si la última carga falló se reintenta en lugar de servir un árbol vacío.
+    """
+    if estado_carga['estado'] == 'error':
+        reintentar_carga_estructura()
+    if estructura_lista.wait(CARGA_ESTRUCTURA_CONFIG['timeout_espera']) and estado_carga['estado'] == 'lista':
+        return None
+    return jsonify({
+        'error': ('No se pudo cargar la estructura de contenido' if estado_carga['estado'] == 'error'
+                  else 'La estructura de contenido aún se está cargando'),
+        'carga': estado_carga
+    }), 503
 
 @app.after_request
 def after_request(response):
@@ -24,6 +115,9 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Credentials', 'true')
     return response
 
+# Una sola conexión y transacción por petición, compartida por todos los helpers
+registrar_conexion_peticion(app)
+
 # ...existing code...
 
 # Endpoint para agregar preguntas a una evaluación
@@ -86,6 +180,7 @@ def agregar_pregunta_evaluacion(evaluacion_id):
                     print(f"DEBUG: Opción {i+1} creada: {opcion} (correcta: {es_correcta})")
             
             conn.commit()
+            invalidar_evaluacion(evaluacion_id)
             print(f"DEBUG: Transacción completada exitosamente")
             
             return jsonify({
@@ -104,36 +199,25 @@ def agregar_pregunta_evaluacion(evaluacion_id):
         print(f"ERROR general: {str(e)}")
         return jsonify({'error': f'Error general: {str(e)}'}), 500
 
-# Endpoint para obtener preguntas de una evaluación
+# Endpoint para obtener las preguntas de una evaluación (vista del estudiante)
 @app.route('/api/evaluaciones/<int:evaluacion_id>/preguntas', methods=['GET'])
 def obtener_preguntas_evaluacion(evaluacion_id):
+    """Preguntas y opciones sin las respuestas correctas, ya serializadas y con ETag
+
+    Si el cliente envía el mismo ETag en If-None-Match se responde 304 sin cuerpo.
+    """
     conn = get_connection()
     if not conn:
         return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
     
     try:
-        cursor = conn.cursor(dictionary=True)
-        
-        # Obtener preguntas
-        cursor.execute('''
-            SELECT id, texto, tipo, orden, fecha_creacion
-            FROM preguntas 
-            WHERE id_evaluacion = %s 
-            ORDER BY orden
-        ''', (evaluacion_id,))
-        preguntas = cursor.fetchall()
-        
-        # Para cada pregunta, obtener sus opciones
-        for pregunta in preguntas:
-            cursor.execute('''
-                SELECT id, texto, es_correcta, orden
-                FROM opciones 
-                WHERE id_pregunta = %s 
-                ORDER BY orden
-            ''', (pregunta['id'],))
-            pregunta['opciones'] = cursor.fetchall()
-        
-        return jsonify(preguntas), 200
+        examen = examenes_estudiante.obtener(conn, evaluacion_id)
+        respuesta = app.response_class(examen['contenido'], mimetype='application/json')
+        respuesta.set_etag(examen['etag'])
+        # El navegador guarda el examen pero lo revalida en cada visita
+        respuesta.cache_control.private = True
+        respuesta.cache_control.no_cache = True
+        return respuesta.make_conditional(request)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -150,6 +234,11 @@ def eliminar_pregunta(pregunta_id):
     try:
         cursor = conn.cursor()
         
+        cursor.execute('SELECT id_evaluacion FROM preguntas WHERE id = %s', (pregunta_id,))
+        pregunta = cursor.fetchone()
+        if not pregunta:
+            return jsonify({'error': 'Pregunta no encontrada'}), 404
+        
         # Eliminar la pregunta (las opciones se eliminan automáticamente por CASCADE)
         cursor.execute('DELETE FROM preguntas WHERE id = %s', (pregunta_id,))
         
@@ -157,6 +246,7 @@ def eliminar_pregunta(pregunta_id):
             return jsonify({'error': 'Pregunta no encontrada'}), 404
         
         conn.commit()
+        invalidar_evaluacion(pregunta[0])
         return jsonify({'message': 'Pregunta eliminada exitosamente'}), 200
         
     except Exception as e:
@@ -183,8 +273,9 @@ def agregar_opcion_pregunta(pregunta_id):
         cursor = conn.cursor()
         
         # Verificar que la pregunta existe
-        cursor.execute('SELECT id FROM preguntas WHERE id = %s', (pregunta_id,))
-        if not cursor.fetchone():
+        cursor.execute('SELECT id, id_evaluacion FROM preguntas WHERE id = %s', (pregunta_id,))
+        pregunta = cursor.fetchone()
+        if not pregunta:
             return jsonify({'error': 'La pregunta especificada no existe'}), 404
         
         # Insertar la opción
@@ -195,6 +286,7 @@ def agregar_opcion_pregunta(pregunta_id):
         
         opcion_id = cursor.lastrowid
         conn.commit()
+        invalidar_evaluacion(pregunta[1])
         
         return jsonify({
             'message': 'Opción agregada exitosamente',
@@ -283,6 +375,19 @@ def diagnosticar_tablas():
     finally:
         conn.close()
 
+# Endpoint de diagnóstico con las estadísticas del pool de conexiones
+@app.route('/api/diagnostico/pool', methods=['GET'])
+def diagnosticar_pool():
+    return jsonify(obtener_estadisticas_pool()), 200
+
+# Endpoint de diagnóstico con el estado de la cola de progreso
+@app.route('/api/diagnostico/cola-progreso', methods=['GET'])
+def diagnosticar_cola_progreso():
+    """Estado de la cola de trabajos de progreso; con ?esperar=<segundos> antes la vacía"""
+    esperar = request.args.get('esperar', type=float)
+    vacia = cola_progreso.esperar(esperar) if esperar is not None else None
+    return jsonify({'vacia': vacia, **cola_progreso.estadisticas()})
+
 # Endpoint para obtener evaluaciones de una lección
 @app.route('/api/lecciones/<int:leccion_id>/evaluaciones', methods=['GET'])
 def obtener_evaluaciones_leccion(leccion_id):
@@ -326,13 +431,7 @@ def responder_evaluacion(evaluacion_id):
         cursor = conn.cursor(dictionary=True)
         
         # Obtener información de la evaluación
-        cursor.execute('''
-            SELECT e.*, COUNT(p.id) as total_preguntas
-            FROM Evaluaciones e
-            LEFT JOIN preguntas p ON e.ID_Evaluacion = p.id_evaluacion
-            WHERE e.ID_Evaluacion = %s
-            GROUP BY e.ID_Evaluacion
-        ''', (evaluacion_id,))
+        cursor.execute('SELECT * FROM Evaluaciones WHERE ID_Evaluacion = %s', (evaluacion_id,))
         
         evaluacion = cursor.fetchone()
         if not evaluacion:
@@ -340,37 +439,45 @@ def responder_evaluacion(evaluacion_id):
         
         # Validar máximo de intentos
         cursor.execute('''
-            SELECT COUNT(*) as intentos_realizados FROM Resultados_Evaluaciones WHERE ID_Estudiante = %s AND ID_Evaluacion = %s
+            SELECT COUNT(*) as intentos_realizados, MAX(Puntaje) as mejor_puntaje
+            FROM Resultados_Evaluaciones WHERE ID_Estudiante = %s AND ID_Evaluacion = %s
         ''', (estudiante_id, evaluacion_id))
-        intentos = cursor.fetchone()['intentos_realizados']
+        intentos_previos = cursor.fetchone()
+        intentos = intentos_previos['intentos_realizados']
         if intentos >= evaluacion['Max_intentos']:
             return jsonify({'error': 'Has alcanzado el máximo de intentos permitidos para esta evaluación.'}), 403
         
-        # Registrar respuestas y calcular puntaje
-        respuestas_correctas = 0
-        total_preguntas = 0
-        
+        # Una respuesta por pregunta (si se repite, vale la última)
+        elegidas = {}
         for r in respuestas:
             id_pregunta = r.get('id_pregunta')
             id_opcion = r.get('id_opcion')
             if not id_pregunta or not id_opcion:
                 continue
-            
-            # Registrar respuesta del estudiante
-            cursor.execute('''
+            try:
+                elegidas[int(id_pregunta)] = int(id_opcion)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'id_pregunta e id_opcion deben ser enteros'}), 400
+        
+        # Clave de respuestas de la evaluación (en caché); calificar no consulta opciones
+        clave = claves_respuestas.obtener(conn, evaluacion_id)['opciones']
+        invalidas = [{'id_pregunta': p, 'id_opcion': o} for p, o in elegidas.items()
+                     if clave.get(o, (None,))[0] != p]
+        if invalidas:
+            return jsonify({
+                'error': 'Hay opciones que no pertenecen a la pregunta o a la evaluación',
+                'respuestas_invalidas': invalidas
+            }), 400
+        
+        # Registrar todas las respuestas del estudiante en un solo INSERT de varias filas
+        if elegidas:
+            cursor.executemany('''
                 INSERT INTO respuestas_estudiantes (id_estudiante, id_pregunta, id_opcion, fecha_respuesta)
                 VALUES (%s, %s, %s, NOW())
-            ''', (estudiante_id, id_pregunta, id_opcion))
-            
-            # Verificar si la respuesta es correcta
-            cursor.execute('''
-                SELECT es_correcta FROM opciones WHERE id = %s
-            ''', (id_opcion,))
-            opcion = cursor.fetchone()
-            
-            if opcion and opcion['es_correcta']:
-                respuestas_correctas += 1
-            total_preguntas += 1
+            ''', [(estudiante_id, p, o) for p, o in elegidas.items()])
+        
+        respuestas_correctas = sum(1 for o in elegidas.values() if clave[o][1])
+        total_preguntas = len(elegidas)
         
         # Calcular puntaje
         puntaje = (respuestas_correctas / total_preguntas * 100) if total_preguntas > 0 else 0
@@ -383,85 +490,22 @@ def responder_evaluacion(evaluacion_id):
             VALUES (%s, %s, %s, %s)
         ''', (estudiante_id, evaluacion_id, puntaje, 0))
         
-        # Si la evaluación está asociada a una lección, marcar la lección como completada
+        # Contadores de progreso de la matrícula: intento de evaluación y, si la
+        # evaluación es de una lección, el cambio de estado de esa lección
+        deltas = deltas_intento_evaluacion(intentos, intentos_previos['mejor_puntaje'], puntaje,
+                                           evaluacion['Puntaje_aprobacion'])
         if evaluacion['ID_Leccion']:
-            cursor.execute('''
-                INSERT INTO Progreso_Lecciones 
-                (ID_Estudiante, ID_Leccion, Completado, Tiempo_dedicado, Fecha_inicio, Fecha_ultimo_acceso, Veces_accedido)
-                VALUES (%s, %s, %s, %s, NOW(), NOW(), 1)
-                ON DUPLICATE KEY UPDATE
-                Completado = VALUES(Completado),
-                Fecha_ultimo_acceso = NOW(),
-                Veces_accedido = Veces_accedido + 1
-            ''', (estudiante_id, evaluacion['ID_Leccion'], aprobado, 0))
+            for contador, valor in marcar_leccion(conn, estudiante_id, evaluacion['ID_Leccion'], aprobado).items():
+                deltas[contador] = deltas.get(contador, 0) + valor
+        curso_id = curso_de(conn, evaluacion['ID_Leccion'], evaluacion['ID_Modulo'])
+        if curso_id:
+            aplicar_evento_progreso(conn, estudiante_id, curso_id, totales_curso.obtener(conn, curso_id), **deltas)
         
+        # Respuestas, resultado y progreso se confirman juntos
         conn.commit()
         
-        # ... después de marcar la lección como completada
-        # Obtener el curso asociado a la evaluación
-        curso_id = None
-        if evaluacion['ID_Leccion']:
-            cursor.execute('''
-                SELECT m.ID_Curso FROM Lecciones l JOIN Modulos m ON l.ID_Modulo = m.ID_Modulo WHERE l.ID_Leccion = %s
-            ''', (evaluacion['ID_Leccion'],))
-            row = cursor.fetchone()
-            if row:
-                curso_id = row['ID_Curso']
-        elif evaluacion['ID_Modulo']:
-            cursor.execute('''
-                SELECT ID_Curso FROM Modulos WHERE ID_Modulo = %s
-            ''', (evaluacion['ID_Modulo'],))
-            row = cursor.fetchone()
-            if row:
-                curso_id = row['ID_Curso']
-        # Si se encontró el curso, calcular el progreso y actualizar Matriculas
-        if curso_id:
-            # Calcular progreso total del curso (misma lógica que /progreso)
-            # Obtener totales
-            cursor.execute('''
-                SELECT COUNT(DISTINCT m.ID_Modulo) as total_modulos,
-                       COUNT(DISTINCT l.ID_Leccion) as total_lecciones,
-                       COUNT(DISTINCT e.ID_Evaluacion) as total_evaluaciones
-                FROM Cursos c
-                LEFT JOIN Modulos m ON c.ID_Curso = m.ID_Curso
-                LEFT JOIN Lecciones l ON m.ID_Modulo = l.ID_Modulo
-                LEFT JOIN Evaluaciones e ON (l.ID_Leccion = e.ID_Leccion OR m.ID_Modulo = e.ID_Modulo)
-                WHERE c.ID_Curso = %s
-            ''', (curso_id,))
-            totales = cursor.fetchone()
-            total_modulos = totales['total_modulos'] or 0
-            total_lecciones = totales['total_lecciones'] or 0
-            total_evaluaciones = totales['total_evaluaciones'] or 0
-            # Obtener progreso del estudiante
-            cursor.execute('''
-                SELECT 
-                    COUNT(DISTINCT pl.ID_Leccion) as lecciones_completadas,
-                    COUNT(DISTINCT re.ID_Evaluacion) as evaluaciones_realizadas,
-                    COUNT(CASE WHEN re.Puntaje >= ev.Puntaje_aprobacion THEN 1 END) as evaluaciones_aprobadas,
-                    COUNT(DISTINCT CASE WHEN pl.Completado = 1 THEN m.ID_Modulo END) as modulos_con_progreso
-                FROM Matriculas mat
-                LEFT JOIN Modulos m ON mat.ID_Curso = m.ID_Curso
-                LEFT JOIN Lecciones l ON m.ID_Modulo = l.ID_Modulo
-                LEFT JOIN Progreso_Lecciones pl ON l.ID_Leccion = pl.ID_Leccion AND pl.ID_Estudiante = %s
-                LEFT JOIN Evaluaciones ev ON (l.ID_Leccion = ev.ID_Leccion OR m.ID_Modulo = ev.ID_Modulo)
-                LEFT JOIN Resultados_Evaluaciones re ON ev.ID_Evaluacion = re.ID_Evaluacion AND re.ID_Estudiante = %s
-                WHERE mat.ID_Curso = %s AND mat.ID_Estudiante = %s
-            ''', (estudiante_id, estudiante_id, curso_id, estudiante_id))
-            progreso_info = cursor.fetchone()
-            lecciones_completadas = progreso_info['lecciones_completadas'] or 0
-            evaluaciones_aprobadas = progreso_info['evaluaciones_aprobadas'] or 0
-            modulos_con_progreso = progreso_info['modulos_con_progreso'] or 0
-            # Calcular porcentajes
-            progreso_lecciones = (lecciones_completadas / total_lecciones * 100) if total_lecciones > 0 else 0
-            progreso_evaluaciones = (evaluaciones_aprobadas / total_evaluaciones * 100) if total_evaluaciones > 0 else 0
-            progreso_modulos = (modulos_con_progreso / total_modulos * 100) if total_modulos > 0 else 0
-            progreso_total = (progreso_lecciones * 0.4 + progreso_evaluaciones * 0.4 + progreso_modulos * 0.2)
-            progreso_total = min(progreso_total, 100)  # Limitar a 100
-            # Actualizar Matriculas
-            cursor.execute('''
-                UPDATE Matriculas SET Progreso_total = %s WHERE ID_Estudiante = %s AND ID_Curso = %s
-            ''', (progreso_total, estudiante_id, curso_id))
-            conn.commit()
+        # Las características se refrescan en segundo plano una vez confirmada la transacción
+        refrescar_caracteristicas(estudiante_id)
         
         return jsonify({
             'message': 'Evaluación completada correctamente',
@@ -495,12 +539,28 @@ def registrar_resultado_evaluacion():
         return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
     try:
         cursor = conn.cursor()
+        cursor.execute('''
+            SELECT e.ID_Leccion, e.ID_Modulo, e.Puntaje_aprobacion,
+                   COUNT(re.ID_Resultado) AS intentos, MAX(re.Puntaje) AS mejor_puntaje
+            FROM Evaluaciones e
+            LEFT JOIN Resultados_Evaluaciones re ON re.ID_Evaluacion = e.ID_Evaluacion AND re.ID_Estudiante = %s
+            WHERE e.ID_Evaluacion = %s
+            GROUP BY e.ID_Evaluacion
+        ''', (estudiante_id, evaluacion_id))
+        evaluacion = cursor.fetchone()
         cursor.execute('''
             INSERT INTO Resultados_Evaluaciones 
             (ID_Estudiante, ID_Evaluacion, Puntaje, Tiempo_utilizado)
             VALUES (%s, %s, %s, %s)
         ''', (estudiante_id, evaluacion_id, puntaje, tiempo_utilizado))
+        if evaluacion:
+            id_leccion, id_modulo, puntaje_aprobacion, intentos, mejor_puntaje = evaluacion
+            curso_id = curso_de(conn, id_leccion, id_modulo)
+            if curso_id:
+                aplicar_evento_progreso(conn, estudiante_id, curso_id, totales_curso.obtener(conn, curso_id),
+                                        **deltas_intento_evaluacion(intentos, mejor_puntaje, puntaje, puntaje_aprobacion))
         conn.commit()
+        refrescar_caracteristicas(estudiante_id)
         return jsonify({'message': 'Resultado registrado correctamente'}), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -570,12 +630,22 @@ def registrar_acceso_recurso():
             ''', (estudiante_id, recurso_id, tiempo_acceso))
         
         conn.commit()
+        refrescar_caracteristicas(estudiante_id)
         return jsonify({'message': 'Acceso registrado correctamente'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     finally:
         conn.close()
 
+def actualizar_caracteristicas(conn, estudiante_id):
+    """Recalcula el vector de recomendación del estudiante tras registrar actividad; un fallo no anula el registro"""
+    try:
+        with punto_de_guardado(conn):
+            almacen_caracteristicas.actualizar(conn, estudiante_id)
+    except Exception as e:
+        almacen_caracteristicas.invalidar(estudiante_id)
+        print(f'No se pudieron actualizar las características del estudiante {estudiante_id}: {e}')
+
 # Endpoint para obtener recomendaciones del estudiante
 @app.route('/api/estudiante/<int:estudiante_id>/recomendaciones', methods=['GET'])
 def get_recomendaciones_estudiante(estudiante_id):
@@ -617,19 +687,8 @@ def generar_recomendacion(estudiante_id):
             recomendacion = generar_recomendacion_por_puntaje(puntaje_evaluacion)
         else:
             # Obtener datos del estudiante para el árbol de decisión (lógica original)
-            cursor.execute('''
-                SELECT 
-                    AVG(re.Puntaje) as promedio_puntajes,
-                    COUNT(CASE WHEN re.Aprobado = 1 THEN 1 END) as evaluaciones_aprobadas,
-                    COUNT(re.ID_Resultado) as total_evaluaciones,
-                    AVG(m.Progreso_total) as promedio_progreso
-                FROM Estudiantes e
-                LEFT JOIN Resultados_Evaluaciones re ON e.ID_Estudiante = re.ID_Estudiante
-                LEFT JOIN Matriculas m ON e.ID_Estudiante = m.ID_Estudiante
-                WHERE e.ID_Estudiante = %s
-            ''', (estudiante_id,))
-            datos_estudiante = cursor.fetchone()
-            if not datos_estudiante or all(v is None for v in datos_estudiante.values()):
+            datos_estudiante = almacen_caracteristicas.obtener(conn, estudiante_id)
+            if not datos_estudiante:
                 return jsonify({'error': 'No hay datos suficientes para generar recomendación'}), 400
             # Lógica simplificada del árbol de decisión
             recomendacion = generar_arbol_decision(datos_estudiante)
@@ -883,6 +942,11 @@ def login():
 def ping():
     return jsonify({'message': 'pong'})
 
+@app.route('/api/listo')
+def listo():
+    """Readiness: 200 solo cuando la estructura de contenido se cargó sin errores"""
+    return jsonify(estado_carga), 200 if estado_carga['estado'] == 'lista' else 503
+
 @app.route('/api/usuarios', methods=['GET'])
 def get_usuarios():
     conn = get_connection()
@@ -936,13 +1000,14 @@ def crear_material():
     if not all([leccion_id, nombre, tipo, url]):
         return jsonify({'error': 'Faltan datos obligatorios'}), 400
     
-    # Crear recurso usando el gestor de materiales
-    recurso = gestor_materiales.crear_recurso(leccion_id, nombre, tipo, url, orden, duracion)
+    no_lista = esperar_estructura()
+    if no_lista:
+        return no_lista
     
-    if not recurso:
+    if not gestor_contenido.obtener_leccion(leccion_id):
         return jsonify({'error': 'No se pudo crear el material'}), 400
     
-    # Persistir en base de datos
+    # Persistir en base de datos; el ID del recurso lo asigna la BD
     conn = get_connection()
     if not conn:
         return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
@@ -953,8 +1018,12 @@ def crear_material():
             INSERT INTO Recursos (ID_Leccion, Nombre, Tipo, URL, Orden, Duracion)
             VALUES (%s, %s, %s, %s, %s, %s)
         ''', (leccion_id, nombre, tipo, url, orden, duracion))
+        recurso = Recurso(cursor.lastrowid, nombre, tipo, url, orden, duracion)
         conn.commit()
         
+        # Registrar el recurso en el gestor de materiales una vez confirmada la transacción
+        despues_de_confirmar(lambda: gestor_materiales.registrar_recurso(leccion_id, recurso))
+        
         return jsonify({
             'message': 'Material creado exitosamente',
             'material': recurso.to_dict()
@@ -976,10 +1045,11 @@ def actualizar_material(recurso_id):
     if not any([nombre, url, orden is not None]):
         return jsonify({'error': 'Debe proporcionar al menos un campo para actualizar'}), 400
     
-    # Actualizar usando el gestor de materiales
-    actualizado = gestor_materiales.actualizar_recurso(recurso_id, nombre, url, orden)
+    no_lista = esperar_estructura()
+    if no_lista:
+        return no_lista
     
-    if not actualizado:
+    if not gestor_materiales.obtener_recurso(recurso_id):
         return jsonify({'error': 'Material no encontrado'}), 404
     
     # Persistir cambios en base de datos
@@ -1007,6 +1077,9 @@ def actualizar_material(recurso_id):
         cursor.execute(query, params)
         conn.commit()
         
+        # Actualizar el gestor de materiales una vez confirmada la transacción
+        despues_de_confirmar(lambda: gestor_materiales.actualizar_recurso(recurso_id, nombre, url, orden))
+        
         return jsonify({'message': 'Material actualizado exitosamente'}), 200
         
     except Exception as e:
@@ -1017,10 +1090,11 @@ def actualizar_material(recurso_id):
 @app.route('/api/materiales/<int:recurso_id>', methods=['DELETE'])
 def eliminar_material(recurso_id):
     """Elimina un material"""
-    # Eliminar usando el gestor de materiales
-    eliminado = gestor_materiales.eliminar_recurso(recurso_id)
+    no_lista = esperar_estructura()
+    if no_lista:
+        return no_lista
     
-    if not eliminado:
+    if not gestor_materiales.obtener_recurso(recurso_id):
         return jsonify({'error': 'Material no encontrado'}), 404
     
     # Persistir eliminación en base de datos
@@ -1033,6 +1107,9 @@ def eliminar_material(recurso_id):
         cursor.execute('DELETE FROM Recursos WHERE ID_Recurso = %s', (recurso_id,))
         conn.commit()
         
+        # Eliminar del gestor de materiales una vez confirmada la transacción
+        despues_de_confirmar(lambda: gestor_materiales.eliminar_recurso(recurso_id))
+        
         return jsonify({'message': 'Material eliminado exitosamente'}), 200
         
     except Exception as e:
@@ -1043,6 +1120,10 @@ def eliminar_material(recurso_id):
 @app.route('/api/materiales/<int:recurso_id>', methods=['GET'])
 def obtener_material(recurso_id):
     """Obtiene un material específico"""
+    no_lista = esperar_estructura()
+    if no_lista:
+        return no_lista
+    
     recurso = gestor_materiales.obtener_recurso(recurso_id)
     
     if not recurso:
@@ -1053,6 +1134,10 @@ def obtener_material(recurso_id):
 @app.route('/api/lecciones/<int:leccion_id>/materiales', methods=['GET'])
 def listar_materiales_leccion(leccion_id):
     """Lista todos los materiales de una lección"""
+    no_lista = esperar_estructura()
+    if no_lista:
+        return no_lista
+    
     recursos = gestor_materiales.listar_recursos_leccion(leccion_id)
     
     return jsonify([recurso.to_dict() for recurso in recursos])
@@ -1069,18 +1154,65 @@ def buscar_contenido():
     if not termino:
         return jsonify({'error': 'Término de búsqueda requerido'}), 400
     
-    resultados = gestor_contenido.buscar_contenido(termino)
+    try:
+        pagina, por_pagina = parametros_paginacion()
+    except ValueError:
+        return jsonify({'error': 'pagina y por_pagina deben ser enteros positivos'}), 400
+    
+    no_lista = esperar_estructura()
+    if no_lista:
+        return no_lista
+    
+    busqueda = gestor_contenido.buscar_contenido(termino, desplazamiento=(pagina - 1) * por_pagina, limite=por_pagina)
     
     return jsonify({
         'termino': termino,
-        'total_resultados': len(resultados),
-        'resultados': resultados
+        'pagina': pagina,
+        'por_pagina': por_pagina,
+        **busqueda
     })
 
+def parametros_paginacion():
+    """Lee ?pagina=N (desde 1) y ?por_pagina=M; lanza ValueError si no son válidos"""
+    pagina = int(request.args.get('pagina', 1))
+    por_pagina = int(request.args.get('por_pagina', BUSQUEDA_CONFIG['por_pagina_default']))
+    if pagina < 1 or por_pagina < 1:
+        raise ValueError('paginación inválida')
+    return pagina, min(por_pagina, BUSQUEDA_CONFIG['max_por_pagina'])
+
+def parametros_serializacion():
+    """Lee ?formato=compacto, ?campos=a,b y ?profundidad=N de la petición
+
+    Devuelve (compacto, campos, profundidad); compacto es True si se pidió
+    cualquiera de ellos. Lanza ValueError si la profundidad no es válida.
+    """
+    campos = request.args.get('campos')
+    profundidad = request.args.get('profundidad')
+    compacto = request.args.get('formato') == 'compacto' or campos is not None or profundidad is not None
+    if campos is not None:
+        campos = [campo.strip() for campo in campos.split(',') if campo.strip()]
+    if profundidad is not None:
+        profundidad = int(profundidad)
+        if profundidad < 0:
+            raise ValueError('profundidad negativa')
+    return compacto, campos, profundidad
+
 @app.route('/api/estructura-completa', methods=['GET'])
 def obtener_estructura_completa():
     """Obtiene la estructura jerárquica completa de todos los cursos"""
-    estructura = gestor_contenido.obtener_estructura_completa()
+    try:
+        compacto, campos, profundidad = parametros_serializacion()
+    except ValueError:
+        return jsonify({'error': 'El parámetro profundidad debe ser un entero no negativo'}), 400
+    
+    no_lista = esperar_estructura()
+    if no_lista:
+        return no_lista
+    
+    if compacto:
+        estructura = gestor_contenido.obtener_estructura_compacta(campos, profundidad)
+    else:
+        estructura = gestor_contenido.obtener_estructura_completa()
     
     return jsonify(estructura)
 
@@ -1152,6 +1284,7 @@ def modulos_curso(curso_id):
             siguiente_orden = row[0] if row and len(row) > 0 else 1
             cursor.execute('INSERT INTO Modulos (ID_Curso, Nombre, Descripcion, Orden, Duracion_estimada) VALUES (%s, %s, %s, %s, %s)', (curso_id, nombre, descripcion, siguiente_orden, duracion_estimada))
             modulo_id = cursor.lastrowid
+            estructura_curso_modificada(curso_id)
             conn.commit()
             cursor.execute('SELECT * FROM Modulos WHERE ID_Modulo = %s', (modulo_id,))
             modulo_creado = cursor.fetchone()
@@ -1180,7 +1313,7 @@ def eliminar_modulo(modulo_id):
         return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
     try:
         cursor = conn.cursor()
-        cursor.execute('SELECT ID_Modulo, Nombre FROM Modulos WHERE ID_Modulo = %s', (modulo_id,))
+        cursor.execute('SELECT ID_Modulo, Nombre, ID_Curso FROM Modulos WHERE ID_Modulo = %s', (modulo_id,))
         modulo = cursor.fetchone()
         if not modulo:
             return jsonify({'error': 'El módulo especificado no existe'}), 404
@@ -1190,6 +1323,8 @@ def eliminar_modulo(modulo_id):
         if lecciones_count > 0:
             return jsonify({'error': 'No se puede eliminar el módulo porque tiene lecciones asociadas.'}), 400
         cursor.execute('DELETE FROM Modulos WHERE ID_Modulo = %s', (modulo_id,))
+        # Pudo arrastrar evaluaciones y resultados del módulo: se encola el recálculo de los contadores del curso
+        estructura_curso_modificada(modulo[2])
         conn.commit()
         return jsonify({'message': 'Módulo eliminado exitosamente'}), 200
     except Exception as e:
@@ -1216,8 +1351,9 @@ def crear_leccion(modulo_id):
         return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
     try:
         cursor = conn.cursor()
-        cursor.execute('SELECT ID_Modulo FROM Modulos WHERE ID_Modulo = %s', (modulo_id,))
-        if not cursor.fetchone():
+        cursor.execute('SELECT ID_Modulo, ID_Curso FROM Modulos WHERE ID_Modulo = %s', (modulo_id,))
+        modulo = cursor.fetchone()
+        if not modulo:
             return jsonify({'error': 'El módulo especificado no existe'}), 404
         cursor.execute('SELECT COALESCE(MAX(Orden), 0) + 1 FROM Lecciones WHERE ID_Modulo = %s', (modulo_id,))
         row = cursor.fetchone()
@@ -1225,6 +1361,7 @@ def crear_leccion(modulo_id):
         es_obligatoria_int = 1 if es_obligatoria else 0
         cursor.execute('INSERT INTO Lecciones (ID_Modulo, Nombre, Descripcion, Contenido, Orden, Duracion_estimada, Es_obligatoria) VALUES (%s, %s, %s, %s, %s, %s, %s)', (modulo_id, nombre, descripcion, contenido, siguiente_orden, duracion_estimada, es_obligatoria_int))
         leccion_id = cursor.lastrowid
+        estructura_curso_modificada(modulo[1])
         conn.commit()
         cursor.execute('SELECT * FROM Lecciones WHERE ID_Leccion = %s', (leccion_id,))
         leccion_creada = cursor.fetchone()
@@ -1264,7 +1401,11 @@ def eliminar_leccion(leccion_id):
         evaluaciones_count = row[0] if row and len(row) > 0 else 0
         if evaluaciones_count > 0:
             return jsonify({'error': 'No se puede eliminar la lección porque tiene evaluaciones asociadas.'}), 400
+        curso_id = curso_de(conn, leccion_id)
         cursor.execute('DELETE FROM Lecciones WHERE ID_Leccion = %s', (leccion_id,))
+        # Pudo arrastrar el progreso de los estudiantes en la lección: se encola el recálculo de los contadores del curso
+        if curso_id:
+            estructura_curso_modificada(curso_id)
         conn.commit()
         return jsonify({'message': 'Lección eliminada exitosamente'}), 200
     except Exception as e:
@@ -1309,6 +1450,9 @@ def evaluaciones_leccion(leccion_id):
                 return jsonify({'error': 'La lección especificada no existe'}), 404
             cursor.execute('INSERT INTO Evaluaciones (ID_Leccion, ID_Modulo, Nombre, Descripcion, Puntaje_aprobacion, Max_intentos) VALUES (%s, NULL, %s, %s, %s, %s)', (leccion_id, nombre, descripcion, puntaje_aprobacion, max_intentos))
             evaluacion_id = cursor.lastrowid
+            curso_id = curso_de(conn, leccion_id)
+            if curso_id:
+                estructura_curso_modificada(curso_id)
             conn.commit()
             cursor.execute('SELECT * FROM Evaluaciones WHERE ID_Evaluacion = %s', (evaluacion_id,))
             evaluacion_creada = cursor.fetchone()
@@ -1336,6 +1480,19 @@ def obtener_arbol_decision():
     """Obtiene la estructura del árbol de decisión"""
     return jsonify(gestor_contenido.arbol_decision.to_dict())
 
+@app.route('/api/arbol-decision/recargar', methods=['POST'])
+def recargar_arbol_decision():
+    """Recarga ya las reglas de Reglas_Recomendacion en este proceso (los demás las toman al revisar)"""
+    anterior = gestor_contenido.arbol_decision.version
+    try:
+        version = recargar_reglas_recomendacion(forzar=True)
+    except ValueError as e:
+        return jsonify({'error': f'Reglas inválidas, se mantiene la versión {anterior}: {e}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({'version_anterior': anterior, 'version': version})
+
 @app.route('/api/estudiante/<int:estudiante_id>/recomendacion-avanzada', methods=['POST'])
 def generar_recomendacion_avanzada(estudiante_id):
     """Genera una recomendación avanzada usando el árbol de decisión orientado a objetos"""
@@ -1345,36 +1502,11 @@ def generar_recomendacion_avanzada(estudiante_id):
         return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
     
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute('''
-            SELECT 
-                AVG(m.Progreso_total) as promedio_progreso,
-                COUNT(DISTINCT pl.ID_Leccion) as lecciones_completadas,
-                AVG(re.Puntaje) as promedio_puntajes,
-                COUNT(DISTINCT re.ID_Evaluacion) as total_evaluaciones,
-                COUNT(CASE WHEN re.Aprobado = 1 THEN 1 END) as evaluaciones_aprobadas,
-                AVG(pl.Tiempo_dedicado) as tiempo_promedio
-            FROM Estudiantes e
-            LEFT JOIN Matriculas m ON e.ID_Estudiante = m.ID_Estudiante
-            LEFT JOIN Progreso_Lecciones pl ON e.ID_Estudiante = pl.ID_Estudiante
-            LEFT JOIN Resultados_Evaluaciones re ON e.ID_Estudiante = re.ID_Estudiante
-            WHERE e.ID_Estudiante = %s
-        ''', (estudiante_id,))
-        
-        datos = cursor.fetchone()
+        # Vector completo de características que usan las reglas del árbol
+        datos_estudiante = almacen_caracteristicas.obtener(conn, estudiante_id)
         
-        if not datos:
-            return jsonify({'error': 'Estudiante no encontrado'}), 404
-        
-        # Preparar datos para el árbol de decisión
-        datos_estudiante = {
-            'promedio_progreso': float(datos['promedio_progreso'] or 0),
-            'lecciones_completadas': int(datos['lecciones_completadas'] or 0),
-            'promedio_puntajes': float(datos['promedio_puntajes'] or 0),
-            'total_evaluaciones': int(datos['total_evaluaciones'] or 0),
-            'evaluaciones_aprobadas': int(datos['evaluaciones_aprobadas'] or 0),
-            'tiempo_promedio': float(datos['tiempo_promedio'] or 0)
-        }
+        if not datos_estudiante:
+            return jsonify({'error': 'No hay datos suficientes para generar recomendación'}), 400
         
         # Generar recomendación usando el gestor de contenido
         recomendacion = gestor_contenido.generar_recomendacion(datos_estudiante)
@@ -1390,6 +1522,28 @@ def generar_recomendacion_avanzada(estudiante_id):
     finally:
         conn.close()
 
+@app.route('/api/cursos/<int:curso_id>/recomendaciones', methods=['GET'])
+def generar_recomendaciones_curso(curso_id):
+    """Genera la recomendación de todos los estudiantes del curso en una sola pasada"""
+    conn = get_connection()
+    if not conn:
+        return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
+    
+    try:
+        recomendaciones = recomendar_curso(conn, curso_id, gestor_contenido)
+        
+        return jsonify({
+            'curso_id': curso_id,
+            'total_estudiantes': len(recomendaciones),
+            'resumen_por_regla': resumir(recomendaciones),
+            'recomendaciones': recomendaciones
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
 # ============================================================================
 # ENDPOINTS PARA GESTIÓN DE CONTENIDO JERÁRQUICO
 # ============================================================================
@@ -1397,26 +1551,37 @@ def generar_recomendacion_avanzada(estudiante_id):
 @app.route('/api/cursos/<int:curso_id>/nodo/<int:nodo_id>', methods=['GET'])
 def obtener_nodo_contenido(curso_id, nodo_id):
     """Obtiene un nodo específico de la estructura jerárquica"""
-    curso = gestor_contenido.obtener_curso(curso_id)
+    try:
+        compacto, campos, profundidad = parametros_serializacion()
+    except ValueError:
+        return jsonify({'error': 'El parámetro profundidad debe ser un entero no negativo'}), 400
     
-    if not curso:
+    no_lista = esperar_estructura()
+    if no_lista:
+        return no_lista
+    
+    if not gestor_contenido.obtener_curso(curso_id):
         return jsonify({'error': 'Curso no encontrado'}), 404
     
-    nodo = curso.buscar_por_id(nodo_id)
+    nodo = gestor_contenido.obtener_nodo(curso_id, nodo_id)
     
     if not nodo:
         return jsonify({'error': 'Nodo no encontrado'}), 404
     
     return jsonify({
-        'nodo': nodo.to_dict(),
+        'nodo': nodo.serializar(campos, profundidad) if compacto else nodo.to_dict(),
         'ruta': nodo.obtener_ruta(),
         'profundidad': nodo.obtener_profundidad(),
         'total_hijos': nodo.contar_hijos()
     })
 
 @app.route('/api/cursos/<int:curso_id>/buscar', methods=['GET'])
-def buscar_en_curso(curso_id, termino):
+def buscar_en_curso(curso_id):
     """Busca contenido dentro de un curso específico"""
+    no_lista = esperar_estructura()
+    if no_lista:
+        return no_lista
+    
     curso = gestor_contenido.obtener_curso(curso_id)
     
     if not curso:
@@ -1427,13 +1592,20 @@ def buscar_en_curso(curso_id, termino):
     if not termino:
         return jsonify({'error': 'Término de búsqueda requerido'}), 400
     
-    resultados = curso.buscar_por_nombre(termino)
+    try:
+        pagina, por_pagina = parametros_paginacion()
+    except ValueError:
+        return jsonify({'error': 'pagina y por_pagina deben ser enteros positivos'}), 400
+    
+    busqueda = gestor_contenido.buscar_contenido(termino, curso_id=curso_id,
+                                                 desplazamiento=(pagina - 1) * por_pagina, limite=por_pagina)
     
     return jsonify({
         'curso_id': curso_id,
         'termino': termino,
-        'total_resultados': len(resultados),
-        'resultados': [nodo.to_dict() for nodo in resultados]
+        'pagina': pagina,
+        'por_pagina': por_pagina,
+        **busqueda
     })
 
 # ============================================================================
@@ -1620,6 +1792,84 @@ def get_estudiantes_curso_profesor(profesor_id, curso_id):
     finally:
         conn.close()
 
+# Endpoint para obtener el progreso de todos los estudiantes de un curso
+@app.route('/api/profesor/<int:profesor_id>/cursos/<int:curso_id>/progreso', methods=['GET'])
+def get_progreso_estudiantes_curso_profesor(profesor_id, curso_id):
+    """Progreso de los estudiantes matriculados en el curso, paginado (?pagina=N&por_pagina=M)
+
+    Lee los contadores de Matriculas y los totales de la caché del curso, con
+    el mismo cálculo que /api/estudiante/<id>/curso/<id>/progreso, así el
+    tablero no necesita una petición por estudiante.
+    """
+    try:
+        pagina, por_pagina = parametros_paginacion()
+    except ValueError:
+        return jsonify({'error': 'pagina y por_pagina deben ser enteros positivos'}), 400
+
+    conn = get_connection()
+    if not conn:
+        return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
+
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute('''
+            SELECT c.Nombre as nombre_curso,
+                   (SELECT COUNT(*) FROM Matriculas m WHERE m.ID_Curso = c.ID_Curso) as total_estudiantes
+            FROM Cursos c
+            WHERE c.ID_Curso = %s
+        ''', (curso_id,))
+        curso = cursor.fetchone()
+        if not curso:
+            return jsonify({'error': 'Curso no encontrado'}), 404
+
+        cursor.execute('''
+            SELECT e.ID_Estudiante as id_estudiante, e.Nombre as nombre, e.Correo_electronico as correo_electronico,
+                   m.Estado as estado,
+                   m.Lecciones_completadas as lecciones_completadas,
+                   m.Evaluaciones_realizadas as evaluaciones_realizadas,
+                   m.Evaluaciones_aprobadas as evaluaciones_aprobadas,
+                   m.Modulos_con_progreso as modulos_con_progreso,
+                   m.Suma_puntajes / NULLIF(m.Intentos_evaluaciones, 0) as promedio_evaluaciones
+            FROM Matriculas m
+            JOIN Estudiantes e ON e.ID_Estudiante = m.ID_Estudiante
+            WHERE m.ID_Curso = %s
+            ORDER BY e.ID_Estudiante
+            LIMIT %s OFFSET %s
+        ''', (curso_id, por_pagina, (pagina - 1) * por_pagina))
+
+        estructura = totales_curso.obtener(conn, curso_id)
+        totales = {nombre: estructura[nombre] for nombre in ('total_modulos', 'total_lecciones', 'total_evaluaciones')}
+        estudiantes = []
+        for fila in cursor.fetchall():
+            contadores = {nombre: fila[nombre] or 0 for nombre in ('lecciones_completadas', 'evaluaciones_realizadas',
+                                                                   'evaluaciones_aprobadas', 'modulos_con_progreso')}
+            estudiantes.append({
+                'id_estudiante': fila['id_estudiante'],
+                'nombre': fila['nombre'],
+                'correo_electronico': fila['correo_electronico'],
+                'estado': fila['estado'],
+                'lecciones_completadas': contadores['lecciones_completadas'],
+                'evaluaciones_realizadas': contadores['evaluaciones_realizadas'],
+                'evaluaciones_aprobadas': contadores['evaluaciones_aprobadas'],
+                'modulos_completados': contadores['modulos_con_progreso'],
+                'promedio_evaluaciones': fila['promedio_evaluaciones'] or 0,
+                **calcular_progreso(contadores, totales)
+            })
+
+        return jsonify({
+            'id_curso': curso_id,
+            'nombre_curso': curso['nombre_curso'],
+            **totales,
+            'total_estudiantes': curso['total_estudiantes'],
+            'pagina': pagina,
+            'por_pagina': por_pagina,
+            'estudiantes': estudiantes
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
 # Endpoint para obtener evaluaciones de un curso
 @app.route('/api/profesor/<int:profesor_id>/cursos/<int:curso_id>/evaluaciones', methods=['GET'])
 def get_evaluaciones_curso_profesor(profesor_id, curso_id):
@@ -1629,29 +1879,7 @@ def get_evaluaciones_curso_profesor(profesor_id, curso_id):
         return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
     
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute('''
-            SELECT e.*, 
-                   COUNT(re.ID_Resultado) as total_intentos,
-                   AVG(re.Puntaje) as promedio_puntaje,
-                   COUNT(CASE WHEN re.Aprobado = 1 THEN 1 END) as aprobados,
-                   COUNT(CASE WHEN re.Aprobado = 0 THEN 1 END) as reprobados
-            FROM Evaluaciones e
-            LEFT JOIN Resultados_Evaluaciones re ON e.ID_Evaluacion = re.ID_Evaluacion
-            WHERE (e.ID_Leccion IN (
-                SELECT l.ID_Leccion 
-                FROM Lecciones l 
-                JOIN Modulos m ON l.ID_Modulo = m.ID_Modulo 
-                WHERE m.ID_Curso = %s
-            ) OR e.ID_Modulo IN (
-                SELECT m.ID_Modulo 
-                FROM Modulos m 
-                WHERE m.ID_Curso = %s
-            ))
-            GROUP BY e.ID_Evaluacion
-            ORDER BY e.ID_Evaluacion
-        ''', (curso_id, curso_id))
-        evaluaciones = cursor.fetchall()
+        evaluaciones = evaluaciones_curso_con_resultados(conn, curso_id)
         
         return jsonify(evaluaciones)
     except Exception as e:
@@ -1687,9 +1915,12 @@ def crear_evaluacion_profesor(profesor_id):
             INSERT INTO Evaluaciones (Nombre, Descripcion, Puntaje_aprobacion, Max_intentos, ID_Leccion, ID_Modulo)
             VALUES (%s, %s, %s, %s, %s, %s)
         ''', (nombre, descripcion, puntaje_aprobacion, max_intentos, id_leccion, id_modulo))
+        evaluacion_id = cursor.lastrowid
+        curso_id = curso_de(conn, id_leccion, id_modulo)
+        if curso_id:
+            estructura_curso_modificada(curso_id)
         conn.commit()
         
-        evaluacion_id = cursor.lastrowid
         return jsonify({
             'message': 'Evaluación creada exitosamente',
             'evaluacion_id': evaluacion_id,
@@ -1712,13 +1943,18 @@ def eliminar_evaluacion(evaluacion_id):
         cursor = conn.cursor()
         
         # Verificar que la evaluación existe
-        cursor.execute('SELECT ID_Evaluacion, Nombre FROM Evaluaciones WHERE ID_Evaluacion = %s', (evaluacion_id,))
+        cursor.execute('SELECT ID_Evaluacion, Nombre, ID_Leccion, ID_Modulo FROM Evaluaciones WHERE ID_Evaluacion = %s', (evaluacion_id,))
         evaluacion = cursor.fetchone()
         if not evaluacion:
             return jsonify({'error': 'La evaluación especificada no existe'}), 404
         
         # Eliminar la evaluación
+        curso_id = curso_de(conn, evaluacion[2], evaluacion[3])
         cursor.execute('DELETE FROM Evaluaciones WHERE ID_Evaluacion = %s', (evaluacion_id,))
+        # Pudo arrastrar resultados de los estudiantes: se encola el recálculo de los contadores del curso
+        if curso_id:
+            estructura_curso_modificada(curso_id)
+        invalidar_evaluacion(evaluacion_id)
         conn.commit()
         
         return jsonify({
@@ -1816,6 +2052,34 @@ def get_resultados_evaluacion_profesor(profesor_id, evaluacion_id):
     finally:
         conn.close()
 
+# Endpoint para obtener las preguntas de una evaluación con sus respuestas correctas (edición del profesor)
+@app.route('/api/profesor/<int:profesor_id>/evaluaciones/<int:evaluacion_id>/preguntas', methods=['GET'])
+def get_preguntas_evaluacion_profesor(profesor_id, evaluacion_id):
+    """Obtiene las preguntas y opciones de una evaluación de un curso del profesor, con es_correcta"""
+    conn = get_connection()
+    if not conn:
+        return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
+    
+    try:
+        cursor = conn.cursor()
+        
+        # Verificar que la evaluación pertenece a un curso del profesor
+        cursor.execute('SELECT ID_Leccion, ID_Modulo FROM Evaluaciones WHERE ID_Evaluacion = %s', (evaluacion_id,))
+        evaluacion = cursor.fetchone()
+        curso_id = curso_de(conn, evaluacion[0], evaluacion[1]) if evaluacion else None
+        if curso_id:
+            cursor.execute('SELECT ID_Curso FROM Cursos WHERE ID_Curso = %s AND ID_Profesor = %s', (curso_id, profesor_id))
+        if not curso_id or not cursor.fetchone():
+            return jsonify({'error': 'Evaluación no encontrada o no autorizada'}), 404
+        
+        # Preguntas con sus opciones (en caché); se cargan con una sola consulta
+        return jsonify(examenes.obtener(conn, evaluacion_id)), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
 # Endpoint para obtener estadísticas del profesor
 @app.route('/api/profesor/<int:profesor_id>/estadisticas', methods=['GET'])
 def get_estadisticas_profesor(profesor_id):
@@ -1849,26 +2113,7 @@ def get_estadisticas_profesor(profesor_id):
         stats_estudiantes = cursor.fetchone()
         
         # Estadísticas de evaluaciones
-        cursor.execute('''
-            SELECT COUNT(*) as total_evaluaciones,
-                   AVG(re.Puntaje) as promedio_puntaje_general,
-                   COUNT(re.ID_Resultado) as total_intentos
-            FROM Evaluaciones e
-            LEFT JOIN Resultados_Evaluaciones re ON e.ID_Evaluacion = re.ID_Evaluacion
-            WHERE e.ID_Leccion IN (
-                SELECT l.ID_Leccion 
-                FROM Lecciones l 
-                JOIN Modulos m ON l.ID_Modulo = m.ID_Modulo 
-                JOIN Cursos c ON m.ID_Curso = c.ID_Curso
-                WHERE c.ID_Profesor = %s
-            ) OR e.ID_Modulo IN (
-                SELECT m.ID_Modulo 
-                FROM Modulos m 
-                JOIN Cursos c ON m.ID_Curso = c.ID_Curso
-                WHERE c.ID_Profesor = %s
-            )
-        ''', (profesor_id, profesor_id))
-        stats_evaluaciones = cursor.fetchone()
+        stats_evaluaciones = estadisticas_evaluaciones_profesor(conn, profesor_id)
         
         estadisticas = {
             'cursos': stats_cursos,
@@ -1891,22 +2136,7 @@ def get_progreso_estudiante_profesor(profesor_id, estudiante_id):
         return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
     
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute('''
-            SELECT c.ID_Curso, c.Nombre as Nombre_Curso, m.ID_Modulo, m.Nombre as Nombre_Modulo,
-                   l.ID_Leccion, l.Nombre as Nombre_Leccion,
-                   pl.Completado, pl.Tiempo_dedicado, pl.Fecha_ultimo_acceso,
-                   re.Puntaje, re.Aprobado, re.Fecha_intento
-            FROM Cursos c
-            JOIN Modulos m ON c.ID_Curso = m.ID_Curso
-            JOIN Lecciones l ON m.ID_Modulo = l.ID_Modulo
-            LEFT JOIN Progreso_Lecciones pl ON l.ID_Leccion = pl.ID_Leccion AND pl.ID_Estudiante = %s
-            LEFT JOIN Evaluaciones ev ON (l.ID_Leccion = ev.ID_Leccion OR m.ID_Modulo = ev.ID_Modulo)
-            LEFT JOIN Resultados_Evaluaciones re ON ev.ID_Evaluacion = re.ID_Evaluacion AND re.ID_Estudiante = %s
-            WHERE c.ID_Profesor = %s
-            ORDER BY c.ID_Curso, m.Orden, l.Orden
-        ''', (estudiante_id, estudiante_id, profesor_id))
-        progreso = cursor.fetchall()
+        progreso = progreso_detallado_estudiante(conn, estudiante_id, profesor_id)
         
         return jsonify(progreso)
     except Exception as e:
@@ -1939,71 +2169,330 @@ def get_cursos():
     finally:
         conn.close()
 
+def _actualizar_atributos(elemento, atributos):
+    """Asigna solo los atributos que cambiaron (cada asignación invalida el nodo y lo reindexa)"""
+    for nombre, valor in atributos.items():
+        if getattr(elemento, nombre) != valor:
+            setattr(elemento, nombre, valor)
+
+def integrar_estructura(cursos, modulos, lecciones, evaluaciones, recursos):
+    """Cuelga las filas de cada tabla de su padre usando los índices por ID del gestor
+
+    Sirve tanto para la carga completa como para aplicar las filas modificadas
+    después de un snapshot: un nodo que ya existe se actualiza (y se mueve si
+    cambió de padre) sin perder sus hijos. Las filas cuyo padre no existe se
+    ignoran.
+    """
+    for c in cursos:
+        atributos = {
+            'nombre': c['Nombre'],
+            'descripcion': c.get('Descripcion', ''),
+            'duracion_estimada': c.get('Duracion_estimada', 0),
+            'id_profesor': c.get('ID_Profesor')
+        }
+        curso = gestor_contenido.obtener_curso(c['ID_Curso'])
+        if curso:
+            _actualizar_atributos(curso, atributos)
+        else:
+            gestor_contenido.agregar_curso(Curso(id=c['ID_Curso'], **atributos))
+
+    for m in modulos:
+        curso = gestor_contenido.obtener_curso(m['ID_Curso'])
+        if not curso:
+            continue
+        atributos = {
+            'nombre': m['Nombre'],
+            'descripcion': m.get('Descripcion', ''),
+            'duracion_estimada': m.get('Duracion_estimada', 0),
+            'id_curso': m['ID_Curso']
+        }
+        modulo = gestor_contenido.obtener_modulo(m['ID_Modulo'])
+        if not modulo:
+            curso.agregar_modulo(Modulo(id=m['ID_Modulo'], **atributos))
+            continue
+        _actualizar_atributos(modulo, atributos)
+        if modulo.padre is not curso:
+            modulo.padre.eliminar_hijo(modulo.id)
+            curso.agregar_modulo(modulo)
+
+    for l in lecciones:
+        modulo = gestor_contenido.obtener_modulo(l['ID_Modulo'])
+        if not modulo:
+            continue
+        atributos = {
+            'nombre': l['Nombre'],
+            'descripcion': l.get('Descripcion', ''),
+            'contenido': l.get('Contenido', ''),
+            'duracion_estimada': l.get('Duracion_estimada', 0),
+            'id_modulo': l['ID_Modulo'],
+            'es_obligatoria': bool(l.get('Es_obligatoria', 1))
+        }
+        leccion = gestor_contenido.obtener_leccion(l['ID_Leccion'])
+        if not leccion:
+            leccion = Leccion(id=l['ID_Leccion'], **atributos)
+            leccion.evaluaciones = []
+            modulo.agregar_leccion(leccion)
+            continue
+        _actualizar_atributos(leccion, atributos)
+        if leccion.padre is not modulo:
+            leccion.padre.eliminar_hijo(leccion.id)
+            modulo.agregar_leccion(leccion)
+
+    # Una evaluación modificada se quita de la lección donde estaba y se vuelve a agregar
+    if evaluaciones:
+        ubicacion = {ev['id']: leccion for leccion in gestor_contenido.lecciones.values()
+                     for ev in leccion.evaluaciones}
+        modificadas = {ev['ID_Evaluacion'] for ev in evaluaciones}
+        for leccion in {ubicacion[i] for i in modificadas if i in ubicacion}:
+            leccion.evaluaciones = [ev for ev in leccion.evaluaciones if ev['id'] not in modificadas]
+    for ev in evaluaciones:
+        leccion = gestor_contenido.obtener_leccion(ev['ID_Leccion'])
+        if not leccion:
+            continue
+        leccion.evaluaciones.append({
+            'id': ev['ID_Evaluacion'],
+            'nombre': ev['Nombre'],
+            'descripcion': ev.get('Descripcion', ''),
+            'puntaje_aprobacion': float(ev.get('Puntaje_aprobacion') or 0),
+            'max_intentos': ev.get('Max_intentos', 0)
+        })
+        leccion.invalidar()
+
+    for r in recursos:
+        leccion = gestor_contenido.obtener_leccion(r['ID_Leccion'])
+        if not leccion:
+            continue
+        anterior = gestor_contenido.obtener_recurso(r['ID_Recurso'])
+        if anterior:
+            leccion_anterior = gestor_contenido.obtener_leccion(anterior.id_leccion)
+            if leccion_anterior:
+                leccion_anterior.eliminar_recurso(anterior.id)
+        leccion.agregar_recurso(Recurso(
+            id=r['ID_Recurso'],
+            nombre=r['Nombre'],
+            tipo=r['Tipo'],
+            url=r['URL'],
+            orden=r.get('Orden') or 0,
+            duracion=r.get('Duracion')
+        ))
+
+def podar_estructura(vigentes):
+    """Quita del gestor lo que ya no existe en la BD; devuelve cuántos elementos quitó
+
+    `vigentes` tiene el conjunto de IDs de cada tabla (ver _ids_vigentes).
+    """
+    quitados = 0
+    for curso_id in [i for i in gestor_contenido.cursos if i not in vigentes['cursos']]:
+        gestor_contenido.eliminar_curso(curso_id)
+        quitados += 1
+    for modulo in [m for m in gestor_contenido.modulos.values() if m.id not in vigentes['modulos']]:
+        modulo.padre.eliminar_hijo(modulo.id)
+        quitados += 1
+    for leccion in [l for l in gestor_contenido.lecciones.values() if l.id not in vigentes['lecciones']]:
+        leccion.padre.eliminar_hijo(leccion.id)
+        quitados += 1
+    for recurso in [r for r in gestor_contenido.recursos.values() if r.id not in vigentes['recursos']]:
+        gestor_contenido.obtener_leccion(recurso.id_leccion).eliminar_recurso(recurso.id)
+        quitados += 1
+    for leccion in gestor_contenido.lecciones.values():
+        evaluaciones = [ev for ev in leccion.evaluaciones if ev['id'] in vigentes['evaluaciones']]
+        if len(evaluaciones) != len(leccion.evaluaciones):
+            quitados += len(leccion.evaluaciones) - len(evaluaciones)
+            leccion.evaluaciones = evaluaciones
+    return quitados
+
+def _avanzar_fase_carga(fase):
+    estado_carga['fase'] = fase
+    estado_carga['progreso'] = round(FASES_CARGA.index(fase) / len(FASES_CARGA) * 100)
+
+def _consultar_estructura(cursor, desde=None):
+    """Lee las filas de cada tabla; con `desde`, solo las modificadas a partir de esa fecha"""
+    cambios = ['Fecha_modificacion >= %s'] if desde else []
+    parametros = (desde,) if desde else ()
+
+    def donde(*condiciones):
+        condiciones = [*condiciones, *cambios]
+        return f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+
+    _avanzar_fase_carga('cursos')
+    cursor.execute(f'''
+        SELECT ID_Curso, Nombre, Descripcion, Duracion_estimada, ID_Profesor
+        FROM Cursos {donde()} ORDER BY ID_Curso
+    ''', parametros)
+    cursos = cursor.fetchall()
+    _avanzar_fase_carga('modulos')
+    cursor.execute(f'''
+        SELECT ID_Modulo, ID_Curso, Nombre, Descripcion, Duracion_estimada
+        FROM Modulos {donde()} ORDER BY ID_Modulo
+    ''', parametros)
+    modulos = cursor.fetchall()
+    _avanzar_fase_carga('lecciones')
+    cursor.execute(f'SELECT * FROM Lecciones {donde()} ORDER BY ID_Leccion', parametros)
+    lecciones = cursor.fetchall()
+    _avanzar_fase_carga('evaluaciones')
+    cursor.execute(f'''
+        SELECT ID_Evaluacion, ID_Leccion, Nombre, Descripcion, Puntaje_aprobacion, Max_intentos
+        FROM Evaluaciones
+        {donde('ID_Leccion IS NOT NULL')}
+        ORDER BY ID_Evaluacion
+    ''', parametros)
+    evaluaciones = cursor.fetchall()
+    _avanzar_fase_carga('recursos')
+    cursor.execute(f'''
+        SELECT ID_Recurso, ID_Leccion, Nombre, Tipo, URL, Orden, Duracion
+        FROM Recursos {donde()}
+        ORDER BY ID_Leccion, Orden, ID_Recurso
+    ''', parametros)
+    recursos = cursor.fetchall()
+    return cursos, modulos, lecciones, evaluaciones, recursos
+
+# Tablas de la estructura con su clave primaria (las evaluaciones de módulo no están en el árbol)
+TABLAS_ESTRUCTURA = {
+    'cursos': ('Cursos', 'ID_Curso', ''),
+    'modulos': ('Modulos', 'ID_Modulo', ''),
+    'lecciones': ('Lecciones', 'ID_Leccion', ''),
+    'evaluaciones': ('Evaluaciones', 'ID_Evaluacion', 'WHERE ID_Leccion IS NOT NULL'),
+    'recursos': ('Recursos', 'ID_Recurso', '')
+}
+
+def _ids_vigentes(cursor):
+    """IDs actuales de cada tabla de la estructura (solo recorre las claves primarias)"""
+    vigentes = {}
+    for clave, (tabla, columna, filtro) in TABLAS_ESTRUCTURA.items():
+        cursor.execute(f'SELECT {columna} AS id FROM {tabla} {filtro}')
+        vigentes[clave] = {fila['id'] for fila in cursor.fetchall()}
+    return vigentes
+
+def _estructura_con_fecha_modificacion(cursor):
+    """True si todas las tablas de la estructura tienen Fecha_modificacion (migración 6)"""
+    tablas = [tabla for tabla, _, _ in TABLAS_ESTRUCTURA.values()]
+    cursor.execute(f'''
+        SELECT COUNT(DISTINCT TABLE_NAME) AS tablas FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND COLUMN_NAME = 'Fecha_modificacion'
+          AND TABLE_NAME IN ({', '.join(['%s'] * len(tablas))})
+    ''', tablas)
+    return cursor.fetchone()['tablas'] == len(tablas)
+
 def cargar_estructura_desde_bd():
+    """Carga la estructura desde el snapshot local más los cambios posteriores, o completa desde la BD
+
+    Con snapshot se leen solo las filas con Fecha_modificacion posterior a
+    su fecha de corte (altas y modificaciones) y se quitan los elementos
+    cuyos IDs ya no existen (bajas). Todas las consultas se hacen en la
+    misma transacción. El snapshot se usa solo si las tablas tienen
+    Fecha_modificacion (python migraciones.py).
+    """
+    estado_carga.update(estado='cargando', error=None, inicio=datetime.now().isoformat(), fin=None)
     conn = get_connection()
     if not conn:
         print('No se pudo conectar a la base de datos para cargar la estructura.')
+        estado_carga.update(estado='error', error='No se pudo conectar a la base de datos', fin=datetime.now().isoformat())
+        estructura_lista.set()
         return
     try:
         cursor = conn.cursor(dictionary=True)
-        # Obtener todos los cursos
-        cursor.execute('SELECT * FROM Cursos')
-        cursos = cursor.fetchall()
-        for c in cursos:
-            curso = Curso(
-                id=c['ID_Curso'],
-                nombre=c['Nombre'],
-                descripcion=c.get('Descripcion', ''),
-                duracion_estimada=c.get('Duracion_estimada', 0),
-                id_profesor=c.get('ID_Profesor')
-            )
-            # Obtener módulos de este curso
-            cursor.execute('SELECT * FROM Modulos WHERE ID_Curso = %s', (c['ID_Curso'],))
-            modulos = cursor.fetchall()
-            for m in modulos:
-                modulo = Modulo(
-                    id=m['ID_Modulo'],
-                    nombre=m['Nombre'],
-                    descripcion=m.get('Descripcion', ''),
-                    duracion_estimada=m.get('Duracion_estimada', 0),
-                    id_curso=m['ID_Curso']
-                )
-                # Obtener lecciones de este módulo
-                cursor.execute('SELECT * FROM Lecciones WHERE ID_Modulo = %s', (m['ID_Modulo'],))
-                lecciones = cursor.fetchall()
-                for l in lecciones:
-                    leccion = Leccion(
-                        id=l['ID_Leccion'],
-                        nombre=l['Nombre'],
-                        descripcion=l.get('Descripcion', ''),
-                        contenido=l.get('Contenido', ''),
-                        duracion_estimada=l.get('Duracion_estimada', 0),
-                        id_modulo=l['ID_Modulo'],
-                        es_obligatoria=bool(l.get('Es_obligatoria', 1))
-                    )
-                    # Obtener evaluaciones de esta lección
-                    cursor.execute('SELECT * FROM Evaluaciones WHERE ID_Leccion = %s', (l['ID_Leccion'],))
-                    evaluaciones = cursor.fetchall()
-                    leccion.evaluaciones = [
-                        {
-                            'id': ev['ID_Evaluacion'],
-                            'nombre': ev['Nombre'],
-                            'descripcion': ev.get('Descripcion', ''),
-                            'puntaje_aprobacion': ev.get('Puntaje_aprobacion', 0),
-                            'max_intentos': ev.get('Max_intentos', 0)
-                        }
-                        for ev in evaluaciones
-                    ]
-                    modulo.agregar_leccion(leccion)
-                curso.agregar_modulo(modulo)
-            gestor_contenido.agregar_curso(curso)
+        # Una fila escrita por una transacción que aún no confirmó puede tener una
+        # fecha anterior a ahora: la fecha de corte se retrocede un margen
+        cursor.execute('SELECT NOW(6) AS ahora')
+        corte = cursor.fetchone()['ahora'] - timedelta(seconds=CARGA_ESTRUCTURA_CONFIG['snapshot_margen'])
+
+        ruta_snapshot = CARGA_ESTRUCTURA_CONFIG['snapshot_ruta']
+        if ruta_snapshot and not _estructura_con_fecha_modificacion(cursor):
+            print('Snapshot de la estructura desactivado: falta Fecha_modificacion (python migraciones.py)')
+            ruta_snapshot = ''
+        snapshot = None
+        if ruta_snapshot:
+            snapshot = gestor_contenido.cargar_snapshot(ruta_snapshot, CARGA_ESTRUCTURA_CONFIG['snapshot_max_edad'])
+        if snapshot is None:
+            gestor_contenido.vaciar()
+        estado_carga['desde_snapshot'] = snapshot is not None
+
+        filas = _consultar_estructura(cursor, snapshot['watermark']['modificado_desde'] if snapshot else None)
+        _avanzar_fase_carga('armado')
+        integrar_estructura(*filas)
+        quitados = podar_estructura(_ids_vigentes(cursor)) if snapshot else 0
+
+        if ruta_snapshot and (snapshot is None or any(filas) or quitados):
+            try:
+                gestor_contenido.guardar_snapshot(ruta_snapshot, {'modificado_desde': corte.isoformat(sep=' ')},
+                                                  creado=snapshot['creado'] if snapshot else None)
+            except OSError as e:
+                print(f'No se pudo guardar el snapshot de la estructura: {e}')
+        estado_carga.update(estado='lista', fase=None, progreso=100, total_cursos=len(gestor_contenido.cursos))
     except Exception as e:
         print(f'Error cargando estructura desde la base de datos: {e}')
+        # Sin árbol a medio armar: el próximo intento parte de cero
+        gestor_contenido.vaciar()
+        estado_carga.update(estado='error', error=str(e))
     finally:
         conn.close()
+        estado_carga['fin'] = datetime.now().isoformat()
+        estructura_lista.set()
 
-# Llamar a la función al iniciar el backend
-cargar_estructura_desde_bd()
+def iniciar_carga_estructura():
+    """Carga la estructura en un hilo de fondo (por defecto) o de forma síncrona"""
+    if CARGA_ESTRUCTURA_CONFIG['modo'] == 'sincrono':
+        cargar_estructura_desde_bd()
+        return
+    hilo = threading.Thread(target=cargar_estructura_desde_bd, name='carga-estructura', daemon=True)
+    hilo.start()
+
+def reintentar_carga_estructura():
+    """Relanza la carga de la estructura tras un error, como mucho cada `reintento_intervalo` segundos"""
+    if not _reintento_carga.acquire(blocking=False):
+        return
+    try:
+        if estado_carga['estado'] != 'error' or not estructura_lista.is_set():
+            return
+        fin = estado_carga['fin']
+        if fin and (datetime.now() - datetime.fromisoformat(fin)).total_seconds() < CARGA_ESTRUCTURA_CONFIG['reintento_intervalo']:
+            return
+        estructura_lista.clear()
+        estado_carga.update(estado='pendiente')
+        iniciar_carga_estructura()
+    finally:
+        _reintento_carga.release()
+
+def recargar_reglas_recomendacion(forzar=False):
+    """Reconstruye el árbol desde Reglas_Recomendacion si la tabla cambió y lo reemplaza en caliente
+
+    Devuelve la versión vigente. Si la tabla está vacía se conserva el árbol
+    actual; si las reglas no son válidas se lanza ValueError y tampoco se
+    reemplaza.
+    """
+    conn = get_connection()
+    if not conn:
+        raise ConnectionError('No se pudo conectar a la base de datos')
+    try:
+        version = version_reglas(conn)
+        if not forzar and version == gestor_contenido.arbol_decision.version:
+            return version
+        reglas = consultar_reglas(conn)
+        if not reglas:
+            return gestor_contenido.arbol_decision.version
+        gestor_contenido.reemplazar_arbol_decision(ArbolDecision.desde_reglas(reglas, version))
+        return version
+    finally:
+        conn.close()
+
+def vigilar_reglas_recomendacion():
+    """Carga las reglas al iniciar y luego revisa periódicamente si cambiaron"""
+    while True:
+        try:
+            recargar_reglas_recomendacion()
+        except Exception as e:
+            print(f'No se pudieron cargar las reglas de recomendación: {e}')
+        time.sleep(REGLAS_CONFIG['intervalo_revision'])
+
+def iniciar_vigilancia_reglas():
+    if REGLAS_CONFIG['origen'] != 'bd':
+        return
+    hilo = threading.Thread(target=vigilar_reglas_recomendacion, name='reglas-recomendacion', daemon=True)
+    hilo.start()
+
+# Cargar la estructura al iniciar el backend sin bloquear /api/ping
+iniciar_carga_estructura()
+iniciar_vigilancia_reglas()
 
 # Endpoint para obtener los cursos en los que está matriculado un estudiante
 @app.route('/api/estudiante/<int:estudiante_id>/cursos', methods=['GET'])
@@ -2075,6 +2564,8 @@ def matricular_estudiante():
         # Insertar matrícula
         cursor.execute('INSERT INTO Matriculas (ID_Estudiante, ID_Curso, Estado, Progreso_total) VALUES (%s, %s, %s, %s)',
                        (estudiante_id, curso_id, 'activo', 0.0))
+        # Contadores de la nueva matrícula (por si ya había actividad previa en el curso)
+        reconciliar_progreso(conn, totales_curso, curso_id, estudiante_id)
         conn.commit()
         return jsonify({'message': 'Matrícula exitosa'}), 201
     except Exception as e:
@@ -2092,27 +2583,9 @@ def get_progreso_modulo_estudiante(estudiante_id, curso_id):
         return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
     
     try:
-        cursor = conn.cursor(dictionary=True)
-        
-        # Obtener el módulo actual del estudiante (el último módulo con progreso)
-        cursor.execute('''
-            SELECT m.ID_Modulo, m.Nombre as nombre_modulo,
-                   COUNT(l.ID_Leccion) as total_lecciones,
-                   COUNT(CASE WHEN pl.Completado = 1 THEN 1 END) as lecciones_completadas,
-                   COUNT(e.ID_Evaluacion) as total_evaluaciones,
-                   COUNT(CASE WHEN re.Puntaje >= e.Puntaje_aprobacion THEN 1 END) as evaluaciones_aprobadas
-            FROM Modulos m
-            LEFT JOIN Lecciones l ON m.ID_Modulo = l.ID_Modulo
-            LEFT JOIN Progreso_Lecciones pl ON l.ID_Leccion = pl.ID_Leccion AND pl.ID_Estudiante = %s
-            LEFT JOIN Evaluaciones e ON (l.ID_Leccion = e.ID_Leccion OR m.ID_Modulo = e.ID_Modulo)
-            LEFT JOIN Resultados_Evaluaciones re ON e.ID_Evaluacion = re.ID_Evaluacion AND re.ID_Estudiante = %s
-            WHERE m.ID_Curso = %s
-            GROUP BY m.ID_Modulo, m.Nombre
-            ORDER BY m.Orden DESC
-            LIMIT 1
-        ''', (estudiante_id, estudiante_id, curso_id))
-        
-        resultado = cursor.fetchone()
+        # Módulo actual del estudiante: el último del curso según su orden
+        modulos = progreso_modulos_estudiante(conn, estudiante_id, curso_id)
+        resultado = modulos[-1] if modulos else None
         
         if resultado:
             # Calcular progreso del módulo
@@ -2170,96 +2643,43 @@ def get_progreso_curso_estudiante(estudiante_id, curso_id):
     try:
         cursor = conn.cursor(dictionary=True)
         
-        # Obtener información del curso
+        # Contadores de la matrícula: una fila; los totales del curso salen de la caché
         cursor.execute('''
             SELECT c.ID_Curso, c.Nombre as nombre_curso,
-                   COUNT(DISTINCT m.ID_Modulo) as total_modulos,
-                   COUNT(DISTINCT l.ID_Leccion) as total_lecciones,
-                   COUNT(DISTINCT e.ID_Evaluacion) as total_evaluaciones
+                   m.Lecciones_completadas as lecciones_completadas,
+                   m.Evaluaciones_realizadas as evaluaciones_realizadas,
+                   m.Evaluaciones_aprobadas as evaluaciones_aprobadas,
+                   m.Modulos_con_progreso as modulos_con_progreso,
+                   m.Suma_puntajes / NULLIF(m.Intentos_evaluaciones, 0) as promedio_evaluaciones
             FROM Cursos c
-            LEFT JOIN Modulos m ON c.ID_Curso = m.ID_Curso
-            LEFT JOIN Lecciones l ON m.ID_Modulo = l.ID_Modulo
-            LEFT JOIN Evaluaciones e ON (l.ID_Leccion = e.ID_Leccion OR m.ID_Modulo = e.ID_Modulo)
+            LEFT JOIN Matriculas m ON m.ID_Curso = c.ID_Curso AND m.ID_Estudiante = %s
             WHERE c.ID_Curso = %s
-            GROUP BY c.ID_Curso, c.Nombre
-        ''', (curso_id,))
+        ''', (estudiante_id, curso_id))
         
-        curso_info = cursor.fetchone()
+        fila = cursor.fetchone()
         
-        if not curso_info:
+        if not fila:
             return jsonify({'error': 'Curso no encontrado'}), 404
         
-        # Obtener progreso del estudiante
-        cursor.execute('''
-            SELECT 
-                COUNT(DISTINCT pl.ID_Leccion) as lecciones_completadas,
-                COUNT(DISTINCT re.ID_Evaluacion) as evaluaciones_realizadas,
-                COUNT(CASE WHEN re.Puntaje >= ev.Puntaje_aprobacion THEN 1 END) as evaluaciones_aprobadas,
-                AVG(re.Puntaje) as promedio_evaluaciones,
-                COUNT(DISTINCT CASE WHEN pl.Completado = 1 THEN m.ID_Modulo END) as modulos_con_progreso
-            FROM Matriculas mat
-            LEFT JOIN Modulos m ON mat.ID_Curso = m.ID_Curso
-            LEFT JOIN Lecciones l ON m.ID_Modulo = l.ID_Modulo
-            LEFT JOIN Progreso_Lecciones pl ON l.ID_Leccion = pl.ID_Leccion AND pl.ID_Estudiante = %s
-            LEFT JOIN Evaluaciones ev ON (l.ID_Leccion = ev.ID_Leccion OR m.ID_Modulo = ev.ID_Modulo)
-            LEFT JOIN Resultados_Evaluaciones re ON ev.ID_Evaluacion = re.ID_Evaluacion AND re.ID_Estudiante = %s
-            WHERE mat.ID_Curso = %s AND mat.ID_Estudiante = %s
-        ''', (estudiante_id, estudiante_id, curso_id, estudiante_id))
-        
-        progreso_info = cursor.fetchone()
-        
-        if progreso_info:
-            total_modulos = curso_info['total_modulos'] or 0
-            total_lecciones = curso_info['total_lecciones'] or 0
-            total_evaluaciones = curso_info['total_evaluaciones'] or 0
-            
-            lecciones_completadas = progreso_info['lecciones_completadas'] or 0
-            evaluaciones_realizadas = progreso_info['evaluaciones_realizadas'] or 0
-            evaluaciones_aprobadas = progreso_info['evaluaciones_aprobadas'] or 0
-            promedio_evaluaciones = progreso_info['promedio_evaluaciones'] or 0
-            modulos_con_progreso = progreso_info['modulos_con_progreso'] or 0
-            
-            # Calcular progreso total
-            progreso_lecciones = (lecciones_completadas / total_lecciones * 100) if total_lecciones > 0 else 0
-            progreso_evaluaciones = (evaluaciones_aprobadas / total_evaluaciones * 100) if total_evaluaciones > 0 else 0
-            progreso_modulos = (modulos_con_progreso / total_modulos * 100) if total_modulos > 0 else 0
-            
-            # Progreso total ponderado (40% lecciones, 40% evaluaciones, 20% módulos)
-            progreso_total = (progreso_lecciones * 0.4 + progreso_evaluaciones * 0.4 + progreso_modulos * 0.2)
-            
-            return jsonify({
-                'id_curso': curso_info['ID_Curso'],
-                'nombre_curso': curso_info['nombre_curso'],
-                'total_modulos': total_modulos,
-                'total_lecciones': total_lecciones,
-                'total_evaluaciones': total_evaluaciones,
-                'lecciones_completadas': lecciones_completadas,
-                'evaluaciones_realizadas': evaluaciones_realizadas,
-                'evaluaciones_aprobadas': evaluaciones_aprobadas,
-                'modulos_completados': modulos_con_progreso,
-                'promedio_evaluaciones': promedio_evaluaciones,
-                'progreso_total': progreso_total,
-                'progreso_lecciones': progreso_lecciones,
-                'progreso_evaluaciones': progreso_evaluaciones,
-                'progreso_modulos': progreso_modulos
-            })
-        else:
-            return jsonify({
-                'id_curso': curso_info['ID_Curso'],
-                'nombre_curso': curso_info['nombre_curso'],
-                'total_modulos': curso_info['total_modulos'] or 0,
-                'total_lecciones': curso_info['total_lecciones'] or 0,
-                'total_evaluaciones': curso_info['total_evaluaciones'] or 0,
-                'lecciones_completadas': 0,
-                'evaluaciones_realizadas': 0,
-                'evaluaciones_aprobadas': 0,
-                'modulos_completados': 0,
-                'promedio_evaluaciones': 0,
-                'progreso_total': 0,
-                'progreso_lecciones': 0,
-                'progreso_evaluaciones': 0,
-                'progreso_modulos': 0
-            })
+        estructura = totales_curso.obtener(conn, curso_id)
+        totales = {nombre: estructura[nombre] for nombre in ('total_modulos', 'total_lecciones', 'total_evaluaciones')}
+        contadores = {nombre: fila[nombre] or 0 for nombre in ('lecciones_completadas', 'evaluaciones_realizadas',
+                                                               'evaluaciones_aprobadas', 'modulos_con_progreso')}
+        
+        # Progreso total ponderado (40% lecciones, 40% evaluaciones, 20% módulos)
+        progreso = calcular_progreso(contadores, totales)
+        
+        return jsonify({
+            'id_curso': fila['ID_Curso'],
+            'nombre_curso': fila['nombre_curso'],
+            **totales,
+            'lecciones_completadas': contadores['lecciones_completadas'],
+            'evaluaciones_realizadas': contadores['evaluaciones_realizadas'],
+            'evaluaciones_aprobadas': contadores['evaluaciones_aprobadas'],
+            'modulos_completados': contadores['modulos_con_progreso'],
+            'promedio_evaluaciones': fila['promedio_evaluaciones'] or 0,
+            **progreso
+        })
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -2315,17 +2735,15 @@ def actualizar_profesor(profesor_id):
     if 'nombre' in data:
         campos.append('Nombre = %s')
         valores.append(data['nombre'])
+    conn = get_connection()
+    if not conn:
+        return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
     if 'correo_electronico' in data:
         # Validar que el correo no exista en otro profesor
-        conn = get_connection()
-        if not conn:
-            return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
         cursor = conn.cursor()
         cursor.execute('SELECT ID_Profesor FROM Profesores WHERE Correo_electronico = %s AND ID_Profesor != %s', (data['correo_electronico'], profesor_id))
         if cursor.fetchone():
-            conn.close()
             return jsonify({'error': 'El correo electrónico ya está en uso por otro docente'}), 400
-        conn.close()
         campos.append('Correo_electronico = %s')
         valores.append(data['correo_electronico'])
     if 'especialidad' in data:
@@ -2337,9 +2755,6 @@ def actualizar_profesor(profesor_id):
     if not campos:
         return jsonify({'error': 'No hay campos para actualizar'}), 400
     valores.append(profesor_id)
-    conn = get_connection()
-    if not conn:
-        return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
     try:
         cursor = conn.cursor()
         sql = f"UPDATE Profesores SET {', '.join(campos)} WHERE ID_Profesor = %s"
@@ -2360,17 +2775,15 @@ def actualizar_estudiante(estudiante_id):
     if 'nombre' in data:
         campos.append('Nombre = %s')
         valores.append(data['nombre'])
+    conn = get_connection()
+    if not conn:
+        return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
     if 'correo_electronico' in data:
         # Validar que el correo no exista en otro estudiante
-        conn = get_connection()
-        if not conn:
-            return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
         cursor = conn.cursor()
         cursor.execute('SELECT ID_Estudiante FROM Estudiantes WHERE Correo_electronico = %s AND ID_Estudiante != %s', (data['correo_electronico'], estudiante_id))
         if cursor.fetchone():
-            conn.close()
             return jsonify({'error': 'El correo electrónico ya está en uso por otro estudiante'}), 400
-        conn.close()
         campos.append('Correo_electronico = %s')
         valores.append(data['correo_electronico'])
     if 'semestre' in data:
@@ -2385,9 +2798,6 @@ def actualizar_estudiante(estudiante_id):
     if not campos:
         return jsonify({'error': 'No hay campos para actualizar'}), 400
     valores.append(estudiante_id)
-    conn = get_connection()
-    if not conn:
-        return jsonify({'error': 'No se pudo conectar a la base de datos'}), 500
     try:
         cursor = conn.cursor()
         sql = f"UPDATE Estudiantes SET {', '.join(campos)} WHERE ID_Estudiante = %s"
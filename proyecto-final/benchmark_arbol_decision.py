@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark del árbol de decisión: evaluación interpretada (la implementación
+anterior, que arma un diccionario con las nueve condiciones en cada nodo)
+contra la evaluación compilada de ArbolDecision.
+
+Uso: python benchmark_arbol_decision.py [cantidad_estudiantes]
+"""
+
+import random
+import sys
+import time
+
+from models import GestorContenido
+
+def evaluar_condicion_interpretada(condicion, datos):
+    """Copia de la evaluación de condiciones anterior a la compilación"""
+    try:
+        mapeo = {
+            'promedio_puntajes < 70': datos.get('promedio_puntajes', 0) < 70,
+            'promedio_progreso < 50': datos.get('promedio_progreso', 0) < 50,
+            'evaluaciones_aprobadas/total_evaluaciones < 0.8':
+                (datos.get('evaluaciones_aprobadas', 0) / max(datos.get('total_evaluaciones', 1), 1)) < 0.8,
+            'tiempo_promedio > 60': datos.get('tiempo_promedio', 0) > 60,
+            'lecciones_completadas < 5': datos.get('lecciones_completadas', 0) < 5,
+            'recursos_revisados/total_recursos < 1': (datos.get('recursos_revisados', 0) / max(datos.get('total_recursos', 1), 1)) < 1,
+            'intentos_evaluacion > 2': datos.get('intentos_evaluacion', 0) > 2,
+            'dias_desde_ultimo_acceso > 7': datos.get('dias_desde_ultimo_acceso', 0) > 7,
+            'lecciones_obligatorias_completadas/total_lecciones_obligatorias < 1': (datos.get('lecciones_obligatorias_completadas', 0) / max(datos.get('total_lecciones_obligatorias', 1), 1)) < 1
+        }
+        return mapeo.get(condicion, False)
+    except:
+        return False
+
+def evaluar_nodo_interpretado(nodo, datos):
+    """Copia del recorrido recursivo anterior a la compilación"""
+    if nodo.es_hoja():
+        return {
+            'recomendacion': nodo.accion,
+            'tipo': nodo.tipo,
+            'prioridad': nodo.prioridad,
+            'regla_id': nodo.id
+        }
+    if evaluar_condicion_interpretada(nodo.condicion, datos):
+        if nodo.izquierda:
+            return evaluar_nodo_interpretado(nodo.izquierda, datos)
+    elif nodo.derecha:
+        return evaluar_nodo_interpretado(nodo.derecha, datos)
+    return {
+        'recomendacion': nodo.accion or 'Continúa con tu aprendizaje',
+        'tipo': nodo.tipo,
+        'prioridad': nodo.prioridad,
+        'regla_id': nodo.id
+    }
+
+def generar_estudiantes(cantidad, semilla=42):
+    """Genera datos de estudiantes al azar que recorren todas las ramas del árbol"""
+    azar = random.Random(semilla)
+    estudiantes = []
+    for _ in range(cantidad):
+        total_evaluaciones = azar.randint(0, 10)
+        total_recursos = azar.randint(0, 20)
+        total_obligatorias = azar.randint(0, 8)
+        estudiantes.append({
+            'promedio_puntajes': azar.uniform(40, 100),
+            'promedio_progreso': azar.uniform(0, 100),
+            'total_evaluaciones': total_evaluaciones,
+            'evaluaciones_aprobadas': azar.randint(0, total_evaluaciones),
+            'tiempo_promedio': azar.uniform(0, 120),
+            'lecciones_completadas': azar.randint(0, 30),
+            'total_recursos': total_recursos,
+            'recursos_revisados': azar.randint(max(total_recursos - 2, 0), total_recursos),
+            'intentos_evaluacion': azar.randint(0, 4),
+            'dias_desde_ultimo_acceso': azar.randint(0, 14),
+            'total_lecciones_obligatorias': total_obligatorias,
+            'lecciones_obligatorias_completadas': azar.randint(max(total_obligatorias - 1, 0), total_obligatorias)
+        })
+    return estudiantes
+
+def medir(funcion, estudiantes):
+    """Devuelve los resultados y los microsegundos por estudiante"""
+    inicio = time.perf_counter()
+    resultados = [funcion(datos) for datos in estudiantes]
+    return resultados, (time.perf_counter() - inicio) / len(estudiantes) * 1e6
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    arbol = GestorContenido().arbol_decision
+    estudiantes = generar_estudiantes(cantidad)
+
+    arbol.recompilar()
+    antes, costo_antes = medir(lambda datos: evaluar_nodo_interpretado(arbol.raiz, datos), estudiantes)
+    despues, costo_despues = medir(arbol.evaluar_estudiante, estudiantes)
+
+    if antes != despues:
+        print("❌ Las evaluaciones interpretada y compilada no coinciden")
+        sys.exit(1)
+
+    reglas = {}
+    for resultado in despues:
+        reglas[resultado['regla_id']] = reglas.get(resultado['regla_id'], 0) + 1
+    print(f"Estudiantes evaluados: {cantidad}")
+    print(f"Hojas alcanzadas: {dict(sorted(reglas.items()))}")
+    print(f"Interpretado: {costo_antes:.2f} µs por estudiante")
+    print(f"Compilado:    {costo_despues:.2f} µs por estudiante")
+    print(f"Aceleración:  {costo_antes / costo_despues:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las consultas de progreso: las versiones anteriores, que unen
+Evaluaciones con `OR` (o filtran con `IN (...) OR IN (...)`), contra las de
+consultas_progreso.py, que usan UNION ALL de las evaluaciones de lección y de
+módulo con los resultados agregados antes de unirlos.
+
+Genera un conjunto de datos en una base aparte (por defecto
+proyecto_benchmark, nunca la de DB_CONFIG), ejecuta ambas versiones para una
+muestra de matrículas y verifica que coincidan en lo que significa lo mismo.
+Las anteriores son copias textuales del SQL original, que multiplicaba filas:
+los conteos por módulo se verifican contra una consulta de referencia con
+COUNT(DISTINCT) y el total_evaluaciones de las estadísticas no se compara.
+
+Uso: python benchmark_consultas_progreso.py [--estudiantes 100000] [--cursos 40]
+                                            [--muestras 200] [--base proyecto_benchmark] [--regenerar]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import mysql.connector
+
+from config_profesor import DB_CONFIG
+from consultas_progreso import (estadisticas_evaluaciones_profesor, evaluaciones_curso_con_resultados,
+                                progreso_detallado_estudiante, progreso_modulos_estudiante)
+
+TABLAS = [
+    '''CREATE TABLE Cursos (
+        ID_Curso INT PRIMARY KEY,
+        Nombre VARCHAR(100) NOT NULL,
+        ID_Profesor INT NOT NULL,
+        Estado VARCHAR(20) NOT NULL DEFAULT 'activo',
+        INDEX idx_cursos_profesor (ID_Profesor)
+    )''',
+    '''CREATE TABLE Modulos (
+        ID_Modulo INT PRIMARY KEY,
+        ID_Curso INT NOT NULL,
+        Nombre VARCHAR(100) NOT NULL,
+        Orden INT NOT NULL,
+        INDEX idx_modulos_curso (ID_Curso)
+    )''',
+    '''CREATE TABLE Lecciones (
+        ID_Leccion INT PRIMARY KEY,
+        ID_Modulo INT NOT NULL,
+        Nombre VARCHAR(100) NOT NULL,
+        Orden INT NOT NULL,
+        INDEX idx_lecciones_modulo (ID_Modulo)
+    )''',
+    '''CREATE TABLE Evaluaciones (
+        ID_Evaluacion INT PRIMARY KEY,
+        ID_Leccion INT NULL,
+        ID_Modulo INT NULL,
+        Nombre VARCHAR(100) NOT NULL,
+        Descripcion TEXT,
+        Puntaje_aprobacion DECIMAL(5,2) NOT NULL,
+        Max_intentos INT NOT NULL,
+        INDEX idx_evaluaciones_leccion (ID_Leccion),
+        INDEX idx_evaluaciones_modulo (ID_Modulo)
+    )''',
+    '''CREATE TABLE Matriculas (
+        ID_Matricula INT AUTO_INCREMENT PRIMARY KEY,
+        ID_Estudiante INT NOT NULL,
+        ID_Curso INT NOT NULL,
+        UNIQUE KEY uk_matriculas (ID_Estudiante, ID_Curso),
+        INDEX idx_matriculas_curso (ID_Curso)
+    )''',
+    '''CREATE TABLE Progreso_Lecciones (
+        ID_Progreso INT AUTO_INCREMENT PRIMARY KEY,
+        ID_Estudiante INT NOT NULL,
+        ID_Leccion INT NOT NULL,
+        Completado TINYINT(1) NOT NULL,
+        Tiempo_dedicado INT NOT NULL,
+        Fecha_ultimo_acceso DATETIME NOT NULL,
+        UNIQUE KEY uk_progreso (ID_Estudiante, ID_Leccion),
+        INDEX idx_progreso_leccion (ID_Leccion)
+    )''',
+    '''CREATE TABLE Resultados_Evaluaciones (
+        ID_Resultado INT AUTO_INCREMENT PRIMARY KEY,
+        ID_Estudiante INT NOT NULL,
+        ID_Evaluacion INT NOT NULL,
+        Puntaje DECIMAL(5,2) NOT NULL,
+        Aprobado TINYINT(1) NOT NULL,
+        Fecha_intento DATETIME NOT NULL,
+        INDEX idx_resultados_estudiante (ID_Estudiante, ID_Evaluacion),
+        INDEX idx_resultados_evaluacion (ID_Evaluacion)
+    )'''
+]
+
+# ============================================================================
+# Consultas anteriores (copias textuales de app.py antes de consultas_progreso.py)
+# ============================================================================
+
+def progreso_modulos_anterior(conn, estudiante_id, curso_id):
+    """Módulo actual del estudiante con la unión `OR` (get_progreso_modulo_estudiante)"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute('''
+            SELECT m.ID_Modulo, m.Nombre as nombre_modulo,
+                   COUNT(l.ID_Leccion) as total_lecciones,
+                   COUNT(CASE WHEN pl.Completado = 1 THEN 1 END) as lecciones_completadas,
+                   COUNT(e.ID_Evaluacion) as total_evaluaciones,
+                   COUNT(CASE WHEN re.Puntaje >= e.Puntaje_aprobacion THEN 1 END) as evaluaciones_aprobadas
+            FROM Modulos m
+            LEFT JOIN Lecciones l ON m.ID_Modulo = l.ID_Modulo
+            LEFT JOIN Progreso_Lecciones pl ON l.ID_Leccion = pl.ID_Leccion AND pl.ID_Estudiante = %s
+            LEFT JOIN Evaluaciones e ON (l.ID_Leccion = e.ID_Leccion OR m.ID_Modulo = e.ID_Modulo)
+            LEFT JOIN Resultados_Evaluaciones re ON e.ID_Evaluacion = re.ID_Evaluacion AND re.ID_Estudiante = %s
+            WHERE m.ID_Curso = %s
+            GROUP BY m.ID_Modulo, m.Nombre
+            ORDER BY m.Orden DESC
+            LIMIT 1
+        ''', (estudiante_id, estudiante_id, curso_id))
+    return cursor.fetchone()
+
+def progreso_detallado_anterior(conn, estudiante_id, profesor_id):
+    """Detalle por lección con la unión `OR` (get_progreso_estudiante_profesor)"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute('''
+            SELECT c.ID_Curso, c.Nombre as Nombre_Curso, m.ID_Modulo, m.Nombre as Nombre_Modulo,
+                   l.ID_Leccion, l.Nombre as Nombre_Leccion,
+                   pl.Completado, pl.Tiempo_dedicado, pl.Fecha_ultimo_acceso,
+                   re.Puntaje, re.Aprobado, re.Fecha_intento
+            FROM Cursos c
+            JOIN Modulos m ON c.ID_Curso = m.ID_Curso
+            JOIN Lecciones l ON m.ID_Modulo = l.ID_Modulo
+            LEFT JOIN Progreso_Lecciones pl ON l.ID_Leccion = pl.ID_Leccion AND pl.ID_Estudiante = %s
+            LEFT JOIN Evaluaciones ev ON (l.ID_Leccion = ev.ID_Leccion OR m.ID_Modulo = ev.ID_Modulo)
+            LEFT JOIN Resultados_Evaluaciones re ON ev.ID_Evaluacion = re.ID_Evaluacion AND re.ID_Estudiante = %s
+            WHERE c.ID_Profesor = %s
+            ORDER BY c.ID_Curso, m.Orden, l.Orden
+        ''', (estudiante_id, estudiante_id, profesor_id))
+    return cursor.fetchall()
+
+def evaluaciones_curso_anterior(conn, curso_id):
+    """Evaluaciones del curso filtradas con `IN (...) OR IN (...)` (get_evaluaciones_curso_profesor)"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute('''
+            SELECT e.*, 
+                   COUNT(re.ID_Resultado) as total_intentos,
+                   AVG(re.Puntaje) as promedio_puntaje,
+                   COUNT(CASE WHEN re.Aprobado = 1 THEN 1 END) as aprobados,
+                   COUNT(CASE WHEN re.Aprobado = 0 THEN 1 END) as reprobados
+            FROM Evaluaciones e
+            LEFT JOIN Resultados_Evaluaciones re ON e.ID_Evaluacion = re.ID_Evaluacion
+            WHERE (e.ID_Leccion IN (
+                SELECT l.ID_Leccion 
+                FROM Lecciones l 
+                JOIN Modulos m ON l.ID_Modulo = m.ID_Modulo 
+                WHERE m.ID_Curso = %s
+            ) OR e.ID_Modulo IN (
+                SELECT m.ID_Modulo 
+                FROM Modulos m 
+                WHERE m.ID_Curso = %s
+            ))
+            GROUP BY e.ID_Evaluacion
+            ORDER BY e.ID_Evaluacion
+        ''', (curso_id, curso_id))
+    return cursor.fetchall()
+
+def estadisticas_evaluaciones_anterior(conn, profesor_id):
+    """Estadísticas de evaluaciones del profesor con `IN (...) OR IN (...)` (get_estadisticas_profesor)"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute('''
+            SELECT COUNT(*) as total_evaluaciones,
+                   AVG(re.Puntaje) as promedio_puntaje_general,
+                   COUNT(re.ID_Resultado) as total_intentos
+            FROM Evaluaciones e
+            LEFT JOIN Resultados_Evaluaciones re ON e.ID_Evaluacion = re.ID_Evaluacion
+            WHERE e.ID_Leccion IN (
+                SELECT l.ID_Leccion 
+                FROM Lecciones l 
+                JOIN Modulos m ON l.ID_Modulo = m.ID_Modulo 
+                JOIN Cursos c ON m.ID_Curso = c.ID_Curso
+                WHERE c.ID_Profesor = %s
+            ) OR e.ID_Modulo IN (
+                SELECT m.ID_Modulo 
+                FROM Modulos m 
+                JOIN Cursos c ON m.ID_Curso = c.ID_Curso
+                WHERE c.ID_Profesor = %s
+            )
+        ''', (profesor_id, profesor_id))
+    return cursor.fetchone()
+
+def conteos_modulos_referencia(conn, estudiante_id, curso_id):
+    """Conteos por módulo sin repeticiones para verificar progreso_modulos_estudiante
+
+    No es una consulta de la aplicación: la anterior contaba cada lección una
+    vez por evaluación unida y cada evaluación una vez por intento, así que
+    sus conteos no sirven de referencia. No se mide.
+    """
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute('''
+        SELECT m.ID_Modulo, m.Nombre as nombre_modulo,
+               COUNT(DISTINCT l.ID_Leccion) as total_lecciones,
+               COUNT(DISTINCT CASE WHEN pl.Completado = 1 THEN l.ID_Leccion END) as lecciones_completadas,
+               COUNT(DISTINCT e.ID_Evaluacion) as total_evaluaciones,
+               COUNT(DISTINCT CASE WHEN re.Puntaje >= e.Puntaje_aprobacion THEN e.ID_Evaluacion END) as evaluaciones_aprobadas
+        FROM Modulos m
+        LEFT JOIN Lecciones l ON m.ID_Modulo = l.ID_Modulo
+        LEFT JOIN Progreso_Lecciones pl ON l.ID_Leccion = pl.ID_Leccion AND pl.ID_Estudiante = %s
+        LEFT JOIN Evaluaciones e ON (l.ID_Leccion = e.ID_Leccion OR m.ID_Modulo = e.ID_Modulo)
+        LEFT JOIN Resultados_Evaluaciones re ON e.ID_Evaluacion = re.ID_Evaluacion AND re.ID_Estudiante = %s
+        WHERE m.ID_Curso = %s
+        GROUP BY m.ID_Modulo, m.Nombre
+        ORDER BY m.Orden
+    ''', (estudiante_id, estudiante_id, curso_id))
+    return cursor.fetchall()
+
+# ============================================================================
+# Normalización para comparar resultados
+# ============================================================================
+# Solo se comparan los datos que significan lo mismo en ambas versiones; los
+# conteos que la consulta anterior multiplicaba se verifican aparte.
+
+def normalizar_valor(valor):
+    if isinstance(valor, (Decimal, float)):
+        return round(float(valor), 4)
+    return valor
+
+def normalizar_filas(filas):
+    return [{clave: normalizar_valor(valor) for clave, valor in fila.items()} for fila in filas]
+
+def normalizar_modulo_actual(resultado, anterior):
+    """Qué módulo toma el endpoint como actual: la anterior devuelve esa fila, la nueva todos los módulos"""
+    fila = resultado if anterior else (resultado[-1] if resultado else None)
+    return (fila['ID_Modulo'], fila['nombre_modulo']) if fila else None
+
+def normalizar_detalle(filas, anterior):
+    """Lecciones con su progreso e intentos del estudiante por módulo, sin repeticiones
+
+    La anterior repetía cada intento de una evaluación de módulo en todas las
+    lecciones del módulo y cada lección una vez por evaluación sin intentos.
+    """
+    lecciones = set()
+    intentos = set()
+    for fila in filas:
+        if fila['ID_Leccion'] is not None:
+            lecciones.add((fila['ID_Leccion'], fila['Completado'], fila['Tiempo_dedicado'], fila['Fecha_ultimo_acceso']))
+        if fila['Puntaje'] is not None:
+            intentos.add((fila['ID_Modulo'], normalizar_valor(fila['Puntaje']), fila['Aprobado'], fila['Fecha_intento']))
+    return lecciones, intentos
+
+def normalizar_estadisticas(fila, anterior):
+    """Promedio e intentos; total_evaluaciones de la anterior contaba una fila por intento"""
+    return normalizar_valor(fila['promedio_puntaje_general']), int(fila['total_intentos'])
+
+# ============================================================================
+# Generación de datos
+# ============================================================================
+
+def generar_datos(conn, estudiantes, cursos, semilla=42):
+    """Crea las tablas y las llena: cursos de 6 módulos con 5 lecciones y evaluaciones de lección y de módulo"""
+    azar = random.Random(semilla)
+    cursor = conn.cursor()
+    for tabla in ('Resultados_Evaluaciones', 'Progreso_Lecciones', 'Matriculas', 'Evaluaciones',
+                  'Lecciones', 'Modulos', 'Cursos'):
+        cursor.execute(f'DROP TABLE IF EXISTS {tabla}')
+    for sentencia in TABLAS:
+        cursor.execute(sentencia)
+
+    filas_cursos, filas_modulos, filas_lecciones, filas_evaluaciones = [], [], [], []
+    estructura = {}
+    id_modulo = id_leccion = id_evaluacion = 0
+    for curso_id in range(1, cursos + 1):
+        filas_cursos.append((curso_id, f'Curso {curso_id}', curso_id % 8 + 1))
+        estructura[curso_id] = {'lecciones': [], 'evaluaciones': []}
+        for orden_modulo in range(1, 7):
+            id_modulo += 1
+            filas_modulos.append((id_modulo, curso_id, f'Módulo {orden_modulo}', orden_modulo))
+            for orden_leccion in range(1, 6):
+                id_leccion += 1
+                filas_lecciones.append((id_leccion, id_modulo, f'Lección {orden_leccion}', orden_leccion))
+                estructura[curso_id]['lecciones'].append(id_leccion)
+                if orden_leccion % 2:
+                    id_evaluacion += 1
+                    filas_evaluaciones.append((id_evaluacion, id_leccion, None, f'Evaluación {id_evaluacion}', 60))
+                    estructura[curso_id]['evaluaciones'].append(id_evaluacion)
+            id_evaluacion += 1
+            filas_evaluaciones.append((id_evaluacion, None, id_modulo, f'Examen del módulo {orden_modulo}', 70))
+            estructura[curso_id]['evaluaciones'].append(id_evaluacion)
+
+    cursor.executemany('INSERT INTO Cursos (ID_Curso, Nombre, ID_Profesor) VALUES (%s, %s, %s)', filas_cursos)
+    cursor.executemany('INSERT INTO Modulos VALUES (%s, %s, %s, %s)', filas_modulos)
+    cursor.executemany('INSERT INTO Lecciones VALUES (%s, %s, %s, %s)', filas_lecciones)
+    cursor.executemany('''
+        INSERT INTO Evaluaciones (ID_Evaluacion, ID_Leccion, ID_Modulo, Nombre, Puntaje_aprobacion, Max_intentos)
+        VALUES (%s, %s, %s, %s, %s, 3)
+    ''', filas_evaluaciones)
+    conn.commit()
+
+    inicio = datetime(2024, 1, 1)
+    segundos = 0
+    matriculas, progreso, resultados = [], [], []
+
+    def volcar(forzar=False):
+        for sql, filas in (('INSERT INTO Matriculas (ID_Estudiante, ID_Curso) VALUES (%s, %s)', matriculas),
+                           ('''INSERT INTO Progreso_Lecciones
+                               (ID_Estudiante, ID_Leccion, Completado, Tiempo_dedicado, Fecha_ultimo_acceso)
+                               VALUES (%s, %s, %s, %s, %s)''', progreso),
+                           ('''INSERT INTO Resultados_Evaluaciones
+                               (ID_Estudiante, ID_Evaluacion, Puntaje, Aprobado, Fecha_intento)
+                               VALUES (%s, %s, %s, %s, %s)''', resultados)):
+            if filas and (forzar or len(filas) >= 5000):
+                cursor.executemany(sql, filas)
+                filas.clear()
+        conn.commit()
+
+    aprobacion = {fila[0]: fila[4] for fila in filas_evaluaciones}
+    for estudiante_id in range(1, estudiantes + 1):
+        for curso_id in azar.sample(range(1, cursos + 1), azar.randint(1, 2)):
+            matriculas.append((estudiante_id, curso_id))
+            lecciones = estructura[curso_id]['lecciones']
+            for leccion_id in lecciones[:azar.randint(0, len(lecciones))]:
+                segundos += 1
+                progreso.append((estudiante_id, leccion_id, int(azar.random() < 0.8), azar.randint(1, 90),
+                                 inicio + timedelta(seconds=segundos)))
+            for evaluacion_id in estructura[curso_id]['evaluaciones']:
+                if azar.random() < 0.4:
+                    for _ in range(azar.randint(1, 3)):
+                        segundos += 1
+                        puntaje = azar.randint(30, 100)
+                        resultados.append((estudiante_id, evaluacion_id, puntaje,
+                                           int(puntaje >= aprobacion[evaluacion_id]),
+                                           inicio + timedelta(seconds=segundos)))
+        volcar()
+        if estudiante_id % 10000 == 0:
+            print(f'  {estudiante_id} estudiantes generados')
+    volcar(forzar=True)
+
+# ============================================================================
+# Medición
+# ============================================================================
+
+def medir(funcion, argumentos):
+    """Devuelve los resultados y los milisegundos promedio por consulta"""
+    inicio = time.perf_counter()
+    resultados = [funcion(*args) for args in argumentos]
+    return resultados, (time.perf_counter() - inicio) / len(argumentos) * 1000
+
+def comparar(nombre, anterior, nueva, argumentos, normalizar):
+    antes, costo_antes = medir(anterior, argumentos)
+    despues, costo_despues = medir(nueva, argumentos)
+    iguales = all(normalizar(a, True) == normalizar(d, False) for a, d in zip(antes, despues))
+    print(f"{'✅' if iguales else '❌'} {nombre}")
+    print(f"   Anterior: {costo_antes:.2f} ms por consulta")
+    print(f"   UNION:    {costo_despues:.2f} ms por consulta")
+    print(f"   Aceleración: {costo_antes / costo_despues:.1f}x")
+    return iguales
+
+def verificar(nombre, referencia, nueva, argumentos):
+    """Compara sin medir la consulta nueva con una de referencia"""
+    iguales = all(normalizar_filas(referencia(*args)) == normalizar_filas(nueva(*args)) for args in argumentos)
+    print(f"{'✅' if iguales else '❌'} {nombre}")
+    return iguales
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara las consultas de progreso con OR y con UNION ALL')
+    parser.add_argument('--estudiantes', type=int, default=100000)
+    parser.add_argument('--cursos', type=int, default=40)
+    parser.add_argument('--muestras', type=int, default=200, help='matrículas a consultar por versión')
+    parser.add_argument('--base', default='proyecto_benchmark', help='base de datos del benchmark')
+    parser.add_argument('--regenerar', action='store_true', help='vuelve a generar los datos aunque existan')
+    args = parser.parse_args()
+
+    if args.base == DB_CONFIG['database']:
+        print('❌ El benchmark borra y crea tablas: use una base distinta de la de la aplicación')
+        sys.exit(1)
+
+    conn = mysql.connector.connect(host=DB_CONFIG['host'], user=DB_CONFIG['user'],
+                                   password=DB_CONFIG['password'], charset=DB_CONFIG['charset'])
+    cursor = conn.cursor()
+    cursor.execute(f'CREATE DATABASE IF NOT EXISTS `{args.base}`')
+    cursor.execute(f'USE `{args.base}`')
+    cursor.execute("SHOW TABLES LIKE 'Resultados_Evaluaciones'")
+    if args.regenerar or not cursor.fetchall():
+        print(f'Generando {args.estudiantes} estudiantes en {args.cursos} cursos...')
+        generar_datos(conn, args.estudiantes, args.cursos)
+    for tabla in ('Matriculas', 'Progreso_Lecciones', 'Resultados_Evaluaciones'):
+        cursor.execute(f'SELECT COUNT(*) FROM {tabla}')
+        print(f'{tabla}: {cursor.fetchone()[0]} filas')
+
+    cursor.execute('''
+        SELECT m.ID_Estudiante, m.ID_Curso, c.ID_Profesor
+        FROM Matriculas m JOIN Cursos c ON c.ID_Curso = m.ID_Curso
+        ORDER BY RAND(42) LIMIT %s
+    ''', (args.muestras,))
+    muestras = cursor.fetchall()
+
+    por_modulo = [(estudiante, curso) for estudiante, curso, _ in muestras]
+    detalle = [(estudiante, profesor) for estudiante, _, profesor in muestras]
+    cursos = [(curso,) for curso in sorted({curso for _, curso, _ in muestras})]
+    profesores = [(profesor,) for profesor in sorted({profesor for _, _, profesor in muestras})]
+
+    resultados = [
+        comparar('Progreso por módulo (progreso-modulo)', lambda *a: progreso_modulos_anterior(conn, *a),
+                 lambda *a: progreso_modulos_estudiante(conn, *a), por_modulo, normalizar_modulo_actual),
+        verificar('Progreso por módulo: conteos sin repeticiones', lambda *a: conteos_modulos_referencia(conn, *a),
+                  lambda *a: progreso_modulos_estudiante(conn, *a), por_modulo),
+        comparar('Detalle del estudiante para el profesor', lambda *a: progreso_detallado_anterior(conn, *a),
+                 lambda *a: progreso_detallado_estudiante(conn, *a), detalle, normalizar_detalle),
+        comparar('Evaluaciones del curso con resultados', lambda *a: evaluaciones_curso_anterior(conn, *a),
+                 lambda *a: evaluaciones_curso_con_resultados(conn, *a), cursos,
+                 lambda filas, _: normalizar_filas(filas)),
+        comparar('Estadísticas de evaluaciones del profesor', lambda *a: estadisticas_evaluaciones_anterior(conn, *a),
+                 lambda *a: estadisticas_evaluaciones_profesor(conn, *a), profesores, normalizar_estadisticas),
+    ]
+    conn.close()
+
+    if not all(resultados):
+        print('❌ Alguna consulta nueva no coincide con la anterior')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
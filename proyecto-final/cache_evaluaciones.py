@@ -0,0 +1,164 @@
+"""
+Cachés en memoria de las evaluaciones.
+
+CacheClavesRespuestas guarda, por evaluación, la pregunta y la corrección de
+cada opción, así calificar un envío no vuelve a leer `opciones.es_correcta`.
+CacheExamenes guarda las preguntas con sus opciones para la vista de edición
+del profesor. CacheExamenesEstudiante guarda, a partir de ella, el examen que
+se entrega al estudiante (sin las respuestas correctas) ya serializado y con
+su ETag, porque lo piden todos los estudiantes de un curso en pocos minutos.
+Los endpoints que modifican preguntas u opciones las invalidan una vez
+confirmada su transacción (db_connect.despues_de_confirmar).
+"""
+
+import hashlib
+import json
+import threading
+
+
+class _CachePorEvaluacion:
+    """Valores por evaluación que se cargan con `_cargar(conn, evaluacion_id)`
+
+    Cada invalidación sube un contador de generación; una carga que empezó
+    antes de una invalidación se devuelve pero no se guarda.
+    """
+
+    def __init__(self):
+        self._valores = {}
+        self._generacion = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, conn, evaluacion_id):
+        """Devuelve el valor de la evaluación, leyéndolo de la base de datos si no está en caché"""
+        with self._lock:
+            valor = self._valores.get(evaluacion_id)
+            generacion = self._generacion
+        if valor is not None:
+            return valor
+
+        valor = self._cargar(conn, evaluacion_id)
+        with self._lock:
+            if self._generacion == generacion:
+                self._valores[evaluacion_id] = valor
+        return valor
+
+    def invalidar(self, evaluacion_id=None):
+        """Descarta el valor de una evaluación, o todos si no se indica"""
+        with self._lock:
+            self._generacion += 1
+            if evaluacion_id is None:
+                self._valores.clear()
+            else:
+                self._valores.pop(evaluacion_id, None)
+
+    def _cargar(self, conn, evaluacion_id):
+        raise NotImplementedError
+
+
+class CacheClavesRespuestas(_CachePorEvaluacion):
+    """Clave de respuestas por evaluación: {'opciones', 'correctas', 'total_preguntas'}
+
+    - opciones: {id_opcion: (id_pregunta, es_correcta)}
+    - correctas: {id_pregunta: frozenset de ids de opciones correctas}
+    - total_preguntas: cantidad de preguntas de la evaluación
+    """
+
+    @staticmethod
+    def _cargar(conn, evaluacion_id):
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute('''
+            SELECT p.id AS id_pregunta, o.id AS id_opcion, o.es_correcta
+            FROM preguntas p
+            LEFT JOIN opciones o ON o.id_pregunta = p.id
+            WHERE p.id_evaluacion = %s
+        ''', (evaluacion_id,))
+        opciones = {}
+        correctas = {}
+        for fila in cursor.fetchall():
+            correctas.setdefault(fila['id_pregunta'], set())
+            if fila['id_opcion'] is None:
+                continue
+            es_correcta = bool(fila['es_correcta'])
+            opciones[fila['id_opcion']] = (fila['id_pregunta'], es_correcta)
+            if es_correcta:
+                correctas[fila['id_pregunta']].add(fila['id_opcion'])
+        return {
+            'opciones': opciones,
+            'correctas': {pregunta: frozenset(ids) for pregunta, ids in correctas.items()},
+            'total_preguntas': len(correctas)
+        }
+
+
+class CacheExamenes(_CachePorEvaluacion):
+    """Preguntas de la evaluación por orden, cada una con sus opciones por orden en 'opciones'
+
+    Se cargan con una sola consulta (preguntas LEFT JOIN opciones) y se
+    agrupan aquí. El valor se comparte entre peticiones: no se debe modificar.
+    """
+
+    @staticmethod
+    def _cargar(conn, evaluacion_id):
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute('''
+            SELECT p.id, p.texto, p.tipo, p.orden, p.fecha_creacion,
+                   o.id AS id_opcion, o.texto AS texto_opcion, o.es_correcta, o.orden AS orden_opcion
+            FROM preguntas p
+            LEFT JOIN opciones o ON o.id_pregunta = p.id
+            WHERE p.id_evaluacion = %s
+            ORDER BY p.orden, p.id, o.orden, o.id
+        ''', (evaluacion_id,))
+        preguntas = {}
+        for fila in cursor.fetchall():
+            pregunta = preguntas.get(fila['id'])
+            if pregunta is None:
+                pregunta = preguntas[fila['id']] = {
+                    'id': fila['id'],
+                    'texto': fila['texto'],
+                    'tipo': fila['tipo'],
+                    'orden': fila['orden'],
+                    'fecha_creacion': fila['fecha_creacion'],
+                    'opciones': []
+                }
+            if fila['id_opcion'] is not None:
+                pregunta['opciones'].append({
+                    'id': fila['id_opcion'],
+                    'texto': fila['texto_opcion'],
+                    'es_correcta': fila['es_correcta'],
+                    'orden': fila['orden_opcion']
+                })
+        return list(preguntas.values())
+
+
+# Sube cuando cambia el formato del examen del estudiante, así cambian los ETag
+VERSION_EXAMEN_ESTUDIANTE = 1
+
+
+class CacheExamenesEstudiante(_CachePorEvaluacion):
+    """Examen para el estudiante: {'contenido': JSON en bytes, 'etag': ETag fuerte}
+
+    Se arma desde CacheExamenes sin `es_correcta` ni `fecha_creacion`. El
+    ETag es un hash del contenido y de VERSION_EXAMEN_ESTUDIANTE, así que es
+    el mismo en todos los procesos y cambia con cualquier edición del examen.
+    """
+
+    def __init__(self, examenes):
+        super().__init__()
+        self._examenes = examenes
+
+    def _cargar(self, conn, evaluacion_id):
+        preguntas = [
+            {
+                'id': pregunta['id'],
+                'texto': pregunta['texto'],
+                'tipo': pregunta['tipo'],
+                'orden': pregunta['orden'],
+                'opciones': [
+                    {'id': opcion['id'], 'texto': opcion['texto'], 'orden': opcion['orden']}
+                    for opcion in pregunta['opciones']
+                ]
+            }
+            for pregunta in self._examenes.obtener(conn, evaluacion_id)
+        ]
+        contenido = json.dumps(preguntas, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        huella = hashlib.sha256(b'%d:%s' % (VERSION_EXAMEN_ESTUDIANTE, contenido)).hexdigest()
+        return {'contenido': contenido, 'etag': f'v{VERSION_EXAMEN_ESTUDIANTE}-{huella[:32]}'}
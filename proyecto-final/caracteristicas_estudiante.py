@@ -0,0 +1,248 @@
+"""
+Extracción de características de estudiantes para el árbol de recomendaciones.
+
+Cada agregado se calcula en su propia subconsulta agrupada por estudiante y
+luego se une a la lista de matrículas, así ninguna unión multiplica filas
+(antes Matriculas × Progreso_Lecciones × Resultados_Evaluaciones inflaba los
+COUNT y sesgaba los AVG). Las consultas se limitan a un estudiante (todos sus
+cursos matriculados) o a un curso (todos sus estudiantes).
+
+AlmacenCaracteristicas materializa el vector de cada estudiante en la tabla
+Features_Estudiante (crear_tabla_features_estudiante.sql) con una caché en el
+proceso; los endpoints que registran resultados o accesos lo recalculan solo
+para ese estudiante y las recomendaciones leen una única fila.
+"""
+
+import threading
+import time
+from datetime import date, datetime
+
+from db_connect import punto_de_guardado
+
+# Características que consumen las reglas del árbol y el tipo de cada una
+CARACTERISTICAS = {
+    'promedio_progreso': float,
+    'lecciones_completadas': int,
+    'tiempo_promedio': float,
+    'promedio_puntajes': float,
+    'total_evaluaciones': int,
+    'evaluaciones_aprobadas': int,
+    'intentos_evaluacion': int,
+    'dias_desde_ultimo_acceso': int,
+    'recursos_revisados': int,
+    'total_recursos': int,
+    'lecciones_obligatorias_completadas': int,
+    'total_lecciones_obligatorias': int
+}
+
+_CONSULTA = '''
+    SELECT b.ID_Estudiante AS estudiante_id,
+           b.promedio_progreso,
+           COALESCE(pl.lecciones_completadas, 0) AS lecciones_completadas,
+           COALESCE(pl.tiempo_promedio, 0) AS tiempo_promedio,
+           COALESCE(ev.promedio_puntajes, 0) AS promedio_puntajes,
+           COALESCE(ev.total_evaluaciones, 0) AS total_evaluaciones,
+           COALESCE(ev.evaluaciones_aprobadas, 0) AS evaluaciones_aprobadas,
+           COALESCE(ev.intentos_evaluacion, 0) AS intentos_evaluacion,
+           COALESCE(DATEDIFF(NOW(), COALESCE(GREATEST(pl.ultimo_acceso, ar.ultimo_acceso),
+                                             pl.ultimo_acceso, ar.ultimo_acceso)), 0) AS dias_desde_ultimo_acceso,
+           COALESCE(GREATEST(pl.ultimo_acceso, ar.ultimo_acceso), pl.ultimo_acceso, ar.ultimo_acceso) AS ultimo_acceso,
+           COALESCE(ar.recursos_revisados, 0) AS recursos_revisados,
+           COALESCE(tc.total_recursos, 0) AS total_recursos,
+           COALESCE(pl.lecciones_obligatorias_completadas, 0) AS lecciones_obligatorias_completadas,
+           COALESCE(tc.total_lecciones_obligatorias, 0) AS total_lecciones_obligatorias
+    FROM (
+        SELECT m.ID_Estudiante, COALESCE(AVG(m.Progreso_total), 0) AS promedio_progreso
+        FROM Matriculas m
+        WHERE {alcance}
+        GROUP BY m.ID_Estudiante
+    ) b
+    LEFT JOIN (
+        SELECT m.ID_Estudiante,
+               COUNT(DISTINCT CASE WHEN pl.Completado = 1 THEN pl.ID_Leccion END) AS lecciones_completadas,
+               COUNT(DISTINCT CASE WHEN pl.Completado = 1 AND l.Es_obligatoria = 1 THEN pl.ID_Leccion END)
+                   AS lecciones_obligatorias_completadas,
+               AVG(pl.Tiempo_dedicado) AS tiempo_promedio,
+               MAX(pl.Fecha_ultimo_acceso) AS ultimo_acceso
+        FROM Matriculas m
+        JOIN Modulos mo ON mo.ID_Curso = m.ID_Curso
+        JOIN Lecciones l ON l.ID_Modulo = mo.ID_Modulo
+        JOIN Progreso_Lecciones pl ON pl.ID_Leccion = l.ID_Leccion AND pl.ID_Estudiante = m.ID_Estudiante
+        WHERE {alcance}
+        GROUP BY m.ID_Estudiante
+    ) pl ON pl.ID_Estudiante = b.ID_Estudiante
+    LEFT JOIN (
+        SELECT por_evaluacion.ID_Estudiante,
+               SUM(por_evaluacion.suma_puntajes) / SUM(por_evaluacion.intentos) AS promedio_puntajes,
+               COUNT(*) AS total_evaluaciones,
+               SUM(por_evaluacion.aprobada) AS evaluaciones_aprobadas,
+               MAX(por_evaluacion.intentos) AS intentos_evaluacion
+        FROM (
+            SELECT m.ID_Estudiante, re.ID_Evaluacion,
+                   COUNT(*) AS intentos,
+                   SUM(re.Puntaje) AS suma_puntajes,
+                   MAX(CASE WHEN re.Aprobado = 1 THEN 1 ELSE 0 END) AS aprobada
+            FROM Matriculas m
+            JOIN Resultados_Evaluaciones re ON re.ID_Estudiante = m.ID_Estudiante
+            JOIN Evaluaciones e ON e.ID_Evaluacion = re.ID_Evaluacion
+            LEFT JOIN Lecciones l ON l.ID_Leccion = e.ID_Leccion
+            JOIN Modulos mo ON mo.ID_Modulo = COALESCE(l.ID_Modulo, e.ID_Modulo)
+            WHERE {alcance} AND mo.ID_Curso = m.ID_Curso
+            GROUP BY m.ID_Estudiante, re.ID_Evaluacion
+        ) por_evaluacion
+        GROUP BY por_evaluacion.ID_Estudiante
+    ) ev ON ev.ID_Estudiante = b.ID_Estudiante
+    LEFT JOIN (
+        SELECT m.ID_Estudiante,
+               COUNT(DISTINCT ar.ID_Recurso) AS recursos_revisados,
+               MAX(ar.Fecha_ultimo_acceso) AS ultimo_acceso
+        FROM Matriculas m
+        JOIN Modulos mo ON mo.ID_Curso = m.ID_Curso
+        JOIN Lecciones l ON l.ID_Modulo = mo.ID_Modulo
+        JOIN Recursos r ON r.ID_Leccion = l.ID_Leccion
+        JOIN Accesos_Recursos ar ON ar.ID_Recurso = r.ID_Recurso AND ar.ID_Estudiante = m.ID_Estudiante
+        WHERE {alcance}
+        GROUP BY m.ID_Estudiante
+    ) ar ON ar.ID_Estudiante = b.ID_Estudiante
+    LEFT JOIN (
+        SELECT m.ID_Estudiante,
+               SUM(totales.total_recursos) AS total_recursos,
+               SUM(totales.total_lecciones_obligatorias) AS total_lecciones_obligatorias
+        FROM Matriculas m
+        JOIN (
+            SELECT mo.ID_Curso,
+                   COUNT(DISTINCT r.ID_Recurso) AS total_recursos,
+                   COUNT(DISTINCT CASE WHEN l.Es_obligatoria = 1 THEN l.ID_Leccion END) AS total_lecciones_obligatorias
+            FROM Modulos mo
+            JOIN Lecciones l ON l.ID_Modulo = mo.ID_Modulo
+            LEFT JOIN Recursos r ON r.ID_Leccion = l.ID_Leccion
+            GROUP BY mo.ID_Curso
+        ) totales ON totales.ID_Curso = m.ID_Curso
+        WHERE {alcance}
+        GROUP BY m.ID_Estudiante
+    ) tc ON tc.ID_Estudiante = b.ID_Estudiante
+    ORDER BY b.ID_Estudiante
+'''
+
+# Cantidad de subconsultas que repiten el filtro de alcance
+_FILTROS_POR_CONSULTA = _CONSULTA.count('{alcance}')
+
+def consultar_caracteristicas(conn, estudiante_id=None, curso_id=None):
+    """Devuelve (ids_estudiantes, columnas) para un estudiante o para un curso completo
+
+    `columnas` asocia cada nombre de CARACTERISTICAS con una tupla alineada
+    con `ids_estudiantes`; los valores ya vienen convertidos a float o int.
+    Además incluye 'ultimo_acceso' (datetime o None). Los estudiantes sin
+    matrículas en el alcance no aparecen.
+    """
+    if (estudiante_id is None) == (curso_id is None):
+        raise ValueError('Se debe indicar estudiante_id o curso_id')
+    alcance, valor = ('m.ID_Estudiante = %s', estudiante_id) if curso_id is None else ('m.ID_Curso = %s', curso_id)
+
+    cursor = conn.cursor()
+    cursor.execute(_CONSULTA.format(alcance=alcance), (valor,) * _FILTROS_POR_CONSULTA)
+    filas = cursor.fetchall()
+    nombres = cursor.column_names
+    valores = list(zip(*filas)) if filas else [()] * len(nombres)
+    crudas = dict(zip(nombres, valores))
+    ids = list(crudas.pop('estudiante_id'))
+    columnas = {nombre: tuple(map(tipo, crudas[nombre])) for nombre, tipo in CARACTERISTICAS.items()}
+    columnas['ultimo_acceso'] = tuple(crudas['ultimo_acceso'])
+    return ids, columnas
+
+def calcular_caracteristicas(conn, estudiante_id):
+    """Vector de un estudiante sobre todos sus cursos (con 'ultimo_acceso'), o None si no tiene matrículas"""
+    ids, columnas = consultar_caracteristicas(conn, estudiante_id=estudiante_id)
+    if not ids:
+        return None
+    return {nombre: valores[0] for nombre, valores in columnas.items()}
+
+# Columnas de Features_Estudiante: los días desde el último acceso dependen de
+# la fecha de lectura, así que se guarda la fecha y los días se calculan al leer
+_COLUMNAS_TABLA = {nombre: nombre.capitalize() for nombre in CARACTERISTICAS if nombre != 'dias_desde_ultimo_acceso'}
+_COLUMNAS_TABLA['ultimo_acceso'] = 'Ultimo_acceso'
+
+class AlmacenCaracteristicas:
+    """Vectores de características materializados en Features_Estudiante más una caché en memoria
+
+    Las entradas de la caché se vuelven a leer de la tabla pasados
+    `max_edad` segundos, así otros procesos que actualicen la tabla se ven
+    reflejados. Si la tabla no existe, el almacén sigue funcionando
+    calculando el vector desde las tablas de origen.
+    """
+
+    def __init__(self, max_edad: float = 300):
+        self.max_edad = max_edad
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, conn, estudiante_id):
+        """Vector del estudiante desde la caché, la tabla o, si falta, calculado y guardado; None sin matrículas"""
+        with self._lock:
+            entrada = self._cache.get(estudiante_id)
+        if entrada and time.monotonic() - entrada[0] < self.max_edad:
+            return self._vector(entrada[1])
+
+        datos = None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                f"SELECT {', '.join(_COLUMNAS_TABLA.values())} FROM Features_Estudiante WHERE ID_Estudiante = %s",
+                (estudiante_id,)
+            )
+            fila = cursor.fetchone()
+            if fila:
+                datos = {nombre: fila[columna] for nombre, columna in _COLUMNAS_TABLA.items()}
+        except Exception as e:
+            print(f'No se pudo leer Features_Estudiante: {e}')
+        if datos is None:
+            return self.actualizar(conn, estudiante_id)
+
+        self._guardar_en_cache(estudiante_id, datos)
+        return self._vector(datos)
+
+    def actualizar(self, conn, estudiante_id):
+        """Recalcula el vector de un estudiante y lo guarda en la tabla y en la caché
+
+        No confirma: la transacción es de quien pasa la conexión.
+        """
+        datos = calcular_caracteristicas(conn, estudiante_id)
+        if datos is None:
+            self.invalidar(estudiante_id)
+            return None
+        columnas = list(_COLUMNAS_TABLA.values())
+        try:
+            with punto_de_guardado(conn):
+                cursor = conn.cursor()
+                cursor.execute(f'''
+                    INSERT INTO Features_Estudiante (ID_Estudiante, {', '.join(columnas)}, Fecha_actualizacion)
+                    VALUES (%s, {', '.join(['%s'] * len(columnas))}, NOW())
+                    ON DUPLICATE KEY UPDATE {', '.join(f'{c} = VALUES({c})' for c in columnas)},
+                        Fecha_actualizacion = NOW()
+                ''', (estudiante_id, *(datos[nombre] for nombre in _COLUMNAS_TABLA)))
+        except Exception as e:
+            print(f'No se pudo guardar Features_Estudiante del estudiante {estudiante_id}: {e}')
+        self._guardar_en_cache(estudiante_id, datos)
+        return self._vector(datos)
+
+    def invalidar(self, estudiante_id=None):
+        """Descarta de la caché un estudiante, o todos si no se indica"""
+        with self._lock:
+            if estudiante_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(estudiante_id, None)
+
+    def _guardar_en_cache(self, estudiante_id, datos):
+        with self._lock:
+            self._cache[estudiante_id] = (time.monotonic(), datos)
+
+    @staticmethod
+    def _vector(datos):
+        """Copia con los tipos de CARACTERISTICAS y los días desde el último acceso calculados a hoy"""
+        vector = {nombre: tipo(datos.get(nombre) or 0) for nombre, tipo in CARACTERISTICAS.items()}
+        ultimo_acceso = datos.get('ultimo_acceso')
+        if isinstance(ultimo_acceso, datetime):
+            ultimo_acceso = ultimo_acceso.date()
+        vector['dias_desde_ultimo_acceso'] = (date.today() - ultimo_acceso).days if ultimo_acceso else 0
+        return vector
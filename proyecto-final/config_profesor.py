@@ -22,7 +22,38 @@ DB_CONFIG = {
     'charset': 'utf8mb4',
     'autocommit': True,
     'pool_size': 10,
-    'pool_recycle': 3600
+    'pool_recycle': 3600,
+    'pool_max_overflow': 5,  # conexiones extra temporales cuando el pool se agota
+    'pool_timeout': 10,  # segundos esperando una conexión libre
+    'pool_ping_intervalo': 30  # segundos ociosa antes de verificarla con ping
+}
+
+# Carga de la estructura de contenido (cursos, módulos, lecciones) al iniciar
+CARGA_ESTRUCTURA_CONFIG = {
+    'modo': os.getenv('CARGA_ESTRUCTURA_MODO', 'segundo_plano'),  # 'segundo_plano' o 'sincrono'
+    'timeout_espera': 5,  # segundos que un endpoint espera a que termine la carga
+    'reintento_intervalo': 30,  # segundos entre reintentos de una carga que falló
+    'snapshot_ruta': os.getenv('SNAPSHOT_ESTRUCTURA', 'cache/estructura.snap'),  # vacío para desactivar
+    'snapshot_max_edad': 86400,  # segundos desde la última carga completa; un snapshot más viejo se descarta
+    'snapshot_margen': 300  # segundos que se retrocede la fecha de corte por transacciones aún abiertas
+}
+
+# Origen de las reglas del árbol de recomendación
+REGLAS_CONFIG = {
+    'origen': os.getenv('REGLAS_ORIGEN', 'bd'),  # 'bd' (tabla Reglas_Recomendacion) o 'predefinidas'
+    'intervalo_revision': 60  # segundos entre revisiones de cambios en la tabla
+}
+
+# Caché en memoria de Features_Estudiante (características de recomendación)
+CARACTERISTICAS_CONFIG = {
+    'cache_max_edad': 300  # segundos antes de volver a leer la fila de la tabla
+}
+
+# Progreso de las matrículas: trabajo posterior a las entregas
+# (la reconciliación de contadores es una tarea aparte: reconciliacion_progreso.py)
+COLA_PROGRESO_CONFIG = {
+    'modo': os.getenv('PROGRESO_MODO', 'segundo_plano'),  # 'segundo_plano' o 'sincrono'
+    'hilos': 1  # hilos que procesan la cola de recalculos
 }
 
 # ============================================================================
@@ -44,6 +75,12 @@ CORS_CONFIG = {
     'allow_headers': ['Content-Type', 'Authorization']
 }
 
+# Paginación de /api/buscar y /api/cursos/<id>/buscar
+BUSQUEDA_CONFIG = {
+    'por_pagina_default': 50,
+    'max_por_pagina': 200
+}
+
 # ============================================================================
 # CONFIGURACIÓN ESPECÍFICA DEL PROFESOR
 # ============================================================================
@@ -0,0 +1,163 @@
+"""
+Consultas de progreso y estadísticas que recorren las evaluaciones de un curso.
+
+Una evaluación cuelga de una lección (ID_Leccion) o directamente de un módulo
+(ID_Modulo con ID_Leccion nulo). Unir Evaluaciones con
+`ON (l.ID_Leccion = e.ID_Leccion OR m.ID_Modulo = e.ID_Modulo)` no se puede
+resolver con un solo índice y repite cada evaluación del módulo en todas sus
+lecciones. Aquí se arma en cambio la lista de evaluaciones con su módulo y su
+curso como UNION ALL de las dos ramas (cada una usa el índice de su columna)
+y los resultados de los estudiantes se agregan por evaluación antes de
+unirlos, así ninguna fila se multiplica.
+"""
+
+
+def evaluaciones_por_modulo(condicion=None, parametros=()):
+    """Subconsulta con las evaluaciones y el módulo y el curso al que pertenecen
+
+    Columnas: ID_Evaluacion, ID_Leccion (nulo en las evaluaciones de módulo),
+    ID_Modulo, ID_Curso y Puntaje_aprobacion. `condicion` filtra ambas ramas
+    y puede usar los alias `e` (Evaluaciones) y `mo` (Modulos). Devuelve el
+    SQL y sus parámetros.
+    """
+    filtro = f' AND {condicion}' if condicion else ''
+    sql = f'''
+        SELECT e.ID_Evaluacion, e.ID_Leccion, l.ID_Modulo, mo.ID_Curso, e.Puntaje_aprobacion
+        FROM Evaluaciones e
+        JOIN Lecciones l ON l.ID_Leccion = e.ID_Leccion
+        JOIN Modulos mo ON mo.ID_Modulo = l.ID_Modulo
+        WHERE e.ID_Leccion IS NOT NULL{filtro}
+        UNION ALL
+        SELECT e.ID_Evaluacion, NULL, e.ID_Modulo, mo.ID_Curso, e.Puntaje_aprobacion
+        FROM Evaluaciones e
+        JOIN Modulos mo ON mo.ID_Modulo = e.ID_Modulo
+        WHERE e.ID_Leccion IS NULL{filtro}
+    '''
+    return sql, tuple(parametros) * 2
+
+
+def progreso_modulos_estudiante(conn, estudiante_id, curso_id):
+    """Lecciones y evaluaciones (totales y logradas por el estudiante) de cada módulo del curso, por Orden"""
+    evaluaciones, parametros_evaluaciones = evaluaciones_por_modulo('mo.ID_Curso = %s', (curso_id,))
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f'''
+        SELECT mo.ID_Modulo, mo.Nombre as nombre_modulo,
+               COALESCE(tl.total, 0) as total_lecciones,
+               COALESCE(tl.completadas, 0) as lecciones_completadas,
+               COALESCE(te.total, 0) as total_evaluaciones,
+               COALESCE(te.aprobadas, 0) as evaluaciones_aprobadas
+        FROM Modulos mo
+        LEFT JOIN (
+            SELECT l.ID_Modulo, COUNT(*) AS total, COUNT(pl.ID_Leccion) AS completadas
+            FROM Lecciones l
+            JOIN Modulos mo ON mo.ID_Modulo = l.ID_Modulo
+            LEFT JOIN Progreso_Lecciones pl
+                ON pl.ID_Leccion = l.ID_Leccion AND pl.ID_Estudiante = %s AND pl.Completado = 1
+            WHERE mo.ID_Curso = %s
+            GROUP BY l.ID_Modulo
+        ) tl ON tl.ID_Modulo = mo.ID_Modulo
+        LEFT JOIN (
+            SELECT ev.ID_Modulo, COUNT(*) AS total, COUNT(re.ID_Evaluacion) AS aprobadas
+            FROM ({evaluaciones}) ev
+            LEFT JOIN (
+                SELECT DISTINCT re.ID_Evaluacion
+                FROM Resultados_Evaluaciones re
+                JOIN Evaluaciones e ON e.ID_Evaluacion = re.ID_Evaluacion
+                WHERE re.ID_Estudiante = %s AND re.Puntaje >= e.Puntaje_aprobacion
+            ) re ON re.ID_Evaluacion = ev.ID_Evaluacion
+            GROUP BY ev.ID_Modulo
+        ) te ON te.ID_Modulo = mo.ID_Modulo
+        WHERE mo.ID_Curso = %s
+        ORDER BY mo.Orden
+    ''', (estudiante_id, curso_id, *parametros_evaluaciones, estudiante_id, curso_id))
+    return cursor.fetchall()
+
+
+def progreso_detallado_estudiante(conn, estudiante_id, profesor_id):
+    """Lecciones de los cursos del profesor con el progreso y los intentos del estudiante
+
+    Mismas columnas que la consulta anterior con la unión `OR`. Una fila por
+    lección y por intento en sus evaluaciones (o una sola si no tiene
+    intentos), seguidas en cada módulo por los intentos en las evaluaciones
+    del módulo, que tienen nulos los campos de la lección.
+    """
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute('''
+        SELECT ID_Curso, Nombre_Curso, ID_Modulo, Nombre_Modulo, ID_Leccion, Nombre_Leccion,
+               Completado, Tiempo_dedicado, Fecha_ultimo_acceso, Puntaje, Aprobado, Fecha_intento
+        FROM (
+            SELECT c.ID_Curso, c.Nombre as Nombre_Curso, m.ID_Modulo, m.Nombre as Nombre_Modulo,
+                   l.ID_Leccion, l.Nombre as Nombre_Leccion,
+                   pl.Completado, pl.Tiempo_dedicado, pl.Fecha_ultimo_acceso,
+                   ri.Puntaje, ri.Aprobado, ri.Fecha_intento,
+                   m.Orden as Orden_modulo, l.Orden as Orden_leccion
+            FROM Cursos c
+            JOIN Modulos m ON c.ID_Curso = m.ID_Curso
+            JOIN Lecciones l ON m.ID_Modulo = l.ID_Modulo
+            LEFT JOIN Progreso_Lecciones pl ON l.ID_Leccion = pl.ID_Leccion AND pl.ID_Estudiante = %s
+            LEFT JOIN (
+                SELECT e.ID_Leccion, re.Puntaje, re.Aprobado, re.Fecha_intento
+                FROM Resultados_Evaluaciones re
+                JOIN Evaluaciones e ON e.ID_Evaluacion = re.ID_Evaluacion
+                WHERE re.ID_Estudiante = %s AND e.ID_Leccion IS NOT NULL
+            ) ri ON ri.ID_Leccion = l.ID_Leccion
+            WHERE c.ID_Profesor = %s
+            UNION ALL
+            SELECT c.ID_Curso, c.Nombre, m.ID_Modulo, m.Nombre,
+                   NULL, NULL, NULL, NULL, NULL,
+                   re.Puntaje, re.Aprobado, re.Fecha_intento,
+                   m.Orden, NULL
+            FROM Evaluaciones e
+            JOIN Modulos m ON m.ID_Modulo = e.ID_Modulo
+            JOIN Cursos c ON c.ID_Curso = m.ID_Curso
+            JOIN Resultados_Evaluaciones re ON re.ID_Evaluacion = e.ID_Evaluacion AND re.ID_Estudiante = %s
+            WHERE e.ID_Leccion IS NULL AND c.ID_Profesor = %s
+        ) progreso
+        ORDER BY ID_Curso, Orden_modulo, Orden_leccion IS NULL, Orden_leccion
+    ''', (estudiante_id, estudiante_id, profesor_id, estudiante_id, profesor_id))
+    return cursor.fetchall()
+
+
+def evaluaciones_curso_con_resultados(conn, curso_id):
+    """Evaluaciones del curso con intentos, promedio, aprobados y reprobados de todos sus resultados"""
+    evaluaciones, parametros_evaluaciones = evaluaciones_por_modulo('mo.ID_Curso = %s', (curso_id,))
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f'''
+        SELECT e.*,
+               COALESCE(r.total_intentos, 0) as total_intentos,
+               r.promedio_puntaje,
+               COALESCE(r.aprobados, 0) as aprobados,
+               COALESCE(r.reprobados, 0) as reprobados
+        FROM ({evaluaciones}) ev
+        JOIN Evaluaciones e ON e.ID_Evaluacion = ev.ID_Evaluacion
+        LEFT JOIN (
+            SELECT re.ID_Evaluacion, COUNT(*) AS total_intentos, AVG(re.Puntaje) AS promedio_puntaje,
+                   COUNT(CASE WHEN re.Aprobado = 1 THEN 1 END) AS aprobados,
+                   COUNT(CASE WHEN re.Aprobado = 0 THEN 1 END) AS reprobados
+            FROM Resultados_Evaluaciones re
+            WHERE re.ID_Evaluacion IN (SELECT ID_Evaluacion FROM ({evaluaciones}) ev_curso)
+            GROUP BY re.ID_Evaluacion
+        ) r ON r.ID_Evaluacion = e.ID_Evaluacion
+        ORDER BY e.ID_Evaluacion
+    ''', (*parametros_evaluaciones, *parametros_evaluaciones))
+    return cursor.fetchall()
+
+
+def estadisticas_evaluaciones_profesor(conn, profesor_id):
+    """Cantidad de evaluaciones de los cursos del profesor, intentos y promedio general de puntaje"""
+    evaluaciones, parametros_evaluaciones = evaluaciones_por_modulo(
+        'mo.ID_Curso IN (SELECT ID_Curso FROM Cursos WHERE ID_Profesor = %s)', (profesor_id,))
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f'''
+        SELECT COUNT(*) as total_evaluaciones,
+               SUM(r.suma) / NULLIF(SUM(r.intentos), 0) as promedio_puntaje_general,
+               CAST(COALESCE(SUM(r.intentos), 0) AS UNSIGNED) as total_intentos
+        FROM ({evaluaciones}) ev
+        LEFT JOIN (
+            SELECT re.ID_Evaluacion, COUNT(*) AS intentos, SUM(re.Puntaje) AS suma
+            FROM Resultados_Evaluaciones re
+            WHERE re.ID_Evaluacion IN (SELECT ID_Evaluacion FROM ({evaluaciones}) ev_profesor)
+            GROUP BY re.ID_Evaluacion
+        ) r ON r.ID_Evaluacion = ev.ID_Evaluacion
+    ''', (*parametros_evaluaciones, *parametros_evaluaciones))
+    return cursor.fetchone()
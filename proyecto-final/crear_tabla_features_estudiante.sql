@@ -0,0 +1,26 @@
+-- Script para crear la tabla Features_Estudiante
+-- Guarda el vector de características que usa el árbol de recomendaciones;
+-- el backend lo recalcula por estudiante al registrar resultados o accesos
+-- y lo completa la primera vez que se pide una recomendación.
+
+USE proyecto;
+
+CREATE TABLE IF NOT EXISTS Features_Estudiante (
+    ID_Estudiante INT PRIMARY KEY,
+    Promedio_progreso DECIMAL(5,2) NOT NULL DEFAULT 0,
+    Lecciones_completadas INT NOT NULL DEFAULT 0,
+    Tiempo_promedio DECIMAL(10,2) NOT NULL DEFAULT 0,
+    Promedio_puntajes DECIMAL(5,2) NOT NULL DEFAULT 0,
+    Total_evaluaciones INT NOT NULL DEFAULT 0,
+    Evaluaciones_aprobadas INT NOT NULL DEFAULT 0,
+    Intentos_evaluacion INT NOT NULL DEFAULT 0,
+    Recursos_revisados INT NOT NULL DEFAULT 0,
+    Total_recursos INT NOT NULL DEFAULT 0,
+    Lecciones_obligatorias_completadas INT NOT NULL DEFAULT 0,
+    Total_lecciones_obligatorias INT NOT NULL DEFAULT 0,
+    Ultimo_acceso DATETIME NULL,
+    Fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (ID_Estudiante) REFERENCES Estudiantes(ID_Estudiante) ON DELETE CASCADE
+);
+
+SELECT 'Tabla Features_Estudiante creada/verificada correctamente' as Mensaje;
@@ -1,35 +1,361 @@
 import os
+import json
+import time
+import itertools
+import threading
+from contextlib import contextmanager
 import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
+from flask import g, has_request_context
 
 # Cargar variables de entorno desde .env
 load_dotenv()
 
-def get_connection():
+from config_profesor import DB_CONFIG
+
+
+class ConexionPool:
+    """Conexión prestada por el pool; close() la devuelve en lugar de cerrarla"""
+
+    def __init__(self, pool: 'PoolConexiones', conexion, creada_en: float):
+        self._pool = pool
+        self._conexion = conexion
+        self._creada_en = creada_en
+        self._ultimo_uso = time.monotonic()
+        self._prestada = False
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.close()
+
+    def close(self):
+        """Devuelve la conexión al pool (llamarlo varias veces es seguro)"""
+        if self._prestada:
+            self._prestada = False
+            self._pool._devolver(self)
+
+    def cerrar_fisicamente(self):
+        """Cierra la conexión real con el servidor"""
+        try:
+            self._conexion.close()
+        except Error:
+            pass
+
+
+class PoolConexiones:
+    """Pool acotado de conexiones MySQL con verificación, reciclaje y estadísticas"""
+
+    def __init__(self, tamano: int = 10, max_overflow: int = 0, timeout: float = 10,
+                 reciclaje: float = 3600, ping_intervalo: float = 30, **parametros):
+        self.tamano = tamano
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.reciclaje = reciclaje
+        self.ping_intervalo = ping_intervalo
+        self.parametros = parametros
+        self._libres = []
+        self._abiertas = 0
+        self._en_uso = 0
+        self._condicion = threading.Condition()
+        self._stats = {
+            'creadas': 0,
+            'reutilizadas': 0,
+            'recicladas': 0,
+            'descartadas': 0,
+            'esperas': 0,
+            'timeouts': 0,
+            'max_en_uso': 0
+        }
+
+    def _contar(self, estadistica: str) -> None:
+        """Incrementa una estadística; los hilos que piden conexiones la comparten"""
+        with self._condicion:
+            self._stats[estadistica] += 1
+
+    def _crear(self) -> ConexionPool:
+        conexion = mysql.connector.connect(**self.parametros)
+        self._contar('creadas')
+        return ConexionPool(self, conexion, time.monotonic())
+
+    def _es_valida(self, conexion: ConexionPool) -> bool:
+        """Recicla conexiones viejas y hace ping a las que llevan tiempo ociosas"""
+        ahora = time.monotonic()
+        if self.reciclaje and ahora - conexion._creada_en > self.reciclaje:
+            self._contar('recicladas')
+            return False
+        if ahora - conexion._ultimo_uso > self.ping_intervalo:
+            try:
+                conexion._conexion.ping(reconnect=False)
+            except Error:
+                self._contar('descartadas')
+                return False
+        return True
+
+    def obtener(self) -> ConexionPool:
+        """Presta una conexión; espera hasta `timeout` segundos si el pool está agotado"""
+        limite = time.monotonic() + self.timeout
+        while True:
+            conexion = None
+            with self._condicion:
+                while not self._libres and self._abiertas >= self.tamano + self.max_overflow:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        self._stats['timeouts'] += 1
+                        raise Error(msg=f'Pool de conexiones agotado tras {self.timeout}s de espera')
+                    self._stats['esperas'] += 1
+                    self._condicion.wait(restante)
+                if self._libres:
+                    conexion = self._libres.pop()
+                else:
+                    self._abiertas += 1
+
+            if conexion is not None and not self._es_valida(conexion):
+                conexion.cerrar_fisicamente()
+                conexion = None
+            elif conexion is not None:
+                self._contar('reutilizadas')
+
+            if conexion is None:
+                try:
+                    conexion = self._crear()
+                except Error:
+                    with self._condicion:
+                        self._abiertas -= 1
+                        self._condicion.notify()
+                    raise
+
+            with self._condicion:
+                self._en_uso += 1
+                self._stats['max_en_uso'] = max(self._stats['max_en_uso'], self._en_uso)
+            conexion._prestada = True
+            return conexion
+
+    def _devolver(self, conexion: ConexionPool) -> None:
+        """Recibe una conexión prestada, descartando transacciones pendientes"""
+        reutilizable = True
+        try:
+            if conexion._conexion.in_transaction:
+                conexion._conexion.rollback()
+        except Error:
+            reutilizable = False
+        conexion._ultimo_uso = time.monotonic()
+
+        with self._condicion:
+            self._en_uso -= 1
+            if reutilizable and len(self._libres) < self.tamano:
+                self._libres.append(conexion)
+            else:
+                self._abiertas -= 1
+                reutilizable = False
+            self._condicion.notify()
+        if not reutilizable:
+            conexion.cerrar_fisicamente()
+
+    def estadisticas(self) -> dict:
+        """Devuelve el estado actual del pool para dimensionarlo"""
+        with self._condicion:
+            return {
+                'tamano': self.tamano,
+                'max_overflow': self.max_overflow,
+                'abiertas': self._abiertas,
+                'libres': len(self._libres),
+                'en_uso': self._en_uso,
+                **self._stats
+            }
+
+    def cerrar(self) -> None:
+        """Cierra todas las conexiones libres"""
+        with self._condicion:
+            libres, self._libres = self._libres, []
+            self._abiertas -= len(libres)
+        for conexion in libres:
+            conexion.cerrar_fisicamente()
+
+
+class ConexionPeticion:
+    """Conexión compartida por todos los helpers de una misma petición HTTP
+
+    commit() y close() se difieren: la transacción se confirma (o revierte)
+    una sola vez al terminar la petición y la conexión vuelve al pool.
+    """
+
+    def __init__(self, conexion: ConexionPool):
+        self._conexion = conexion
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+    def confirmar(self):
+        self._conexion.commit()
+
+    def liberar(self):
+        self._conexion.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def obtener_pool() -> PoolConexiones:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                host = os.getenv('DB_HOST', 'localhost')
+                port = int(os.getenv('DB_PORT', 3306))
+                user = os.getenv('DB_USER', 'root')
+                password = os.getenv('DB_PASSWORD', '')
+                database = os.getenv('DB_NAME', '')
+                print(f"Creando pool MySQL: host={host}, port={port}, user={user}, password={'*' * len(password)}, database={database}, tamano={DB_CONFIG['pool_size']}")
+                _pool = PoolConexiones(
+                    tamano=DB_CONFIG['pool_size'],
+                    max_overflow=DB_CONFIG.get('pool_max_overflow', 0),
+                    timeout=DB_CONFIG.get('pool_timeout', 10),
+                    reciclaje=DB_CONFIG['pool_recycle'],
+                    ping_intervalo=DB_CONFIG.get('pool_ping_intervalo', 30),
+                    host=host,
+                    port=port,
+                    user=user,
+                    password=password,
+                    database=database
+                )
+    return _pool
+
+
+def obtener_conexion_pool():
     try:
-        host = os.getenv('DB_HOST', 'localhost')
-        port = int(os.getenv('DB_PORT', 3306))
-        user = os.getenv('DB_USER', 'root')
-        password = os.getenv('DB_PASSWORD', '')
-        database = os.getenv('DB_NAME', '')
-        print(f"Intentando conectar a MySQL con: host={host}, port={port}, user={user}, password={'*' * len(password)}, database={database}")
-        connection = mysql.connector.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database
-        )
-        if connection.is_connected():
-            print('Conexión exitosa a la base de datos papasito')
-            return connection
+        return obtener_pool().obtener()
     except Error as e:
         print(f'Error al conectar a MySQL: {e}')
         return None
 
+
+def get_connection():
+    """Dentro de una petición devuelve la conexión de la petición; fuera, una del pool"""
+    if not has_request_context():
+        return obtener_conexion_pool()
+    conexion = g.get('_conexion_bd')
+    if conexion is None:
+        pooled = obtener_conexion_pool()
+        if not pooled:
+            return None
+        conexion = g._conexion_bd = ConexionPeticion(pooled)
+    return conexion
+
+
+def despues_de_confirmar(funcion):
+    """Ejecuta `funcion` cuando se confirme la transacción de la petición actual
+
+    Sirve para invalidar cachés sin que otra petición vuelva a leer los datos
+    viejos antes del commit. Si la transacción se revierte no se ejecuta;
+    fuera de una petición (sin transacción diferida) se ejecuta enseguida.
+    """
+    if has_request_context() and g.get('_conexion_bd') is not None:
+        g.setdefault('_despues_de_confirmar', []).append(funcion)
+    else:
+        funcion()
+
+
+def revertir_peticion():
+    """Revierte la transacción de la petición actual al terminar, aunque la respuesta sea exitosa
+
+    Para los handlers que atrapan un error y aun así responden 2xx: sin esto
+    se confirmarían las escrituras hechas antes del error.
+    """
+    if has_request_context():
+        g._revertir_peticion = True
+
+
+_puntos_de_guardado = itertools.count(1)
+
+
+@contextmanager
+def punto_de_guardado(conn):
+    """Si el bloque falla deshace solo sus escrituras (SAVEPOINT) y relanza el error
+
+    Para pasos secundarios cuyo fallo se ignora, así no queda la mitad de sus
+    escrituras en la transacción. Si el servidor ya revirtió la transacción
+    entera (un deadlock), no hay savepoint al que volver y se revierte la
+    petición completa.
+    """
+    nombre = f'sp_{next(_puntos_de_guardado)}'
+    cursor = conn.cursor()
+    cursor.execute(f'SAVEPOINT {nombre}')
+    try:
+        yield
+    except Exception:
+        try:
+            cursor.execute(f'ROLLBACK TO SAVEPOINT {nombre}')
+        except Error:
+            revertir_peticion()
+        raise
+    else:
+        try:
+            cursor.execute(f'RELEASE SAVEPOINT {nombre}')
+        except Error:
+            revertir_peticion()
+            raise
+
+
+def registrar_conexion_peticion(app):
+    """Confirma la transacción de la petición una sola vez y libera su conexión
+
+    Se revierte si la respuesta es 4xx/5xx o si el handler llamó a revertir_peticion().
+    """
+
+    @app.after_request
+    def confirmar_conexion_peticion(response):
+        conexion = g.get('_conexion_bd')
+        if conexion is None:
+            return response
+        try:
+            if response.status_code < 400 and not g.pop('_revertir_peticion', False):
+                conexion.confirmar()
+                for funcion in g.pop('_despues_de_confirmar', []):
+                    funcion()
+            else:
+                conexion.rollback()
+        except Error as e:
+            conexion.rollback()
+            response = app.response_class(
+                response=json.dumps({'error': f'Error confirmando la transacción: {e}'}),
+                status=500,
+                mimetype='application/json'
+            )
+        return response
+
+    @app.teardown_request
+    def liberar_conexion_peticion(exc):
+        conexion = g.pop('_conexion_bd', None)
+        if conexion is None:
+            return
+        if exc is not None:
+            try:
+                conexion.rollback()
+            except Error:
+                pass
+        conexion.liberar()
+
+
+def obtener_estadisticas_pool() -> dict:
+    return obtener_pool().estadisticas()
+
+
 if __name__ == '__main__':
     conn = get_connection()
     if conn:
         conn.close()
-        print('Conexión cerrada')
+        print('Conexión devuelta al pool')
+        print(obtener_estadisticas_pool())
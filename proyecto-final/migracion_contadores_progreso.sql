@@ -0,0 +1,16 @@
+-- Contadores de progreso mantenidos por el backend (ver progreso_curso.py)
+-- Por matrícula: lecciones completadas, módulos con progreso y evaluaciones
+-- Los totales por curso no se guardan: los calcula CacheTotalesCurso
+-- Los valores iniciales los completa python reconciliacion_progreso.py, que
+-- conviene correr después de aplicar esta migración.
+-- migraciones.py (versión 4) aplica los mismos cambios solo si faltan.
+
+USE proyecto;
+
+ALTER TABLE Matriculas
+    ADD COLUMN Lecciones_completadas INT NOT NULL DEFAULT 0,
+    ADD COLUMN Modulos_con_progreso INT NOT NULL DEFAULT 0,
+    ADD COLUMN Evaluaciones_realizadas INT NOT NULL DEFAULT 0,
+    ADD COLUMN Evaluaciones_aprobadas INT NOT NULL DEFAULT 0,
+    ADD COLUMN Intentos_evaluaciones INT NOT NULL DEFAULT 0,
+    ADD COLUMN Suma_puntajes DECIMAL(12,2) NOT NULL DEFAULT 0;
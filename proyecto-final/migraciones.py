@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Migraciones versionadas de la base de datos.
+
+Cada migración tiene un número de versión y una lista de pasos idempotentes:
+crear las tablas de un script .sql (solo sus CREATE TABLE IF NOT EXISTS),
+agregar una columna si falta o crear un índice si ninguno existente empieza
+por las mismas columnas. Así se puede aplicar tanto a una base nueva como a
+una donde ya se corrieron a mano los scripts .sql. Las versiones aplicadas
+se registran en Migraciones_Aplicadas.
+
+--verificar ejecuta EXPLAIN sobre las consultas frecuentes de la aplicación
+(tomadas de los mismos módulos que usa app.py) y termina con error si alguna
+recorre completa una de las tablas que crecen con los estudiantes. Conviene
+correrlo con datos representativos: con tablas casi vacías el optimizador
+puede elegir el recorrido completo aunque exista el índice.
+
+Uso:
+    python migraciones.py              aplica las migraciones pendientes
+    python migraciones.py --estado     lista las migraciones y si están aplicadas
+    python migraciones.py --verificar  revisa los planes de las consultas frecuentes
+"""
+
+import argparse
+import os
+import sys
+
+from cache_evaluaciones import CacheClavesRespuestas
+from caracteristicas_estudiante import consultar_caracteristicas
+from consultas_progreso import (estadisticas_evaluaciones_profesor, evaluaciones_curso_con_resultados,
+                                progreso_detallado_estudiante, progreso_modulos_estudiante)
+from progreso_curso import CacheTotalesCurso, marcar_leccion
+
+# MySQL la actualiza sola al insertar o modificar la fila
+DEFINICION_FECHA_MODIFICACION = 'TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)'
+
+# Pasos: ('tablas', archivo.sql), ('columna', tabla, columna, definición) o ('indice', tabla, nombre, columnas)
+MIGRACIONES = [
+    (1, 'Descripción de las lecciones', [
+        ('columna', 'Lecciones', 'Descripcion', 'TEXT AFTER Nombre')
+    ]),
+    (2, 'Tablas de preguntas, opciones y respuestas', [
+        ('tablas', 'crear_tablas_preguntas.sql')
+    ]),
+    (3, 'Tabla Features_Estudiante', [
+        ('tablas', 'crear_tabla_features_estudiante.sql')
+    ]),
+    (4, 'Contadores de progreso por matrícula', [
+        ('columna', 'Matriculas', 'Lecciones_completadas', 'INT NOT NULL DEFAULT 0'),
+        ('columna', 'Matriculas', 'Modulos_con_progreso', 'INT NOT NULL DEFAULT 0'),
+        ('columna', 'Matriculas', 'Evaluaciones_realizadas', 'INT NOT NULL DEFAULT 0'),
+        ('columna', 'Matriculas', 'Evaluaciones_aprobadas', 'INT NOT NULL DEFAULT 0'),
+        ('columna', 'Matriculas', 'Intentos_evaluaciones', 'INT NOT NULL DEFAULT 0'),
+        ('columna', 'Matriculas', 'Suma_puntajes', 'DECIMAL(12,2) NOT NULL DEFAULT 0')
+    ]),
+    (5, 'Índices de las consultas frecuentes', [
+        # Intentos y mejor puntaje al responder; evaluaciones aprobadas por estudiante
+        ('indice', 'Resultados_Evaluaciones', 'idx_resultados_estudiante_evaluacion',
+         ['ID_Estudiante', 'ID_Evaluacion', 'Puntaje']),
+        # Intentos, promedio y aprobados por evaluación (vista del profesor)
+        ('indice', 'Resultados_Evaluaciones', 'idx_resultados_evaluacion',
+         ['ID_Evaluacion', 'Aprobado', 'Puntaje']),
+        # Estado de una lección por estudiante y lecciones completadas por módulo
+        ('indice', 'Progreso_Lecciones', 'idx_progreso_estudiante_leccion',
+         ['ID_Estudiante', 'ID_Leccion', 'Completado']),
+        ('indice', 'Matriculas', 'idx_matriculas_estudiante_curso', ['ID_Estudiante', 'ID_Curso']),
+        # Lista de estudiantes del curso ordenada (progreso del curso para el profesor)
+        ('indice', 'Matriculas', 'idx_matriculas_curso_estudiante', ['ID_Curso', 'ID_Estudiante']),
+        # Las dos ramas de evaluaciones_por_modulo (consultas_progreso.py)
+        ('indice', 'Evaluaciones', 'idx_evaluaciones_leccion', ['ID_Leccion']),
+        ('indice', 'Evaluaciones', 'idx_evaluaciones_modulo', ['ID_Modulo', 'ID_Leccion']),
+        ('indice', 'Accesos_Recursos', 'idx_accesos_estudiante_recurso', ['ID_Estudiante', 'ID_Recurso']),
+        ('indice', 'Recursos', 'idx_recursos_leccion_orden', ['ID_Leccion', 'Orden']),
+        ('indice', 'Lecciones', 'idx_lecciones_modulo_orden', ['ID_Modulo', 'Orden']),
+        ('indice', 'Modulos', 'idx_modulos_curso_orden', ['ID_Curso', 'Orden']),
+        ('indice', 'Cursos', 'idx_cursos_profesor', ['ID_Profesor']),
+        ('indice', 'preguntas', 'idx_preguntas_evaluacion_orden', ['id_evaluacion', 'orden']),
+        ('indice', 'opciones', 'idx_opciones_pregunta_orden', ['id_pregunta', 'orden'])
+    ]),
+    (6, 'Fecha de modificación de la estructura (snapshot incremental de app.py)', [
+        # Las filas modificadas desde el snapshot se leen por esta columna
+        ('columna', 'Cursos', 'Fecha_modificacion', DEFINICION_FECHA_MODIFICACION),
+        ('columna', 'Modulos', 'Fecha_modificacion', DEFINICION_FECHA_MODIFICACION),
+        ('columna', 'Lecciones', 'Fecha_modificacion', DEFINICION_FECHA_MODIFICACION),
+        ('columna', 'Evaluaciones', 'Fecha_modificacion', DEFINICION_FECHA_MODIFICACION),
+        ('columna', 'Recursos', 'Fecha_modificacion', DEFINICION_FECHA_MODIFICACION),
+        ('indice', 'Cursos', 'idx_cursos_modificacion', ['Fecha_modificacion']),
+        ('indice', 'Modulos', 'idx_modulos_modificacion', ['Fecha_modificacion']),
+        ('indice', 'Lecciones', 'idx_lecciones_modificacion', ['Fecha_modificacion']),
+        ('indice', 'Evaluaciones', 'idx_evaluaciones_modificacion', ['Fecha_modificacion']),
+        ('indice', 'Recursos', 'idx_recursos_modificacion', ['Fecha_modificacion'])
+    ])
+]
+
+# Tablas que crecen con los estudiantes: un recorrido completo en ellas es una regresión
+TABLAS_VIGILADAS = {'Resultados_Evaluaciones', 'Progreso_Lecciones', 'Matriculas', 'Accesos_Recursos',
+                    'Recursos', 'Evaluaciones', 'Lecciones', 'preguntas', 'opciones', 'respuestas_estudiantes'}
+
+# ============================================================================
+# Aplicación de migraciones
+# ============================================================================
+
+def crear_tabla_migraciones(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Migraciones_Aplicadas (
+            Version INT PRIMARY KEY,
+            Descripcion VARCHAR(200) NOT NULL,
+            Fecha_aplicacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def versiones_aplicadas(cursor):
+    cursor.execute('SELECT Version FROM Migraciones_Aplicadas')
+    return {fila[0] for fila in cursor.fetchall()}
+
+def sentencias_tablas(archivo):
+    """CREATE TABLE IF NOT EXISTS de un script .sql (se ignoran USE, índices y mensajes)"""
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), archivo)
+    with open(ruta, encoding='utf-8') as f:
+        lineas = [linea for linea in f if not linea.lstrip().startswith('--')]
+    sentencias = (sentencia.strip() for sentencia in ''.join(lineas).split(';'))
+    return [sentencia for sentencia in sentencias if sentencia.upper().startswith('CREATE TABLE IF NOT EXISTS')]
+
+def columna_existe(cursor, tabla, columna):
+    cursor.execute('''
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    ''', (tabla, columna))
+    return cursor.fetchone()[0] > 0
+
+def indices_de(cursor, tabla):
+    """{nombre: [columnas en orden]} de los índices de la tabla"""
+    cursor.execute('''
+        SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+    ''', (tabla,))
+    indices = {}
+    for nombre, columna in cursor.fetchall():
+        indices.setdefault(nombre, []).append(columna.lower())
+    return indices
+
+def aplicar_paso(cursor, paso):
+    """Aplica un paso si hace falta; devuelve una descripción de lo hecho o None si ya estaba"""
+    tipo = paso[0]
+    if tipo == 'tablas':
+        for sentencia in sentencias_tablas(paso[1]):
+            cursor.execute(sentencia)
+        return f'tablas de {paso[1]}'
+    if tipo == 'columna':
+        _, tabla, columna, definicion = paso
+        if columna_existe(cursor, tabla, columna):
+            return None
+        cursor.execute(f'ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}')
+        return f'columna {tabla}.{columna}'
+    if tipo == 'indice':
+        _, tabla, nombre, columnas = paso
+        buscadas = [columna.lower() for columna in columnas]
+        existentes = indices_de(cursor, tabla)
+        if nombre in existentes or any(cols[:len(buscadas)] == buscadas for cols in existentes.values()):
+            return None
+        cursor.execute(f"CREATE INDEX {nombre} ON {tabla} ({', '.join(columnas)})")
+        return f'índice {nombre} en {tabla}'
+    raise ValueError(f'Tipo de paso desconocido: {tipo}')
+
+def migrar(conn):
+    """Aplica en orden las migraciones pendientes; devuelve las versiones aplicadas"""
+    cursor = conn.cursor()
+    crear_tabla_migraciones(cursor)
+    aplicadas = versiones_aplicadas(cursor)
+    nuevas = []
+    for version, descripcion, pasos in MIGRACIONES:
+        if version in aplicadas:
+            continue
+        print(f'▶ {version}: {descripcion}')
+        for paso in pasos:
+            hecho = aplicar_paso(cursor, paso)
+            if hecho:
+                print(f'   + {hecho}')
+        cursor.execute('INSERT INTO Migraciones_Aplicadas (Version, Descripcion) VALUES (%s, %s)',
+                       (version, descripcion))
+        conn.commit()
+        nuevas.append(version)
+    return nuevas
+
+# ============================================================================
+# Verificación de planes de ejecución
+# ============================================================================
+
+class ConexionRegistro:
+    """Conexión que solo anota las consultas que recibe y devuelve resultados vacíos"""
+
+    rowcount = 0
+
+    def __init__(self):
+        self.consultas = []
+
+    def cursor(self, dictionary=False, **kwargs):
+        return self
+
+    def execute(self, sql, parametros=()):
+        self.consultas.append((sql, tuple(parametros)))
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        return None
+
+def _consulta(sql):
+    def ejecutar(conn):
+        conn.cursor().execute(sql, (1,) * sql.count('%s'))
+    return ejecutar
+
+# Consultas frecuentes: nombre y función que las ejecuta sobre una conexión (con IDs de ejemplo)
+CONSULTAS_FRECUENTES = [
+    ('Intentos previos al responder', _consulta('''
+        SELECT COUNT(*) as intentos_realizados, MAX(Puntaje) as mejor_puntaje
+        FROM Resultados_Evaluaciones WHERE ID_Estudiante = %s AND ID_Evaluacion = %s
+    ''')),
+    ('Clave de respuestas', lambda conn: CacheClavesRespuestas._cargar(conn, 1)),
+    ('Estado anterior de la lección', lambda conn: marcar_leccion(conn, 1, 1, True)),
+    ('Progreso del curso', _consulta('''
+        SELECT c.ID_Curso, m.Lecciones_completadas
+        FROM Cursos c
+        LEFT JOIN Matriculas m ON m.ID_Curso = c.ID_Curso AND m.ID_Estudiante = %s
+        WHERE c.ID_Curso = %s
+    ''')),
+    ('Progreso del curso para el profesor', _consulta('''
+        SELECT m.ID_Estudiante, m.Lecciones_completadas FROM Matriculas m
+        WHERE m.ID_Curso = %s ORDER BY m.ID_Estudiante LIMIT 50
+    ''')),
+    ('Totales del curso', lambda conn: CacheTotalesCurso._cargar(conn, 1)),
+    ('Progreso por módulo', lambda conn: progreso_modulos_estudiante(conn, 1, 1)),
+    ('Detalle del estudiante', lambda conn: progreso_detallado_estudiante(conn, 1, 1)),
+    ('Evaluaciones del curso', lambda conn: evaluaciones_curso_con_resultados(conn, 1)),
+    ('Estadísticas de evaluaciones', lambda conn: estadisticas_evaluaciones_profesor(conn, 1)),
+    ('Características del estudiante', lambda conn: consultar_caracteristicas(conn, estudiante_id=1)),
+    ('Recursos de la lección', _consulta('SELECT * FROM Recursos WHERE ID_Leccion = %s ORDER BY Orden')),
+    ('Acceso a recurso', _consulta('''
+        SELECT * FROM Accesos_Recursos WHERE ID_Estudiante = %s AND ID_Recurso = %s
+    '''))
+]
+
+def recorridos_completos(conn, sql, parametros):
+    """Tablas vigiladas que el plan de la consulta recorre completas"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f'EXPLAIN {sql}', parametros)
+    return sorted({fila['table'] for fila in cursor.fetchall()
+                   if fila['table'] in TABLAS_VIGILADAS and fila['type'] == 'ALL'})
+
+def verificar_planes(conn):
+    """EXPLAIN de las consultas frecuentes; devuelve la lista de (consulta, tablas recorridas completas)"""
+    regresiones = []
+    for nombre, ejecutar in CONSULTAS_FRECUENTES:
+        registro = ConexionRegistro()
+        try:
+            ejecutar(registro)
+        except Exception:
+            pass  # el procesamiento de los resultados vacíos puede fallar; las consultas ya quedaron anotadas
+        tablas = set()
+        for sql, parametros in registro.consultas:
+            if sql.lstrip().upper().startswith('SELECT'):
+                tablas.update(recorridos_completos(conn, sql, parametros))
+        print(f"{'❌' if tablas else '✅'} {nombre}" + (f": recorre completa {', '.join(sorted(tablas))}" if tablas else ''))
+        if tablas:
+            regresiones.append((nombre, sorted(tablas)))
+    return regresiones
+
+def main():
+    from db_connect import get_connection
+
+    parser = argparse.ArgumentParser(description='Aplica las migraciones versionadas de la base de datos')
+    parser.add_argument('--estado', action='store_true', help='lista las migraciones y si están aplicadas')
+    parser.add_argument('--verificar', action='store_true', help='revisa los planes de las consultas frecuentes')
+    args = parser.parse_args()
+
+    conn = get_connection()
+    if not conn:
+        print('❌ No se pudo conectar a la base de datos')
+        sys.exit(1)
+    try:
+        if args.verificar:
+            regresiones = verificar_planes(conn)
+            if regresiones:
+                print(f'❌ {len(regresiones)} consultas frecuentes recorren tablas completas')
+                sys.exit(1)
+            print('✅ Todas las consultas frecuentes usan índices')
+        elif args.estado:
+            cursor = conn.cursor()
+            crear_tabla_migraciones(cursor)
+            aplicadas = versiones_aplicadas(cursor)
+            for version, descripcion, _ in MIGRACIONES:
+                print(f"{'✅' if version in aplicadas else '⏳'} {version}: {descripcion}")
+        else:
+            nuevas = migrar(conn)
+            print(f'✅ Migraciones aplicadas: {nuevas}' if nuevas else '✅ La base de datos está al día')
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
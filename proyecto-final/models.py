@@ -3,31 +3,66 @@ Modelos orientados a objetos para el sistema de gestión de estudiantes
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+import ast
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 from datetime import datetime
+import bisect
+import heapq
 import json
+import marshal
+import mmap
+import operator
+import os
+import re
+import struct
+import time
+import unicodedata
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: ArbolDecision.evaluar_lote usa listas sin él
+    np = None
+
+# Formato del snapshot binario de GestorContenido: magia, versión, longitud y CRC32 de los datos
+SNAPSHOT_MAGIA = b'GCSN'
+SNAPSHOT_VERSION = 3
+SNAPSHOT_CABECERA = struct.Struct('<4sHII')
 
 class NodoContenido(ABC):
     """Clase abstracta base para todos los nodos de contenido"""
     
+    # Atributos que no forman parte del diccionario serializado
+    _ATRIBUTOS_NO_SERIALIZADOS = frozenset({'hijos', 'gestor'})
+    
     def __init__(self, id: int, nombre: str, orden: int = 0):
         self.id = id
         self.nombre = nombre
         self.orden = orden
         self.hijos: List['NodoContenido'] = []
         self.padre: Optional['NodoContenido'] = None
+        self.gestor: Optional['GestorContenido'] = None  # Gestor cuyos índices contienen este nodo
+        self._dict_cache: Optional[Dict[str, Any]] = None  # Resultado memorizado de to_dict()
     
     def agregar_hijo(self, hijo: 'NodoContenido') -> None:
         """Agrega un nodo hijo a este nodo"""
         hijo.padre = self
         self.hijos.append(hijo)
-        self.hijos.sort(key=lambda x: x.orden)
+        # Solo reordenar si el nuevo hijo rompe el orden (las cargas masivas llegan ordenadas)
+        if len(self.hijos) > 1 and hijo.orden < self.hijos[-2].orden:
+            self.hijos.sort(key=lambda x: x.orden)
+        if self.gestor:
+            self.gestor._indexar(hijo)
+        self.invalidar()
     
     def eliminar_hijo(self, hijo_id: int) -> bool:
         """Elimina un nodo hijo por ID"""
         for i, hijo in enumerate(self.hijos):
             if hijo.id == hijo_id:
                 del self.hijos[i]
+                if self.gestor:
+                    self.gestor._desindexar(hijo)
+                self.invalidar()
                 return True
         return False
     
@@ -84,8 +119,41 @@ class NodoContenido(ABC):
             total += hijo.contar_hijos()
         return total
     
+    def __setattr__(self, nombre: str, valor: Any) -> None:
+        super().__setattr__(nombre, valor)
+        if nombre.startswith('_') or nombre in self._ATRIBUTOS_NO_SERIALIZADOS or '_dict_cache' not in self.__dict__:
+            return
+        if nombre in ('nombre', 'padre'):
+            # La ruta y la profundidad de los descendientes dependen de estos atributos
+            for hijo in self.hijos:
+                hijo._invalidar_subarbol()
+        if nombre in ('nombre', 'descripcion') and self.gestor:
+            self.gestor.reindexar(self)
+        self.invalidar()
+    
+    def invalidar(self) -> None:
+        """Descarta el diccionario memorizado de este nodo y de sus ancestros"""
+        nodo = self
+        while nodo is not None:
+            nodo._dict_cache = None
+            nodo = nodo.padre
+    
+    def _invalidar_subarbol(self) -> None:
+        self._dict_cache = None
+        for hijo in self.hijos:
+            hijo._invalidar_subarbol()
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convierte el nodo a diccionario para serialización"""
+        """Convierte el nodo a diccionario para serialización
+
+        El resultado se memoriza hasta que el nodo o un descendiente cambia;
+        es compartido, así que no debe modificarse.
+        """
+        if self._dict_cache is None:
+            self._dict_cache = self._construir_dict()
+        return self._dict_cache
+    
+    def _construir_dict(self) -> Dict[str, Any]:
         return {
             'id': self.id,
             'nombre': self.nombre,
@@ -95,6 +163,35 @@ class NodoContenido(ABC):
             'profundidad': self.obtener_profundidad(),
             'ruta': self.obtener_ruta()
         }
+    
+    def atributos(self) -> Dict[str, Any]:
+        """Atributos propios del nodo, sin hijos ni datos derivados"""
+        return {
+            'id': self.id,
+            'nombre': self.nombre,
+            'orden': self.orden,
+            'tipo': self.__class__.__name__
+        }
+    
+    def serializar(self, campos: Optional[List[str]] = None, profundidad: Optional[int] = None,
+                   ruta: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Serializa el subárbol con una única clave 'hijos'
+
+        `campos` limita las claves de cada nodo (None = todas) y `profundidad`
+        los niveles de hijos incluidos (None = todos, 0 = solo el nodo). La
+        ruta se arrastra desde el padre en lugar de recalcularse por nodo.
+        """
+        if ruta is None:
+            ruta = self.obtener_ruta()
+        datos = self.atributos()
+        datos['profundidad'] = len(ruta) - 1
+        datos['ruta'] = ruta
+        if campos is not None:
+            datos = {campo: datos[campo] for campo in campos if campo in datos}
+        if profundidad is None or profundidad > 0:
+            siguiente = None if profundidad is None else profundidad - 1
+            datos['hijos'] = [hijo.serializar(campos, siguiente, ruta + [hijo.nombre]) for hijo in self.hijos]
+        return datos
 
 class Curso(NodoContenido):
     """Clase para representar un curso"""
@@ -115,9 +212,9 @@ class Curso(NodoContenido):
         """Obtiene todos los módulos del curso"""
         return [hijo for hijo in self.hijos if isinstance(hijo, Modulo)]
     
-    def to_dict(self) -> Dict[str, Any]:
+    def _construir_dict(self) -> Dict[str, Any]:
         """Convierte el curso a diccionario"""
-        base_dict = super().to_dict()
+        base_dict = super()._construir_dict()
         base_dict.update({
             'duracion_estimada': self.duracion_estimada,
             'id_profesor': self.id_profesor,
@@ -126,6 +223,18 @@ class Curso(NodoContenido):
             'modulos': [modulo.to_dict() for modulo in self.obtener_modulos()]
         })
         return base_dict
+    
+    def atributos(self) -> Dict[str, Any]:
+        """Atributos propios del curso"""
+        base = super().atributos()
+        base.update({
+            'descripcion': self.descripcion,
+            'duracion_estimada': self.duracion_estimada,
+            'id_profesor': self.id_profesor,
+            'estado': self.estado,
+            'fecha_creacion': self.fecha_creacion.isoformat()
+        })
+        return base
 
 class Modulo(NodoContenido):
     """Clase para representar un módulo"""
@@ -144,9 +253,9 @@ class Modulo(NodoContenido):
         """Obtiene todas las lecciones del módulo"""
         return [hijo for hijo in self.hijos if isinstance(hijo, Leccion)]
     
-    def to_dict(self) -> Dict[str, Any]:
+    def _construir_dict(self) -> Dict[str, Any]:
         """Convierte el módulo a diccionario"""
-        base_dict = super().to_dict()
+        base_dict = super()._construir_dict()
         base_dict.update({
             'descripcion': self.descripcion,
             'duracion_estimada': self.duracion_estimada,
@@ -154,6 +263,16 @@ class Modulo(NodoContenido):
             'lecciones': [leccion.to_dict() for leccion in self.obtener_lecciones()]
         })
         return base_dict
+    
+    def atributos(self) -> Dict[str, Any]:
+        """Atributos propios del módulo"""
+        base = super().atributos()
+        base.update({
+            'descripcion': self.descripcion,
+            'duracion_estimada': self.duracion_estimada,
+            'id_curso': self.id_curso
+        })
+        return base
 
 class Examen:
     """Clase para representar un examen asociado a una lección o módulo"""
@@ -249,14 +368,22 @@ class Leccion(NodoContenido):
     
     def agregar_recurso(self, recurso: 'Recurso') -> None:
         """Agrega un recurso a la lección"""
+        recurso.id_leccion = self.id
         self.recursos.append(recurso)
-        self.recursos.sort(key=lambda x: x.orden)
+        if len(self.recursos) > 1 and recurso.orden < self.recursos[-2].orden:
+            self.recursos.sort(key=lambda x: x.orden)
+        if self.gestor:
+            self.gestor._indexar_recurso(recurso)
+        self.invalidar()
     
     def eliminar_recurso(self, recurso_id: int) -> bool:
         """Elimina un recurso por ID"""
         for i, recurso in enumerate(self.recursos):
             if recurso.id == recurso_id:
                 del self.recursos[i]
+                if self.gestor:
+                    self.gestor._desindexar_recurso(recurso)
+                self.invalidar()
                 return True
         return False
     
@@ -265,9 +392,9 @@ class Leccion(NodoContenido):
         return [recurso for recurso in self.recursos 
                 if nombre_buscar.lower() in recurso.nombre.lower()]
     
-    def to_dict(self) -> Dict[str, Any]:
+    def _construir_dict(self) -> Dict[str, Any]:
         """Convierte la lección a diccionario"""
-        base_dict = super().to_dict()
+        base_dict = super()._construir_dict()
         base_dict.update({
             'descripcion': self.descripcion,
             'contenido': self.contenido,
@@ -278,6 +405,20 @@ class Leccion(NodoContenido):
             'evaluaciones': getattr(self, 'evaluaciones', [])
         })
         return base_dict
+    
+    def atributos(self) -> Dict[str, Any]:
+        """Atributos propios de la lección, incluidos sus recursos y evaluaciones"""
+        base = super().atributos()
+        base.update({
+            'descripcion': self.descripcion,
+            'contenido': self.contenido,
+            'duracion_estimada': self.duracion_estimada,
+            'id_modulo': self.id_modulo,
+            'es_obligatoria': self.es_obligatoria,
+            'recursos': [recurso.to_dict() for recurso in self.recursos],
+            'evaluaciones': getattr(self, 'evaluaciones', [])
+        })
+        return base
 
 class Recurso:
     """Clase para representar un recurso de aprendizaje"""
@@ -290,6 +431,7 @@ class Recurso:
         self.url = url
         self.orden = orden
         self.duracion = duracion  # Para videos
+        self.id_leccion: Optional[int] = None  # Se asigna al agregarlo a una lección
         self.fecha_creacion = datetime.now()
     
     def to_dict(self) -> Dict[str, Any]:
@@ -304,11 +446,167 @@ class Recurso:
             'fecha_creacion': self.fecha_creacion.isoformat()
         }
 
+class CondicionRegla:
+    """Condición de una regla de recomendación compilada desde un AST restringido
+
+    El texto se analiza una sola vez con ast (nunca con eval) y solo admite
+    nombres de características, números, aritmética (+ - * /), comparaciones,
+    and/or/not y paréntesis. Como en el árbol original, una característica
+    ausente vale 0 y la división usa max(divisor, 1).
+    Se generan dos evaluadores: uno para un estudiante (recibe una función
+    que obtiene cada característica) y otro para columnas de NumPy.
+    """
+    
+    COMPARADORES = {
+        ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt,
+        ast.GtE: operator.ge, ast.Eq: operator.eq, ast.NotEq: operator.ne
+    }
+    ARITMETICOS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul}
+    
+    def __init__(self, texto: str):
+        self.texto = texto
+        self.caracteristicas: set = set()
+        try:
+            expresion = ast.parse(texto.strip(), mode='eval').body
+        except SyntaxError as e:
+            raise ValueError(f'Condición inválida "{texto}": {e.msg}')
+        self.evaluar = self._compilar(expresion, vectorial=False)
+        self.evaluar_vector = self._compilar(expresion, vectorial=True) if np is not None else None
+    
+    def _compilar(self, nodo: ast.AST, vectorial: bool):
+        if isinstance(nodo, ast.Name):
+            nombre = nodo.id
+            self.caracteristicas.add(nombre)
+            if vectorial:
+                return lambda columnas: columnas[nombre]
+            return lambda obtener: obtener(nombre) or 0
+        
+        if isinstance(nodo, ast.Constant) and type(nodo.value) in (int, float):
+            valor = nodo.value
+            return lambda _: valor
+        
+        if isinstance(nodo, ast.BinOp) and type(nodo.op) in self.ARITMETICOS:
+            op = self.ARITMETICOS[type(nodo.op)]
+            izquierda, derecha = self._compilar(nodo.left, vectorial), self._compilar(nodo.right, vectorial)
+            return lambda datos: op(izquierda(datos), derecha(datos))
+        
+        if isinstance(nodo, ast.BinOp) and isinstance(nodo.op, ast.Div):
+            izquierda, derecha = self._compilar(nodo.left, vectorial), self._compilar(nodo.right, vectorial)
+            if vectorial:
+                return lambda columnas: izquierda(columnas) / np.maximum(derecha(columnas), 1)
+            return lambda obtener: izquierda(obtener) / max(derecha(obtener), 1)
+        
+        if isinstance(nodo, ast.UnaryOp) and isinstance(nodo.op, (ast.USub, ast.UAdd)):
+            operando = self._compilar(nodo.operand, vectorial)
+            if isinstance(nodo.op, ast.UAdd):
+                return operando
+            return lambda datos: -operando(datos)
+        
+        if isinstance(nodo, ast.UnaryOp) and isinstance(nodo.op, ast.Not):
+            operando = self._compilar(nodo.operand, vectorial)
+            if vectorial:
+                return lambda columnas: np.logical_not(operando(columnas))
+            return lambda obtener: not operando(obtener)
+        
+        if isinstance(nodo, ast.Compare) and all(type(op) in self.COMPARADORES for op in nodo.ops):
+            terminos = [self._compilar(t, vectorial) for t in [nodo.left] + nodo.comparators]
+            pasos = [(self.COMPARADORES[type(op)], terminos[i], terminos[i + 1]) for i, op in enumerate(nodo.ops)]
+            if len(pasos) == 1:
+                op, izquierda, derecha = pasos[0]
+                umbral = nodo.comparators[0]
+                if not vectorial and isinstance(umbral, ast.Constant):
+                    # Caso más común ("caracteristica < 70"): comparar contra el número directamente
+                    valor = umbral.value
+                    if isinstance(nodo.left, ast.Name):
+                        nombre = nodo.left.id
+                        return lambda obtener: op(obtener(nombre) or 0, valor)
+                    return lambda obtener: op(izquierda(obtener), valor)
+                return lambda datos: op(izquierda(datos), derecha(datos))
+            if vectorial:
+                return lambda columnas: np.logical_and.reduce([op(a(columnas), b(columnas)) for op, a, b in pasos])
+            return lambda obtener: all(op(a(obtener), b(obtener)) for op, a, b in pasos)
+        
+        if isinstance(nodo, ast.BoolOp):
+            operandos = [self._compilar(v, vectorial) for v in nodo.values]
+            es_and = isinstance(nodo.op, ast.And)
+            if vectorial:
+                combinar = np.logical_and if es_and else np.logical_or
+                return lambda columnas: combinar.reduce([f(columnas) for f in operandos])
+            if es_and:
+                return lambda obtener: all(f(obtener) for f in operandos)
+            return lambda obtener: any(f(obtener) for f in operandos)
+        
+        raise ValueError(f'Elemento no permitido en la condición "{self.texto}": {type(nodo).__name__}')
+
 class ArbolDecision:
-    """Clase para representar el árbol binario de decisión"""
+    """Clase para representar el árbol binario de decisión
+
+    Para evaluar, el árbol se compila una vez a arreglos planos indexados
+    por nodo (condición compilada, hijo izquierdo y derecho, resultado), así
+    cada evaluación es un bucle sin interpretar cadenas. La compilación se
+    rehace al cambiar la raíz o agregar nodos; si se modifican nodos ya
+    enlazados hay que llamar a recompilar().
+    """
+    
+    RESULTADO_VACIO = {
+        'recomendacion': 'Continúa con tu aprendizaje',
+        'tipo': 'general',
+        'prioridad': 'baja'
+    }
+    
+    def __init__(self, version: str = 'predefinido'):
+        self._raiz: Optional['NodoDecision'] = None
+        self._compilado: Optional[Dict[str, Any]] = None
+        self.version = version
+    
+    @classmethod
+    def desde_reglas(cls, reglas: List[Dict[str, Any]], version: str) -> 'ArbolDecision':
+        """Construye y compila el árbol a partir de las filas de Reglas_Recomendacion
+
+        La raíz es la regla sin Nodo_padre_id; Nodo_verdadero_id es la rama
+        izquierda (condición cumplida) y Nodo_falso_id la derecha. Lanza
+        ValueError si una referencia no existe, hay ciclos o una condición no
+        es válida, para que el árbol vigente no se reemplace por uno roto.
+        """
+        nodos = {}
+        for regla in reglas:
+            es_final = bool(regla['Es_nodo_final'])
+            nodos[regla['ID_Regla']] = NodoDecision(
+                regla['ID_Regla'],
+                '' if es_final else (regla['Condicion'] or ''),
+                regla['Accion_recomendada'] or '',
+                'general',
+                regla['Prioridad']
+            )
+        raices = [regla['ID_Regla'] for regla in reglas if regla['Nodo_padre_id'] is None]
+        if not raices:
+            raise ValueError('No hay una regla raíz (sin Nodo_padre_id)')
+        
+        for regla in reglas:
+            if regla['Es_nodo_final']:
+                continue
+            nodo = nodos[regla['ID_Regla']]
+            for columna, rama in (('Nodo_verdadero_id', 'izquierda'), ('Nodo_falso_id', 'derecha')):
+                hijo_id = regla[columna]
+                if hijo_id is None:
+                    continue
+                if hijo_id not in nodos:
+                    raise ValueError(f'La regla {nodo.id} referencia la regla inexistente {hijo_id}')
+                setattr(nodo, rama, nodos[hijo_id])
+        
+        arbol = cls(version)
+        arbol.raiz = nodos[min(raices, key=lambda id: (nodos[id].prioridad, id))]
+        arbol.recompilar()
+        return arbol
     
-    def __init__(self):
-        self.raiz: Optional['NodoDecision'] = None
+    @property
+    def raiz(self) -> Optional['NodoDecision']:
+        return self._raiz
+    
+    @raiz.setter
+    def raiz(self, nodo: Optional['NodoDecision']) -> None:
+        self._raiz = nodo
+        self._compilado = None
     
     def agregar_nodo(self, nodo: 'NodoDecision') -> None:
         """Agrega un nodo al árbol de decisión"""
@@ -316,6 +614,7 @@ class ArbolDecision:
             self.raiz = nodo
         else:
             self._insertar_nodo(self.raiz, nodo)
+            self._compilado = None
     
     def _insertar_nodo(self, nodo_actual: 'NodoDecision', nuevo_nodo: 'NodoDecision') -> None:
         """Inserta un nodo en el árbol de decisión"""
@@ -330,72 +629,126 @@ class ArbolDecision:
             else:
                 self._insertar_nodo(nodo_actual.derecha, nuevo_nodo)
     
-    def evaluar_estudiante(self, datos_estudiante: Dict[str, Any]) -> Dict[str, Any]:
-        """Evalúa un estudiante y genera una recomendación"""
-        if not self.raiz:
-            return {
-                'recomendacion': 'Continúa con tu aprendizaje',
-                'tipo': 'general',
-                'prioridad': 'baja'
-            }
+    def recompilar(self) -> Dict[str, Any]:
+        """Compila el árbol a arreglos planos; el nodo 0 es la raíz
+
+        Una condición None indica que el nodo no tiene condición (hoja), que
+        se trata como no cumplida; un hijo -1 indica que no hay hijo en esa
+        rama. Lanza ValueError si alguna condición no es válida.
+        """
+        compilado: Dict[str, Any] = {'condicion': [], 'si': [], 'no': [], 'resultado': []}
+        visitados = set()
         
-        return self._evaluar_nodo(self.raiz, datos_estudiante)
-    
-    def _evaluar_nodo(self, nodo: 'NodoDecision', datos: Dict[str, Any]) -> Dict[str, Any]:
-        """Evalúa un nodo del árbol de decisión"""
-        if nodo.es_hoja():
-            return {
-                'recomendacion': nodo.accion,
+        def compilar(nodo: 'NodoDecision') -> int:
+            if id(nodo) in visitados:
+                raise ValueError(f'El nodo {nodo.id} aparece más de una vez en el árbol')
+            visitados.add(id(nodo))
+            i = len(compilado['si'])
+            es_hoja = nodo.es_hoja()
+            compilado['condicion'].append(CondicionRegla(nodo.condicion) if not es_hoja and nodo.condicion else None)
+            compilado['resultado'].append({
+                'recomendacion': nodo.accion if es_hoja else (nodo.accion or self.RESULTADO_VACIO['recomendacion']),
                 'tipo': nodo.tipo,
                 'prioridad': nodo.prioridad,
                 'regla_id': nodo.id
-            }
-        
-        # Evaluar la condición del nodo
-        condicion_cumplida = self._evaluar_condicion(nodo.condicion, datos)
-        
-        if condicion_cumplida:
+            })
+            compilado['si'].append(-1)
+            compilado['no'].append(-1)
             if nodo.izquierda:
-                return self._evaluar_nodo(nodo.izquierda, datos)
-        else:
+                compilado['si'][i] = compilar(nodo.izquierda)
             if nodo.derecha:
-                return self._evaluar_nodo(nodo.derecha, datos)
+                compilado['no'][i] = compilar(nodo.derecha)
+            return i
         
-        # Si no hay nodo hijo, retornar el nodo actual
-        return {
-            'recomendacion': nodo.accion or 'Continúa con tu aprendizaje',
-            'tipo': nodo.tipo,
-            'prioridad': nodo.prioridad,
-            'regla_id': nodo.id
-        }
+        if self.raiz:
+            compilar(self.raiz)
+        self._compilado = compilado
+        return compilado
     
-    def _evaluar_condicion(self, condicion: str, datos: Dict[str, Any]) -> bool:
-        """Evalúa una condición contra los datos del estudiante"""
-        try:
-            # Mapear condiciones a datos del estudiante
-            mapeo = {
-                'promedio_puntajes < 70': datos.get('promedio_puntajes', 0) < 70,
-                'promedio_progreso < 50': datos.get('promedio_progreso', 0) < 50,
-                'evaluaciones_aprobadas/total_evaluaciones < 0.8': 
-                    (datos.get('evaluaciones_aprobadas', 0) / max(datos.get('total_evaluaciones', 1), 1)) < 0.8,
-                'tiempo_promedio > 60': datos.get('tiempo_promedio', 0) > 60,
-                'lecciones_completadas < 5': datos.get('lecciones_completadas', 0) < 5,
-                'recursos_revisados/total_recursos < 1': (datos.get('recursos_revisados', 0) / max(datos.get('total_recursos', 1), 1)) < 1,
-                'intentos_evaluacion > 2': datos.get('intentos_evaluacion', 0) > 2,
-                'dias_desde_ultimo_acceso > 7': datos.get('dias_desde_ultimo_acceso', 0) > 7,
-                'lecciones_obligatorias_completadas/total_lecciones_obligatorias < 1': (datos.get('lecciones_obligatorias_completadas', 0) / max(datos.get('total_lecciones_obligatorias', 1), 1)) < 1
-            }
-            return mapeo.get(condicion, False)
-        except:
-            return False
+    def evaluar_estudiante(self, datos_estudiante: Dict[str, Any]) -> Dict[str, Any]:
+        """Evalúa un estudiante y genera una recomendación"""
+        compilado = self._compilado or self.recompilar()
+        if not compilado['si']:
+            return dict(self.RESULTADO_VACIO)
+        
+        obtener = datos_estudiante.get
+        condicion, si, no = compilado['condicion'], compilado['si'], compilado['no']
+        
+        i = 0
+        while True:
+            cumple = False
+            if condicion[i] is not None:
+                try:
+                    cumple = condicion[i].evaluar(obtener)
+                except TypeError:
+                    pass  # Dato no numérico: la condición no se cumple
+            siguiente = si[i] if cumple else no[i]
+            if siguiente < 0:
+                return dict(compilado['resultado'][i])
+            i = siguiente
+    
+    def evaluar_lote(self, columnas: Dict[str, Sequence[Any]], cantidad: int) -> List[Dict[str, Any]]:
+        """Evalúa muchos estudiantes a la vez a partir de columnas de características
+
+        `columnas` asocia cada característica con una secuencia de `cantidad`
+        valores (un estudiante por posición; una columna ausente vale 0). En
+        cada nodo se parten las filas pendientes según la condición usando
+        máscaras de NumPy si está instalado, o listas en su defecto. El
+        resultado i corresponde al estudiante i; los estudiantes que llegan a
+        la misma hoja comparten el diccionario, que no debe modificarse.
+        """
+        compilado = self._compilado or self.recompilar()
+        if not compilado['si']:
+            return [self.RESULTADO_VACIO] * cantidad
+        
+        condicion, si, no = compilado['condicion'], compilado['si'], compilado['no']
+        nombres = set().union(*(c.caracteristicas for c in condicion if c is not None))
+        
+        if np is not None:
+            valores = {nombre: np.nan_to_num(np.asarray(columnas[nombre], dtype=float))
+                       if nombre in columnas else np.zeros(cantidad) for nombre in nombres}
+            pendientes = [(0, np.arange(cantidad))]
+        else:
+            valores = {nombre: [float(v or 0) for v in columnas[nombre]]
+                       if nombre in columnas else [0.0] * cantidad for nombre in nombres}
+            pendientes = [(0, list(range(cantidad)))]
+        
+        hoja = np.zeros(cantidad, dtype=int) if np is not None else [0] * cantidad
+        while pendientes:
+            i, filas = pendientes.pop()
+            c = condicion[i]
+            if c is None:
+                cumplen, no_cumplen = filas[:0], filas
+            elif np is not None:
+                mascara = c.evaluar_vector({nombre: valores[nombre][filas] for nombre in c.caracteristicas})
+                mascara = np.broadcast_to(np.asarray(mascara, dtype=bool), filas.shape)
+                cumplen, no_cumplen = filas[mascara], filas[~mascara]
+            else:
+                mascara = [c.evaluar(lambda nombre: valores[nombre][j]) for j in filas]
+                cumplen = [j for j, m in zip(filas, mascara) if m]
+                no_cumplen = [j for j, m in zip(filas, mascara) if not m]
+            for ramas, siguiente in ((cumplen, si[i]), (no_cumplen, no[i])):
+                if not len(ramas):
+                    continue
+                if siguiente < 0 and np is not None:
+                    hoja[ramas] = i
+                elif siguiente < 0:
+                    for j in ramas:
+                        hoja[j] = i
+                else:
+                    pendientes.append((siguiente, ramas))
+        
+        resultados = compilado['resultado']
+        return [resultados[i] for i in (hoja.tolist() if np is not None else hoja)]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el árbol a diccionario"""
         if not self.raiz:
-            return {'raiz': None}
+            return {'raiz': None, 'version': self.version}
         
         return {
-            'raiz': self._nodo_to_dict(self.raiz)
+            'raiz': self._nodo_to_dict(self.raiz),
+            'version': self.version
         }
     
     def _nodo_to_dict(self, nodo: 'NodoDecision') -> Dict[str, Any]:
@@ -428,70 +781,271 @@ class NodoDecision:
         """Determina si el nodo es una hoja (sin hijos)"""
         return self.izquierda is None and self.derecha is None
 
+class IndiceBusqueda:
+    """Índice invertido sobre los nombres y descripciones del contenido
+
+    Cada documento es un par (tipo, id). Los términos se guardan sin acentos
+    y en minúsculas, y el vocabulario ordenado permite buscar por prefijo
+    con bisect en lugar de recorrer todos los nodos.
+    """
+    
+    PESO_NOMBRE = 3
+    PESO_DESCRIPCION = 1
+    ORDEN_TIPOS = {'curso': 0, 'modulo': 1, 'leccion': 2, 'recurso': 3}
+    
+    def __init__(self):
+        self.postings: Dict[str, Dict[Tuple[str, int], int]] = {}
+        self.terminos_documento: Dict[Tuple[str, int], Dict[str, int]] = {}
+        self.vocabulario: List[str] = []
+    
+    @staticmethod
+    def normalizar(texto: Optional[str]) -> List[str]:
+        """Divide el texto en términos en minúsculas y sin acentos"""
+        texto = unicodedata.normalize('NFKD', texto or '')
+        texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+        return re.findall(r'\w+', texto)
+    
+    def agregar(self, clave: Tuple[str, int], nombre: str, descripcion: Optional[str] = None) -> None:
+        """Indexa (o reindexa) un documento"""
+        self.quitar(clave)
+        pesos: Dict[str, int] = {}
+        for termino in self.normalizar(descripcion):
+            pesos[termino] = self.PESO_DESCRIPCION
+        for termino in self.normalizar(nombre):
+            pesos[termino] = self.PESO_NOMBRE
+        for termino, peso in pesos.items():
+            documentos = self.postings.get(termino)
+            if documentos is None:
+                documentos = self.postings[termino] = {}
+                bisect.insort(self.vocabulario, termino)
+            documentos[clave] = peso
+        self.terminos_documento[clave] = pesos
+    
+    def quitar(self, clave: Tuple[str, int]) -> None:
+        """Quita un documento del índice"""
+        pesos = self.terminos_documento.pop(clave, None)
+        if not pesos:
+            return
+        for termino in pesos:
+            documentos = self.postings[termino]
+            del documentos[clave]
+            if not documentos:
+                del self.postings[termino]
+                del self.vocabulario[bisect.bisect_left(self.vocabulario, termino)]
+    
+    def buscar(self, consulta: str) -> Dict[Tuple[str, int], int]:
+        """Devuelve el puntaje de cada documento que contiene todos los términos de la consulta
+
+        Cada término de la consulta coincide como prefijo; una coincidencia
+        exacta vale el doble. Los términos del nombre pesan más que los de la
+        descripción.
+        """
+        resultado: Optional[Dict[Tuple[str, int], int]] = None
+        for prefijo in dict.fromkeys(self.normalizar(consulta)):
+            puntajes: Dict[Tuple[str, int], int] = {}
+            i = bisect.bisect_left(self.vocabulario, prefijo)
+            while i < len(self.vocabulario) and self.vocabulario[i].startswith(prefijo):
+                termino = self.vocabulario[i]
+                factor = 2 if termino == prefijo else 1
+                for clave, peso in self.postings[termino].items():
+                    if peso * factor > puntajes.get(clave, 0):
+                        puntajes[clave] = peso * factor
+                i += 1
+            if resultado is None:
+                resultado = puntajes
+            else:
+                resultado = {clave: resultado[clave] + puntaje
+                             for clave, puntaje in puntajes.items() if clave in resultado}
+            if not resultado:
+                break
+        return resultado or {}
+
 class GestorContenido:
     """Clase para gestionar el contenido jerárquico de los cursos"""
     
     def __init__(self):
         self.cursos: Dict[int, Curso] = {}
+        # Índices ID -> nodo por tipo; los mantienen agregar_hijo/eliminar_hijo y agregar_recurso/eliminar_recurso
+        self.modulos: Dict[int, Modulo] = {}
+        self.lecciones: Dict[int, Leccion] = {}
+        self.recursos: Dict[int, Recurso] = {}
+        self.busqueda = IndiceBusqueda()
         self.arbol_decision = ArbolDecision()
         self._inicializar_arbol_decision()
     
     def agregar_curso(self, curso: Curso) -> None:
         """Agrega un curso al gestor"""
-        self.cursos[curso.id] = curso
+        anterior = self.cursos.get(curso.id)
+        if anterior is not None and anterior is not curso:
+            self._desindexar(anterior)
+        self._indexar(curso)
     
     def obtener_curso(self, curso_id: int) -> Optional[Curso]:
         """Obtiene un curso por ID"""
         return self.cursos.get(curso_id)
     
+    def obtener_modulo(self, modulo_id: int) -> Optional[Modulo]:
+        """Obtiene un módulo por ID"""
+        return self.modulos.get(modulo_id)
+    
+    def obtener_leccion(self, leccion_id: int) -> Optional[Leccion]:
+        """Obtiene una lección por ID"""
+        return self.lecciones.get(leccion_id)
+    
+    def obtener_recurso(self, recurso_id: int) -> Optional[Recurso]:
+        """Obtiene un recurso por ID"""
+        return self.recursos.get(recurso_id)
+    
+    def obtener_nodo(self, curso_id: int, nodo_id: int) -> Optional[NodoContenido]:
+        """Obtiene el curso, módulo o lección con ese ID dentro de un curso"""
+        curso = self.cursos.get(curso_id)
+        if not curso:
+            return None
+        if curso.id == nodo_id:
+            return curso
+        for nodo in (self.modulos.get(nodo_id), self.lecciones.get(nodo_id)):
+            ancestro = nodo
+            while ancestro is not None and ancestro is not curso:
+                ancestro = ancestro.padre
+            if ancestro is not None:
+                return nodo
+        return None
+    
+    def _indice_de(self, nodo: NodoContenido) -> Optional[Dict[int, Any]]:
+        return {Curso: self.cursos, Modulo: self.modulos, Leccion: self.lecciones}.get(type(nodo))
+    
+    def _indexar(self, nodo: NodoContenido) -> None:
+        """Registra el nodo, su subárbol y sus recursos en los índices"""
+        nodo.gestor = self
+        indice = self._indice_de(nodo)
+        if indice is not None:
+            indice[nodo.id] = nodo
+            self.busqueda.agregar((type(nodo).__name__.lower(), nodo.id), nodo.nombre,
+                                  getattr(nodo, 'descripcion', None))
+        if isinstance(nodo, Leccion):
+            for recurso in nodo.recursos:
+                self._indexar_recurso(recurso)
+        for hijo in nodo.hijos:
+            self._indexar(hijo)
+    
+    def _desindexar(self, nodo: NodoContenido) -> None:
+        """Quita el nodo, su subárbol y sus recursos de los índices"""
+        nodo.gestor = None
+        indice = self._indice_de(nodo)
+        if indice is not None and indice.get(nodo.id) is nodo:
+            del indice[nodo.id]
+            self.busqueda.quitar((type(nodo).__name__.lower(), nodo.id))
+        if isinstance(nodo, Leccion):
+            for recurso in nodo.recursos:
+                self._desindexar_recurso(recurso)
+        for hijo in nodo.hijos:
+            self._desindexar(hijo)
+    
+    def _indexar_recurso(self, recurso: 'Recurso') -> None:
+        self.recursos[recurso.id] = recurso
+        self.busqueda.agregar(('recurso', recurso.id), recurso.nombre)
+    
+    def _desindexar_recurso(self, recurso: 'Recurso') -> None:
+        if self.recursos.get(recurso.id) is recurso:
+            del self.recursos[recurso.id]
+            self.busqueda.quitar(('recurso', recurso.id))
+    
+    def reindexar(self, elemento: Any) -> None:
+        """Actualiza el índice de búsqueda tras cambiar el nombre o la descripción de un elemento"""
+        if isinstance(elemento, Recurso):
+            if self.recursos.get(elemento.id) is elemento:
+                self._indexar_recurso(elemento)
+            return
+        indice = self._indice_de(elemento)
+        if indice is not None and indice.get(elemento.id) is elemento:
+            self.busqueda.agregar((type(elemento).__name__.lower(), elemento.id), elemento.nombre,
+                                  getattr(elemento, 'descripcion', None))
+    
+    def vaciar(self) -> None:
+        """Elimina todos los cursos del gestor"""
+        for indice in (self.cursos, self.modulos, self.lecciones):
+            for nodo in indice.values():
+                nodo.gestor = None
+        self.cursos = {}
+        self.modulos = {}
+        self.lecciones = {}
+        self.recursos = {}
+        self.busqueda = IndiceBusqueda()
+    
     def eliminar_curso(self, curso_id: int) -> bool:
         """Elimina un curso"""
         if curso_id in self.cursos:
-            del self.cursos[curso_id]
+            self._desindexar(self.cursos[curso_id])
             return True
         return False
     
-    def buscar_contenido(self, termino: str) -> List[Dict[str, Any]]:
-        """Busca contenido en todos los cursos"""
-        resultados = []
+    def buscar_contenido(self, termino: str, curso_id: Optional[int] = None,
+                         desplazamiento: int = 0, limite: Optional[int] = None) -> Dict[str, Any]:
+        """Busca cursos, módulos, lecciones y recursos con el índice invertido
+
+        Los resultados se ordenan por puntaje (y luego por tipo e ID) y se
+        devuelven paginados con `desplazamiento` y `limite`. Cada resultado
+        lleva solo los datos del elemento y su ruta, no el subárbol completo.
+        """
+        candidatos = []
+        for (tipo, id), puntaje in self.busqueda.buscar(termino).items():
+            elemento = self._indice_de_tipo(tipo).get(id)
+            if elemento is None:
+                continue
+            if curso_id is not None and self._curso_de(elemento) != curso_id:
+                continue
+            candidatos.append((-puntaje, IndiceBusqueda.ORDEN_TIPOS[tipo], id, tipo, elemento))
         
-        for curso in self.cursos.values():
-            # Buscar en el curso
-            if termino.lower() in curso.nombre.lower():
-                resultados.append({
-                    'tipo': 'curso',
-                    'nodo': curso.to_dict(),
-                    'ruta': curso.obtener_ruta()
-                })
-            
-            # Buscar en módulos
-            for modulo in curso.obtener_modulos():
-                if termino.lower() in modulo.nombre.lower():
-                    resultados.append({
-                        'tipo': 'modulo',
-                        'nodo': modulo.to_dict(),
-                        'ruta': modulo.obtener_ruta()
-                    })
-                
-                # Buscar en lecciones
-                for leccion in modulo.obtener_lecciones():
-                    if termino.lower() in leccion.nombre.lower():
-                        resultados.append({
-                            'tipo': 'leccion',
-                            'nodo': leccion.to_dict(),
-                            'ruta': leccion.obtener_ruta()
-                        })
-                    
-                    # Buscar en recursos
-                    for recurso in leccion.recursos:
-                        if termino.lower() in recurso.nombre.lower():
-                            resultados.append({
-                                'tipo': 'recurso',
-                                'nodo': recurso.to_dict(),
-                                'ruta': leccion.obtener_ruta() + [recurso.nombre]
-                            })
+        if limite is None:
+            pagina = sorted(candidatos, key=lambda c: c[:3])[desplazamiento:]
+        else:
+            pagina = heapq.nsmallest(desplazamiento + limite, candidatos, key=lambda c: c[:3])[desplazamiento:]
         
-        return resultados
+        return {
+            'total_resultados': len(candidatos),
+            'resultados': [self._resultado_busqueda(tipo, elemento, -puntaje)
+                           for puntaje, _, _, tipo, elemento in pagina]
+        }
+    
+    def _indice_de_tipo(self, tipo: str) -> Dict[int, Any]:
+        return {'curso': self.cursos, 'modulo': self.modulos, 'leccion': self.lecciones, 'recurso': self.recursos}[tipo]
+    
+    def _curso_de(self, elemento: Any) -> Optional[int]:
+        """ID del curso que contiene al nodo o recurso"""
+        nodo = self.lecciones.get(elemento.id_leccion) if isinstance(elemento, Recurso) else elemento
+        while nodo is not None and nodo.padre is not None:
+            nodo = nodo.padre
+        return nodo.id if nodo is not None else None
+    
+    def _resultado_busqueda(self, tipo: str, elemento: Any, puntaje: int) -> Dict[str, Any]:
+        if isinstance(elemento, Recurso):
+            leccion = self.lecciones.get(elemento.id_leccion)
+            ruta = (leccion.obtener_ruta() if leccion else []) + [elemento.nombre]
+            nodo = {
+                'id': elemento.id,
+                'nombre': elemento.nombre,
+                'tipo': 'Recurso',
+                'tipo_recurso': elemento.tipo,
+                'url': elemento.url,
+                'duracion': elemento.duracion
+            }
+        else:
+            ruta = elemento.obtener_ruta()
+            nodo = {
+                'id': elemento.id,
+                'nombre': elemento.nombre,
+                'tipo': elemento.__class__.__name__,
+                'descripcion': getattr(elemento, 'descripcion', ''),
+                'duracion_estimada': getattr(elemento, 'duracion_estimada', 0),
+                'profundidad': len(ruta) - 1
+            }
+        return {
+            'tipo': tipo,
+            'id': elemento.id,
+            'puntaje': puntaje,
+            'ruta': ruta,
+            'nodo': nodo
+        }
     
     def obtener_estructura_completa(self) -> Dict[str, Any]:
         """Obtiene la estructura completa de todos los cursos"""
@@ -501,10 +1055,134 @@ class GestorContenido:
             'arbol_decision': self.arbol_decision.to_dict()
         }
     
+    def obtener_estructura_compacta(self, campos: Optional[List[str]] = None,
+                                    profundidad: Optional[int] = None) -> Dict[str, Any]:
+        """Estructura de todos los cursos con NodoContenido.serializar (sin subárboles duplicados)"""
+        return {
+            'cursos': [curso.serializar(campos, profundidad, [curso.nombre]) for curso in self.cursos.values()],
+            'total_cursos': len(self.cursos)
+        }
+    
+    def guardar_snapshot(self, ruta: str, watermark: Dict[str, Any], creado: Optional[float] = None) -> None:
+        """Guarda el árbol de contenido en un archivo binario versionado
+
+        El archivo tiene una cabecera fija (magia, versión, longitud y CRC32)
+        seguida de las filas planas de cada nivel serializadas con marshal.
+        `watermark` indica desde dónde leer los cambios al volver a cargarlo.
+        `creado` conserva la fecha del snapshot original cuando solo se le
+        aplicaron cambios, así `max_edad` sigue forzando una carga completa.
+        """
+        cursos, modulos, lecciones, recursos = [], [], [], []
+        for curso in self.cursos.values():
+            cursos.append((curso.id, curso.nombre, curso.descripcion, curso.duracion_estimada,
+                           curso.id_profesor, curso.estado, curso.orden))
+            for modulo in curso.obtener_modulos():
+                modulos.append((modulo.id, curso.id, modulo.nombre, modulo.descripcion,
+                                modulo.duracion_estimada, modulo.orden))
+                for leccion in modulo.obtener_lecciones():
+                    evaluaciones = [(ev['id'], ev['nombre'], ev['descripcion'],
+                                     ev['puntaje_aprobacion'], ev['max_intentos'])
+                                    for ev in getattr(leccion, 'evaluaciones', [])]
+                    lecciones.append((leccion.id, modulo.id, leccion.nombre, leccion.descripcion,
+                                      leccion.contenido, leccion.duracion_estimada,
+                                      leccion.es_obligatoria, leccion.orden, evaluaciones))
+                    for recurso in leccion.recursos:
+                        recursos.append((recurso.id, leccion.id, recurso.nombre, recurso.tipo,
+                                         recurso.url, recurso.orden, recurso.duracion))
+
+        datos = marshal.dumps({
+            'creado': time.time() if creado is None else creado,
+            'watermark': dict(watermark),
+            'cursos': cursos,
+            'modulos': modulos,
+            'lecciones': lecciones,
+            'recursos': recursos
+        })
+        cabecera = SNAPSHOT_CABECERA.pack(SNAPSHOT_MAGIA, SNAPSHOT_VERSION, len(datos), zlib.crc32(datos))
+
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        temporal = f'{ruta}.tmp'
+        with open(temporal, 'wb') as archivo:
+            archivo.write(cabecera)
+            archivo.write(datos)
+        os.replace(temporal, ruta)
+
+    def cargar_snapshot(self, ruta: str, max_edad: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Reemplaza los cursos con los de un snapshot; devuelve sus metadatos o None si no es válido"""
+        try:
+            with open(ruta, 'rb') as archivo, mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                if len(mapa) < SNAPSHOT_CABECERA.size:
+                    return None
+                magia, version, longitud, crc = SNAPSHOT_CABECERA.unpack_from(mapa)
+                if magia != SNAPSHOT_MAGIA or version != SNAPSHOT_VERSION:
+                    return None
+                vista = memoryview(mapa)[SNAPSHOT_CABECERA.size:SNAPSHOT_CABECERA.size + longitud]
+                try:
+                    if len(vista) != longitud or zlib.crc32(vista) != crc:
+                        return None
+                    datos = marshal.loads(vista)
+                finally:
+                    vista.release()
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+        if max_edad is not None and time.time() - datos['creado'] > max_edad:
+            return None
+
+        cursos: Dict[int, Curso] = {}
+        modulos: Dict[int, Modulo] = {}
+        lecciones: Dict[int, Leccion] = {}
+        for id, nombre, descripcion, duracion, id_profesor, estado, orden in datos['cursos']:
+            curso = Curso(id, nombre, descripcion, duracion, id_profesor)
+            curso.estado = estado
+            curso.orden = orden
+            cursos[id] = curso
+        for id, id_curso, nombre, descripcion, duracion, orden in datos['modulos']:
+            modulo = Modulo(id, nombre, descripcion, duracion, id_curso)
+            modulo.orden = orden
+            cursos[id_curso].agregar_modulo(modulo)
+            modulos[id] = modulo
+        for (id, id_modulo, nombre, descripcion, contenido, duracion,
+             es_obligatoria, orden, evaluaciones) in datos['lecciones']:
+            leccion = Leccion(id, nombre, descripcion, contenido, duracion, id_modulo, es_obligatoria)
+            leccion.orden = orden
+            leccion.evaluaciones = [
+                {
+                    'id': ev_id,
+                    'nombre': ev_nombre,
+                    'descripcion': ev_descripcion,
+                    'puntaje_aprobacion': puntaje,
+                    'max_intentos': intentos
+                }
+                for ev_id, ev_nombre, ev_descripcion, puntaje, intentos in evaluaciones
+            ]
+            modulos[id_modulo].agregar_leccion(leccion)
+            lecciones[id] = leccion
+        for id, id_leccion, nombre, tipo, url, orden, duracion in datos['recursos']:
+            lecciones[id_leccion].agregar_recurso(Recurso(id, nombre, tipo, url, orden, duracion))
+
+        self.vaciar()
+        for curso in cursos.values():
+            self.agregar_curso(curso)
+        return {'creado': datos['creado'], 'watermark': datos['watermark']}
+
+    def reemplazar_arbol_decision(self, arbol: ArbolDecision) -> None:
+        """Cambia el árbol de decisión vigente por uno ya compilado
+
+        Es una sola asignación: las evaluaciones en curso terminan con el
+        árbol anterior y las siguientes usan el nuevo.
+        """
+        self.arbol_decision = arbol
+    
     def generar_recomendacion(self, datos_estudiante: Dict[str, Any]) -> Dict[str, Any]:
         """Genera una recomendación para un estudiante"""
         return self.arbol_decision.evaluar_estudiante(datos_estudiante)
     
+    def generar_recomendaciones_lote(self, columnas: Dict[str, Sequence[Any]], cantidad: int) -> List[Dict[str, Any]]:
+        """Genera las recomendaciones de muchos estudiantes a partir de columnas de características"""
+        return self.arbol_decision.evaluar_lote(columnas, cantidad)
+    
     def _inicializar_arbol_decision(self) -> None:
         """Inicializa el árbol de decisión con reglas predefinidas y extendidas"""
         # Nodo raíz: evaluar puntaje promedio
@@ -551,70 +1229,67 @@ class GestorContenido:
         self.arbol_decision.raiz = nodo_raiz
 
 class GestorMateriales:
-    """Clase para gestionar el CRUD de materiales"""
+    """Clase para gestionar el CRUD de materiales
+
+    Usa los índices de GestorContenido (recursos por ID y lecciones por ID),
+    así que cada operación es una búsqueda en diccionario. Los IDs de los
+    recursos los asigna la base de datos.
+    """
     
     def __init__(self, gestor_contenido: GestorContenido):
         self.gestor_contenido = gestor_contenido
     
-    def crear_recurso(self, leccion_id: int, nombre: str, tipo: str, url: str, 
+    def crear_recurso(self, recurso_id: int, leccion_id: int, nombre: str, tipo: str, url: str, 
                      orden: int = 0, duracion: Optional[int] = None) -> Optional[Recurso]:
-        """Crea un nuevo recurso"""
-        # Encontrar la lección
-        for curso in self.gestor_contenido.cursos.values():
-            for modulo in curso.obtener_modulos():
-                for leccion in modulo.obtener_lecciones():
-                    if leccion.id == leccion_id:
-                        # Generar ID único (en producción usar base de datos)
-                        nuevo_id = max([r.id for r in leccion.recursos], default=0) + 1
-                        recurso = Recurso(nuevo_id, nombre, tipo, url, orden, duracion)
-                        leccion.agregar_recurso(recurso)
-                        return recurso
-        return None
+        """Crea un recurso con el ID generado por la base de datos (lastrowid)"""
+        recurso = Recurso(recurso_id, nombre, tipo, url, orden, duracion)
+        return recurso if self.registrar_recurso(leccion_id, recurso) else None
+
+    def registrar_recurso(self, leccion_id: int, recurso: Recurso) -> bool:
+        """Agrega a su lección un recurso ya creado"""
+        leccion = self.gestor_contenido.obtener_leccion(leccion_id)
+        if not leccion:
+            return False
+        leccion.agregar_recurso(recurso)
+        return True
     
     def actualizar_recurso(self, recurso_id: int, nombre: Optional[str] = None, 
                           url: Optional[str] = None, orden: Optional[int] = None) -> bool:
         """Actualiza un recurso existente"""
-        for curso in self.gestor_contenido.cursos.values():
-            for modulo in curso.obtener_modulos():
-                for leccion in modulo.obtener_lecciones():
-                    for recurso in leccion.recursos:
-                        if recurso.id == recurso_id:
-                            if nombre:
-                                recurso.nombre = nombre
-                            if url:
-                                recurso.url = url
-                            if orden is not None:
-                                recurso.orden = orden
-                            return True
-        return False
+        recurso = self.gestor_contenido.obtener_recurso(recurso_id)
+        if not recurso:
+            return False
+        if nombre:
+            recurso.nombre = nombre
+        if url:
+            recurso.url = url
+        leccion = self.gestor_contenido.obtener_leccion(recurso.id_leccion)
+        if orden is not None and orden != recurso.orden:
+            recurso.orden = orden
+            if leccion:
+                leccion.recursos.sort(key=lambda x: x.orden)
+        if leccion:
+            # El diccionario de la lección incluye los de sus recursos
+            leccion.invalidar()
+        self.gestor_contenido.reindexar(recurso)
+        return True
     
     def eliminar_recurso(self, recurso_id: int) -> bool:
         """Elimina un recurso"""
-        for curso in self.gestor_contenido.cursos.values():
-            for modulo in curso.obtener_modulos():
-                for leccion in modulo.obtener_lecciones():
-                    if leccion.eliminar_recurso(recurso_id):
-                        return True
-        return False
+        recurso = self.gestor_contenido.obtener_recurso(recurso_id)
+        if not recurso:
+            return False
+        leccion = self.gestor_contenido.obtener_leccion(recurso.id_leccion)
+        return bool(leccion and leccion.eliminar_recurso(recurso_id))
     
     def obtener_recurso(self, recurso_id: int) -> Optional[Recurso]:
         """Obtiene un recurso por ID"""
-        for curso in self.gestor_contenido.cursos.values():
-            for modulo in curso.obtener_modulos():
-                for leccion in modulo.obtener_lecciones():
-                    for recurso in leccion.recursos:
-                        if recurso.id == recurso_id:
-                            return recurso
-        return None
+        return self.gestor_contenido.obtener_recurso(recurso_id)
     
     def listar_recursos_leccion(self, leccion_id: int) -> List[Recurso]:
         """Lista todos los recursos de una lección"""
-        for curso in self.gestor_contenido.cursos.values():
-            for modulo in curso.obtener_modulos():
-                for leccion in modulo.obtener_lecciones():
-                    if leccion.id == leccion_id:
-                        return leccion.recursos
-        return []
+        leccion = self.gestor_contenido.obtener_leccion(leccion_id)
+        return leccion.recursos if leccion else []
 
 # ============================================================================
 # CLASES ESPECÍFICAS PARA EL PROFESOR
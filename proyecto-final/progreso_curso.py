@@ -0,0 +1,378 @@
+"""
+Progreso de los estudiantes en los cursos (Matriculas.Progreso_total).
+
+El progreso se arma con contadores por matrícula que se mantienen de forma
+incremental (Matriculas.Lecciones_completadas, Modulos_con_progreso,
+Evaluaciones_realizadas, Evaluaciones_aprobadas, Intentos_evaluaciones y
+Suma_puntajes; ver migracion_contadores_progreso.sql) y con los totales
+estructurales del curso, que tienen una sola fuente: CacheTotalesCurso, que
+los calcula desde Modulos, Lecciones y Evaluaciones. Con ambos
+Progreso_total es aritmética sobre una fila, sin recorrer el curso.
+reconciliar_progreso recalcula los contadores de un curso desde las tablas
+de origen para corregir cualquier desvío; como tarea programada corre
+reconciliacion_progreso.py, un curso por transacción.
+
+ColaProgreso procesa en segundo plano el trabajo que no hace falta dentro
+de la petición, fusionando los pedidos repetidos: refrescar las
+características de un estudiante tras su actividad y recalcular el progreso
+de todas las matrículas de un curso cuando cambia su estructura.
+"""
+
+import threading
+from collections import OrderedDict
+
+from consultas_progreso import evaluaciones_por_modulo
+
+# Contadores por matrícula que se pueden ajustar con aplicar_evento_progreso
+CONTADORES_MATRICULA = {
+    'lecciones_completadas': 'Lecciones_completadas',
+    'modulos_con_progreso': 'Modulos_con_progreso',
+    'evaluaciones_realizadas': 'Evaluaciones_realizadas',
+    'evaluaciones_aprobadas': 'Evaluaciones_aprobadas',
+    'intentos_evaluaciones': 'Intentos_evaluaciones',
+    'suma_puntajes': 'Suma_puntajes'
+}
+
+# Ponderación de /progreso: (contador de Matriculas, total del curso, puntos sobre 100)
+PONDERACION_PROGRESO = (
+    ('Lecciones_completadas', 'total_lecciones', 40),
+    ('Evaluaciones_aprobadas', 'total_evaluaciones', 40),
+    ('Modulos_con_progreso', 'total_modulos', 20)
+)
+
+
+def calcular_progreso(contadores, totales):
+    """Porcentajes de progreso a partir de los contadores de una matrícula y los totales del curso"""
+    def porcentaje(parte, total):
+        return (parte / total * 100) if total > 0 else 0
+
+    progreso_lecciones = porcentaje(contadores['lecciones_completadas'], totales['total_lecciones'])
+    progreso_evaluaciones = porcentaje(contadores['evaluaciones_aprobadas'], totales['total_evaluaciones'])
+    progreso_modulos = porcentaje(contadores['modulos_con_progreso'], totales['total_modulos'])
+    return {
+        'progreso_total': min(progreso_lecciones * 0.4 + progreso_evaluaciones * 0.4 + progreso_modulos * 0.2, 100),
+        'progreso_lecciones': progreso_lecciones,
+        'progreso_evaluaciones': progreso_evaluaciones,
+        'progreso_modulos': progreso_modulos
+    }
+
+
+def _filtro(condiciones):
+    """WHERE y parámetros a partir de pares (columna, valor) cuyo valor no sea None"""
+    activas = [(columna, valor) for columna, valor in condiciones if valor is not None]
+    if not activas:
+        return '', ()
+    return 'WHERE ' + ' AND '.join(f'{columna} = %s' for columna, _ in activas), tuple(v for _, v in activas)
+
+
+def actualizar_progreso_total(conn, curso_id, totales, estudiante_id=None):
+    """Recalcula Progreso_total con los contadores ya guardados, para una matrícula o todo el curso
+
+    `totales` son los del curso según CacheTotalesCurso.obtener.
+    """
+    coeficientes = tuple(puntos / totales[total] if totales[total] > 0 else 0
+                         for _, total, puntos in PONDERACION_PROGRESO)
+    expresion = ' + '.join(f'{columna} * %s' for columna, _, _ in PONDERACION_PROGRESO)
+    where, parametros = _filtro((('ID_Curso', curso_id), ('ID_Estudiante', estudiante_id)))
+    cursor = conn.cursor()
+    cursor.execute(f'UPDATE Matriculas SET Progreso_total = LEAST(100, {expresion}) {where}',
+                   (*coeficientes, *parametros))
+
+
+def aplicar_evento_progreso(conn, estudiante_id, curso_id, totales, **deltas):
+    """Suma `deltas` (claves de CONTADORES_MATRICULA) a la matrícula y actualiza su Progreso_total"""
+    deltas = {nombre: valor for nombre, valor in deltas.items() if valor}
+    if not deltas:
+        return
+    asignaciones = ', '.join(f'{CONTADORES_MATRICULA[nombre]} = {CONTADORES_MATRICULA[nombre]} + %s'
+                             for nombre in deltas)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        UPDATE Matriculas SET {asignaciones} WHERE ID_Estudiante = %s AND ID_Curso = %s
+    ''', (*deltas.values(), estudiante_id, curso_id))
+    actualizar_progreso_total(conn, curso_id, totales, estudiante_id)
+
+
+def deltas_intento_evaluacion(intentos_previos, mejor_puntaje_previo, puntaje, puntaje_aprobacion):
+    """Deltas de contadores por registrar un intento, dados los intentos y el mejor puntaje anteriores"""
+    aprobada_antes = mejor_puntaje_previo is not None and float(mejor_puntaje_previo) >= float(puntaje_aprobacion)
+    return {
+        'evaluaciones_realizadas': 1 if not intentos_previos else 0,
+        'evaluaciones_aprobadas': 1 if float(puntaje) >= float(puntaje_aprobacion) and not aprobada_antes else 0,
+        'intentos_evaluaciones': 1,
+        'suma_puntajes': puntaje
+    }
+
+
+def marcar_leccion(conn, estudiante_id, leccion_id, completado):
+    """Registra el acceso a una lección y su estado; devuelve los deltas de contadores que produce
+
+    El estado anterior se lee antes del upsert, así solo cuentan los cambios
+    reales (una lección completada que se vuelve a completar no suma, y una
+    que pasa a no completada resta).
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT l.ID_Modulo,
+               (SELECT pl.Completado FROM Progreso_Lecciones pl
+                WHERE pl.ID_Estudiante = %s AND pl.ID_Leccion = l.ID_Leccion) AS completado_antes
+        FROM Lecciones l
+        WHERE l.ID_Leccion = %s
+    ''', (estudiante_id, leccion_id))
+    fila = cursor.fetchone()
+    cursor.execute('''
+        INSERT INTO Progreso_Lecciones 
+        (ID_Estudiante, ID_Leccion, Completado, Tiempo_dedicado, Fecha_inicio, Fecha_ultimo_acceso, Veces_accedido)
+        VALUES (%s, %s, %s, %s, NOW(), NOW(), 1)
+        ON DUPLICATE KEY UPDATE
+        Completado = VALUES(Completado),
+        Fecha_ultimo_acceso = NOW(),
+        Veces_accedido = Veces_accedido + 1
+    ''', (estudiante_id, leccion_id, completado, 0))
+    if not fila:
+        return {}
+
+    modulo_id, completado_antes = fila
+    cambio = int(bool(completado)) - int(bool(completado_antes))
+    if not cambio:
+        return {}
+    cursor.execute('''
+        SELECT COUNT(*) FROM Progreso_Lecciones pl
+        JOIN Lecciones l ON l.ID_Leccion = pl.ID_Leccion
+        WHERE pl.ID_Estudiante = %s AND l.ID_Modulo = %s AND pl.Completado = 1
+    ''', (estudiante_id, modulo_id))
+    completadas_en_modulo = cursor.fetchone()[0]
+    # El módulo empieza a tener progreso con su primera lección completada y lo pierde con la última
+    primera_o_ultima = completadas_en_modulo == (1 if cambio > 0 else 0)
+    return {'lecciones_completadas': cambio, 'modulos_con_progreso': cambio if primera_o_ultima else 0}
+
+
+def curso_de(conn, leccion_id=None, modulo_id=None):
+    """ID del curso al que pertenece la lección o el módulo, o None si no existe"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT mo.ID_Curso FROM Modulos mo
+        WHERE mo.ID_Modulo = COALESCE((SELECT l.ID_Modulo FROM Lecciones l WHERE l.ID_Leccion = %s), %s)
+    ''', (leccion_id, modulo_id))
+    fila = cursor.fetchone()
+    return fila[0] if fila else None
+
+
+def reconciliar_progreso(conn, cache_totales, curso_id, estudiante_id=None):
+    """Recalcula los contadores de un curso desde las tablas de origen y el Progreso_total; devuelve las matrículas corregidas
+
+    Cada agregado se calcula en una subconsulta agrupada, sin uniones que
+    multipliquen filas, y solo sobre el curso (y el estudiante, si se
+    indica). Los totales salen de `cache_totales` (CacheTotalesCurso). Un
+    curso por llamada, para que cada transacción bloquee solo sus
+    matrículas; reconciliacion_progreso.py recorre todos los cursos. No
+    confirma la transacción.
+    """
+    cursor = conn.cursor()
+    evaluaciones, parametros_evaluaciones = evaluaciones_por_modulo('mo.ID_Curso = %s', (curso_id,))
+    parametros_estudiante = (estudiante_id,) if estudiante_id is not None else ()
+
+    def del_estudiante(columna, union='AND'):
+        return f' {union} {columna} = %s' if estudiante_id is not None else ''
+
+    cursor.execute(f'''
+        UPDATE Matriculas m
+        LEFT JOIN (
+            SELECT pl.ID_Estudiante, COUNT(*) AS lecciones, COUNT(DISTINCT l.ID_Modulo) AS modulos
+            FROM Progreso_Lecciones pl
+            JOIN Lecciones l ON l.ID_Leccion = pl.ID_Leccion
+            JOIN Modulos mo ON mo.ID_Modulo = l.ID_Modulo
+            WHERE pl.Completado = 1 AND mo.ID_Curso = %s{del_estudiante('pl.ID_Estudiante')}
+            GROUP BY pl.ID_Estudiante
+        ) pl ON pl.ID_Estudiante = m.ID_Estudiante
+        LEFT JOIN (
+            SELECT por_evaluacion.ID_Estudiante,
+                   COUNT(*) AS realizadas, SUM(por_evaluacion.aprobada) AS aprobadas,
+                   SUM(por_evaluacion.intentos) AS intentos, SUM(por_evaluacion.suma) AS suma
+            FROM (
+                SELECT re.ID_Estudiante, re.ID_Evaluacion,
+                       COUNT(*) AS intentos, SUM(re.Puntaje) AS suma,
+                       MAX(re.Puntaje >= ev.Puntaje_aprobacion) AS aprobada
+                FROM Resultados_Evaluaciones re
+                JOIN ({evaluaciones}) ev ON ev.ID_Evaluacion = re.ID_Evaluacion
+               {del_estudiante('re.ID_Estudiante', 'WHERE')}
+                GROUP BY re.ID_Estudiante, re.ID_Evaluacion
+            ) por_evaluacion
+            GROUP BY por_evaluacion.ID_Estudiante
+        ) ev ON ev.ID_Estudiante = m.ID_Estudiante
+        SET m.Lecciones_completadas = COALESCE(pl.lecciones, 0),
+            m.Modulos_con_progreso = COALESCE(pl.modulos, 0),
+            m.Evaluaciones_realizadas = COALESCE(ev.realizadas, 0),
+            m.Evaluaciones_aprobadas = COALESCE(ev.aprobadas, 0),
+            m.Intentos_evaluaciones = COALESCE(ev.intentos, 0),
+            m.Suma_puntajes = COALESCE(ev.suma, 0)
+        WHERE m.ID_Curso = %s{del_estudiante('m.ID_Estudiante')}
+    ''', (curso_id, *parametros_estudiante, *parametros_evaluaciones, *parametros_estudiante,
+          curso_id, *parametros_estudiante))
+    corregidas = cursor.rowcount
+
+    actualizar_progreso_total(conn, curso_id, cache_totales.obtener(conn, curso_id), estudiante_id)
+    return corregidas
+
+
+class CacheTotalesCurso:
+    """Totales estructurales por curso: {'total_modulos', 'total_lecciones', 'total_evaluaciones', 'modulos'}
+
+    - modulos: lista por Orden de {'id_modulo', 'lecciones', 'evaluaciones'}
+    - total_*: sumas sobre los módulos del curso
+
+    Se cargan de Modulos, Lecciones y Evaluaciones con subconsultas
+    agrupadas y solo cambian cuando el profesor edita el curso: los endpoints
+    que crean o eliminan módulos, lecciones o evaluaciones invalidan el curso
+    una vez confirmada su transacción. Igual que CacheClavesRespuestas, una
+    carga que empezó antes de una invalidación no se guarda. Es la única
+    fuente de los totales: Progreso_total también se calcula con ellos.
+    """
+
+    def __init__(self):
+        self._totales = {}
+        self._generacion = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, conn, curso_id):
+        """Devuelve los totales del curso, leyéndolos de la base de datos si no están en caché"""
+        with self._lock:
+            totales = self._totales.get(curso_id)
+            generacion = self._generacion
+        if totales is not None:
+            return totales
+
+        totales = self._cargar(conn, curso_id)
+        with self._lock:
+            if self._generacion == generacion:
+                self._totales[curso_id] = totales
+        return totales
+
+    def invalidar(self, curso_id=None):
+        """Descarta los totales de un curso, o de todos si no se indica"""
+        with self._lock:
+            self._generacion += 1
+            if curso_id is None:
+                self._totales.clear()
+            else:
+                self._totales.pop(curso_id, None)
+
+    @staticmethod
+    def _cargar(conn, curso_id):
+        evaluaciones, parametros_evaluaciones = evaluaciones_por_modulo('mo.ID_Curso = %s', (curso_id,))
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f'''
+            SELECT mo.ID_Modulo AS id_modulo,
+                   COALESCE(tl.total, 0) AS lecciones,
+                   COALESCE(te.total, 0) AS evaluaciones
+            FROM Modulos mo
+            LEFT JOIN (
+                SELECT l.ID_Modulo, COUNT(*) AS total
+                FROM Lecciones l JOIN Modulos mo ON mo.ID_Modulo = l.ID_Modulo
+                WHERE mo.ID_Curso = %s
+                GROUP BY l.ID_Modulo
+            ) tl ON tl.ID_Modulo = mo.ID_Modulo
+            LEFT JOIN (
+                SELECT ev.ID_Modulo, COUNT(*) AS total
+                FROM ({evaluaciones}) ev
+                GROUP BY ev.ID_Modulo
+            ) te ON te.ID_Modulo = mo.ID_Modulo
+            WHERE mo.ID_Curso = %s
+            ORDER BY mo.Orden
+        ''', (curso_id, *parametros_evaluaciones, curso_id))
+        modulos = [{nombre: int(fila[nombre]) for nombre in ('id_modulo', 'lecciones', 'evaluaciones')}
+                   for fila in cursor.fetchall()]
+        return {
+            'total_modulos': len(modulos),
+            'total_lecciones': sum(modulo['lecciones'] for modulo in modulos),
+            'total_evaluaciones': sum(modulo['evaluaciones'] for modulo in modulos),
+            'modulos': modulos
+        }
+
+
+class ColaProgreso:
+    """Cola de trabajos de progreso por (estudiante, curso) con fusión de duplicados
+
+    `procesar(estudiante_id, curso_id)` se ejecuta en hilos daemon que se
+    crean con el primer pedido; cualquiera de los dos puede ser None si el
+    trabajo es solo del estudiante o de todo el curso. Un par se fusiona
+    mientras espera; si se vuelve a pedir mientras se procesa, se procesa
+    otra vez al terminar, así el último cálculo siempre ve los datos más
+    recientes. Con `sincrono=True` se procesa en el mismo hilo que encola.
+    """
+
+    def __init__(self, procesar, hilos: int = 1, sincrono: bool = False):
+        self.procesar = procesar
+        self.hilos = hilos
+        self.sincrono = sincrono
+        self._pendientes = OrderedDict()
+        self._en_proceso = set()
+        self._condicion = threading.Condition()
+        self._trabajadores = []
+        self._estadisticas = {'encolados': 0, 'fusionados': 0, 'procesados': 0, 'errores': 0}
+
+    def encolar(self, estudiante_id, curso_id):
+        clave = (estudiante_id, curso_id)
+        with self._condicion:
+            self._estadisticas['encolados'] += 1
+            if clave in self._pendientes:
+                self._estadisticas['fusionados'] += 1
+                return
+            self._pendientes[clave] = True
+            if not self.sincrono:
+                self._iniciar_trabajadores()
+                self._condicion.notify()
+        if self.sincrono:
+            self._procesar_pendientes()
+
+    def esperar(self, timeout=None) -> bool:
+        """Bloquea hasta que no queden pedidos pendientes ni en proceso; False si se agotó el tiempo"""
+        with self._condicion:
+            return self._condicion.wait_for(lambda: not self._pendientes and not self._en_proceso, timeout)
+
+    def estadisticas(self) -> dict:
+        with self._condicion:
+            return dict(self._estadisticas, pendientes=len(self._pendientes), en_proceso=len(self._en_proceso),
+                        hilos=len(self._trabajadores))
+
+    def _iniciar_trabajadores(self):
+        while len(self._trabajadores) < self.hilos:
+            hilo = threading.Thread(target=self._trabajar, name=f'cola-progreso-{len(self._trabajadores) + 1}',
+                                    daemon=True)
+            self._trabajadores.append(hilo)
+            hilo.start()
+
+    def _tomar(self, bloquear):
+        """Saca el primer pedido que no esté en proceso en otro hilo; None si no hay y no se bloquea"""
+        with self._condicion:
+            while True:
+                for clave in self._pendientes:
+                    if clave not in self._en_proceso:
+                        del self._pendientes[clave]
+                        self._en_proceso.add(clave)
+                        return clave
+                if not bloquear:
+                    return None
+                self._condicion.wait()
+
+    def _ejecutar(self, clave):
+        try:
+            self.procesar(*clave)
+            exito = True
+        except Exception as e:
+            exito = False
+            print(f'Error en el trabajo de progreso (estudiante {clave[0]}, curso {clave[1]}): {e}')
+        with self._condicion:
+            self._en_proceso.discard(clave)
+            self._estadisticas['procesados' if exito else 'errores'] += 1
+            self._condicion.notify_all()
+
+    def _procesar_pendientes(self):
+        clave = self._tomar(bloquear=False)
+        while clave is not None:
+            self._ejecutar(clave)
+            clave = self._tomar(bloquear=False)
+
+    def _trabajar(self):
+        while True:
+            self._ejecutar(self._tomar(bloquear=True))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Recomendaciones por lote: características de todos los estudiantes de un
+curso en forma de columnas (ver caracteristicas_estudiante.py) y evaluación
+del árbol de decisión en una pasada.
+
+Uso como tarea nocturna:
+    python recomendacion_lote.py [--curso ID ...] [--salida archivo.json]
+Sin --curso se procesan todos los cursos con matrículas.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from caracteristicas_estudiante import consultar_caracteristicas
+from reglas_recomendacion import consultar_reglas, version_reglas
+
+def recomendar_curso(conn, curso_id, gestor_contenido):
+    """Genera la recomendación de cada estudiante del curso; devuelve una lista de diccionarios"""
+    ids, columnas = consultar_caracteristicas(conn, curso_id=curso_id)
+    recomendaciones = gestor_contenido.generar_recomendaciones_lote(columnas, len(ids))
+    return [{'estudiante_id': estudiante_id, **recomendacion}
+            for estudiante_id, recomendacion in zip(ids, recomendaciones)]
+
+def resumir(recomendaciones):
+    """Cantidad de estudiantes por regla alcanzada"""
+    resumen = {}
+    for recomendacion in recomendaciones:
+        regla = recomendacion.get('regla_id')
+        resumen[regla] = resumen.get(regla, 0) + 1
+    return resumen
+
+def main():
+    from db_connect import get_connection
+    from models import ArbolDecision, GestorContenido
+
+    parser = argparse.ArgumentParser(description='Genera recomendaciones por lote para uno o más cursos')
+    parser.add_argument('--curso', type=int, action='append', help='ID del curso (se puede repetir)')
+    parser.add_argument('--salida', help='archivo JSON donde guardar las recomendaciones')
+    args = parser.parse_args()
+
+    conn = get_connection()
+    if not conn:
+        print('❌ No se pudo conectar a la base de datos')
+        sys.exit(1)
+    gestor_contenido = GestorContenido()
+    try:
+        reglas = consultar_reglas(conn)
+        if reglas:
+            gestor_contenido.reemplazar_arbol_decision(ArbolDecision.desde_reglas(reglas, version_reglas(conn)))
+        print(f'Árbol de decisión: versión {gestor_contenido.arbol_decision.version}')
+
+        cursor = conn.cursor()
+        cursos = args.curso
+        if not cursos:
+            cursor.execute('SELECT DISTINCT ID_Curso FROM Matriculas ORDER BY ID_Curso')
+            cursos = [fila[0] for fila in cursor.fetchall()]
+
+        reporte = {'generado': datetime.now().isoformat(), 'cursos': []}
+        for curso_id in cursos:
+            recomendaciones = recomendar_curso(conn, curso_id, gestor_contenido)
+            print(f'Curso {curso_id}: {len(recomendaciones)} estudiantes, por regla {resumir(recomendaciones)}')
+            reporte['cursos'].append({'curso_id': curso_id, 'recomendaciones': recomendaciones})
+    finally:
+        conn.close()
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(reporte, archivo, ensure_ascii=False, indent=2, default=str)
+        print(f'✅ Recomendaciones guardadas en {args.salida}')
+
+if __name__ == '__main__':
+    main()
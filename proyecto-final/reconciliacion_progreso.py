@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Reconciliación de los contadores de progreso de las matrículas (ver
+progreso_curso.py): los recalcula desde las tablas de origen para corregir
+cualquier desvío de las actualizaciones incrementales.
+
+Cada curso se reconcilia y se confirma en su propia transacción, así solo
+se bloquean las matrículas de un curso a la vez. Conviene programarla fuera
+de las horas de uso, por ejemplo con cron:
+    python reconciliacion_progreso.py [--curso ID ...]
+Sin --curso se procesan todos los cursos con matrículas. También completa
+los contadores después de aplicar migracion_contadores_progreso.sql.
+"""
+
+import argparse
+import sys
+
+from progreso_curso import CacheTotalesCurso, reconciliar_progreso
+
+def reconciliar_cursos(conn, cursos, cache_totales):
+    """Reconcilia los cursos de a uno, confirmando cada uno; devuelve las matrículas corregidas por curso"""
+    corregidas = {}
+    for curso_id in cursos:
+        try:
+            corregidas[curso_id] = reconciliar_progreso(conn, cache_totales, curso_id)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return corregidas
+
+def main():
+    from db_connect import get_connection
+
+    parser = argparse.ArgumentParser(description='Recalcula los contadores de progreso de las matrículas')
+    parser.add_argument('--curso', type=int, action='append', help='ID del curso (se puede repetir)')
+    args = parser.parse_args()
+
+    conn = get_connection()
+    if not conn:
+        print('❌ No se pudo conectar a la base de datos')
+        sys.exit(1)
+    try:
+        cursos = args.curso
+        if not cursos:
+            cursor = conn.cursor()
+            cursor.execute('SELECT DISTINCT ID_Curso FROM Matriculas ORDER BY ID_Curso')
+            cursos = [fila[0] for fila in cursor.fetchall()]
+
+        corregidas = reconciliar_cursos(conn, cursos, CacheTotalesCurso())
+        for curso_id, cantidad in corregidas.items():
+            print(f'Curso {curso_id}: {cantidad} matrículas corregidas')
+    except Exception as e:
+        print(f'❌ Error reconciliando el progreso: {e}')
+        sys.exit(1)
+    finally:
+        conn.close()
+    print(f'✅ Progreso reconciliado en {len(cursos)} cursos')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Lectura de las reglas del árbol de recomendación desde Reglas_Recomendacion.
+
+consultar_reglas devuelve las filas que compila ArbolDecision.desde_reglas
+(models.py) y version_reglas una huella barata de la tabla: app.py la
+compara con la versión del árbol vigente para recargarlo en caliente solo
+cuando las reglas cambian, y recomendacion_lote.py la usa al armar su árbol.
+"""
+
+
+def version_reglas(conn):
+    """Huella de la tabla Reglas_Recomendacion: cantidad de filas y suma de CRC32 de su contenido"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute('''
+        SELECT COUNT(*) AS total,
+               COALESCE(SUM(CRC32(CONCAT_WS('|', ID_Regla, IFNULL(Nombre, ''), IFNULL(Condicion, ''),
+                   IFNULL(Nodo_padre_id, ''), IFNULL(Nodo_verdadero_id, ''), IFNULL(Nodo_falso_id, ''),
+                   IFNULL(Accion_recomendada, ''), Es_nodo_final, IFNULL(Prioridad, '')))), 0) AS suma
+        FROM Reglas_Recomendacion
+    ''')
+    fila = cursor.fetchone()
+    return f"bd-{fila['total']}-{fila['suma']}"
+
+
+def consultar_reglas(conn):
+    """Filas de Reglas_Recomendacion en el formato que espera ArbolDecision.desde_reglas"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute('''
+        SELECT ID_Regla, Nombre, Condicion, Nodo_padre_id, Nodo_verdadero_id, Nodo_falso_id,
+               Accion_recomendada, Es_nodo_final, Prioridad
+        FROM Reglas_Recomendacion
+        ORDER BY ID_Regla
+    ''')
+    return cursor.fetchall()
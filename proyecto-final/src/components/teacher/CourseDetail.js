@@ -12,7 +12,7 @@ function CourseDetail({ course, onBack, teacherId }) {
       <div><b>Fecha de creación:</b> {course.Fecha_creacion}</div>
       
       {/* Gestión de módulos */}
-      <ModuleManager courseId={course.ID_Curso} courseName={course.Nombre} />
+      <ModuleManager courseId={course.ID_Curso} courseName={course.Nombre} teacherId={teacherId} />
     </div>
   );
 }
@@ -5,7 +5,7 @@ import './ModuleManager.css';
 import QuestionForm from './QuestionForm';
 import QuestionList from './QuestionList';
 
-function ModuleManager({ courseId, courseName }) {
+function ModuleManager({ courseId, courseName, teacherId }) {
   const [modules, setModules] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -971,7 +971,7 @@ function ModuleManager({ courseId, courseName }) {
               await teacherApiService.createQuestion(activeEvaluationId, q);
               if (window.refreshQuestions) window.refreshQuestions();
             }} />
-            <QuestionList evaluationId={activeEvaluationId} onQuestionAdded={refreshFn => { window.refreshQuestions = refreshFn; }} />
+            <QuestionList teacherId={teacherId} evaluationId={activeEvaluationId} onQuestionAdded={refreshFn => { window.refreshQuestions = refreshFn; }} />
           </div>
         </div>
       )}
@@ -4,7 +4,7 @@ import QuestionForm from './QuestionForm';
 import QuestionList from './QuestionList';
 import './ModuleTree.css';
 
-function ModuleTree({ courseId }) {
+function ModuleTree({ courseId, teacherId }) {
   const [modules, setModules] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -142,6 +142,7 @@ function ModuleTree({ courseId }) {
                             <QuestionForm onSave={q => handleSaveQuestion(ev.ID_Evaluacion, q)} />
                           )}
                           <QuestionList 
+                            teacherId={teacherId}
                             evaluationId={ev.ID_Evaluacion} 
                             onQuestionAdded={(refreshFn) => {
                               window.refreshQuestions = refreshFn;
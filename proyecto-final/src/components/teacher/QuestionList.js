@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import teacherApiService from '../../services/teacherApi';
 
-function QuestionList({ evaluationId, onQuestionAdded }) {
+function QuestionList({ teacherId, evaluationId, onQuestionAdded }) {
   const [questions, setQuestions] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -10,7 +10,7 @@ function QuestionList({ evaluationId, onQuestionAdded }) {
     try {
       setLoading(true);
       setError(null);
-      const data = await teacherApiService.makeRequest(`/evaluaciones/${evaluationId}/preguntas`);
+      const data = await teacherApiService.getQuestions(teacherId, evaluationId);
       setQuestions(data);
     } catch (err) {
       setError('No se pudieron cargar las preguntas.');
@@ -21,7 +21,7 @@ function QuestionList({ evaluationId, onQuestionAdded }) {
 
   useEffect(() => {
     fetchQuestions();
-  }, [evaluationId]);
+  }, [teacherId, evaluationId]);
 
   // Si se pasa la función onQuestionAdded, la llamamos cuando se agrega una pregunta
   useEffect(() => {
@@ -20,6 +20,11 @@ class TeacherApiService {
   }
 
 
+  // Obtener las preguntas de una evaluación con sus respuestas correctas (vista de edición)
+  async getQuestions(teacherId, evaluationId) {
+    return this.makeRequest(`/profesor/${teacherId}/evaluaciones/${evaluationId}/preguntas`);
+  }
+
   // Eliminar una pregunta de una evaluación
   async deleteQuestion(questionId) {
     return this.makeRequest(`/preguntas/${questionId}`, {
@@ -106,6 +111,11 @@ class TeacherApiService {
     return this.makeRequest(`/profesor/${teacherId}/cursos/${courseId}/estudiantes`);
   }
 
+  // Obtener el progreso de todos los estudiantes de un curso (paginado)
+  async getCourseProgress(teacherId, courseId, page = 1, perPage = 50) {
+    return this.makeRequest(`/profesor/${teacherId}/cursos/${courseId}/progreso?pagina=${page}&por_pagina=${perPage}`);
+  }
+
   // Obtener progreso detallado de un estudiante
   async getStudentProgress(teacherId, studentId) {
     return this.makeRequest(`/profesor/${teacherId}/estudiantes/${studentId}/progreso`);
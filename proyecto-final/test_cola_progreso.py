@@ -0,0 +1,99 @@
+"""
+Pruebas unitarias de la cola de trabajos de progreso (progreso_curso.ColaProgreso)
+
+Se corren con pytest.
+"""
+
+import threading
+import time
+
+from progreso_curso import ColaProgreso
+
+
+def test_modo_sincrono_procesa_al_encolar():
+    """Con sincrono=True el trabajo corre en el mismo hilo antes de que encolar vuelva"""
+    hilos = []
+    cola = ColaProgreso(lambda estudiante, curso: hilos.append((estudiante, curso, threading.current_thread())),
+                        sincrono=True)
+    cola.encolar(3, None)
+    cola.encolar(None, 7)
+    assert hilos == [(3, None, threading.current_thread()), (None, 7, threading.current_thread())]
+    stats = cola.estadisticas()
+    assert stats['procesados'] == 2 and stats['pendientes'] == 0 and stats['hilos'] == 0
+
+
+def test_fusiona_pedidos_pendientes_y_repite_los_que_llegan_durante_el_proceso():
+    """Un par pendiente se fusiona; si se pide mientras se procesa, se procesa otra vez al terminar"""
+    procesados = []
+    empezo, seguir = threading.Event(), threading.Event()
+
+    def procesar(estudiante, curso):
+        procesados.append((estudiante, curso))
+        if len(procesados) == 1:
+            empezo.set()
+            seguir.wait(5)
+
+    cola = ColaProgreso(procesar, hilos=1)
+    cola.encolar(1, None)
+    assert empezo.wait(5)
+    # (1, None) está en proceso: este pedido queda pendiente y los repetidos se fusionan
+    cola.encolar(1, None)
+    cola.encolar(1, None)
+    cola.encolar(None, 9)
+    cola.encolar(None, 9)
+    seguir.set()
+    assert cola.esperar(5)
+    assert sorted(procesados, key=str) == sorted([(1, None), (1, None), (None, 9)], key=str)
+    stats = cola.estadisticas()
+    assert stats['encolados'] == 5 and stats['fusionados'] == 2 and stats['procesados'] == 3
+
+
+def test_un_error_no_detiene_la_cola():
+    """Un trabajo que falla se cuenta como error y los siguientes se procesan"""
+    procesados = []
+
+    def procesar(estudiante, curso):
+        if estudiante == 'falla':
+            raise RuntimeError('sin conexión')
+        procesados.append(estudiante)
+
+    cola = ColaProgreso(procesar, hilos=2)
+    cola.encolar('falla', None)
+    for estudiante in range(5):
+        cola.encolar(estudiante, None)
+    assert cola.esperar(5)
+    assert sorted(procesados) == list(range(5))
+    stats = cola.estadisticas()
+    assert stats['errores'] == 1 and stats['procesados'] == 5 and stats['hilos'] == 2
+
+
+def test_esperar_respeta_el_timeout():
+    """esperar devuelve False si el trabajo no terminó dentro del plazo"""
+    seguir = threading.Event()
+    cola = ColaProgreso(lambda estudiante, curso: seguir.wait(5), hilos=1)
+    cola.encolar(1, 2)
+    assert cola.esperar(0.05) is False
+    seguir.set()
+    assert cola.esperar(5) is True
+
+
+def test_no_procesa_el_mismo_par_en_dos_hilos_a_la_vez():
+    """Con varios hilos, un mismo par nunca se procesa en paralelo consigo mismo"""
+    en_proceso, solapados = set(), []
+    candado = threading.Lock()
+
+    def procesar(estudiante, curso):
+        with candado:
+            if (estudiante, curso) in en_proceso:
+                solapados.append((estudiante, curso))
+            en_proceso.add((estudiante, curso))
+        time.sleep(0.001)
+        with candado:
+            en_proceso.discard((estudiante, curso))
+
+    cola = ColaProgreso(procesar, hilos=4)
+    for _ in range(50):
+        for estudiante in range(3):
+            cola.encolar(estudiante, None)
+    assert cola.esperar(10)
+    assert not solapados
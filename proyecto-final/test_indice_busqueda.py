@@ -0,0 +1,63 @@
+"""
+Pruebas unitarias del índice de búsqueda del contenido (models.IndiceBusqueda)
+
+Se corren con pytest.
+"""
+
+
+from models import IndiceBusqueda
+
+
+def crear_indice():
+    indice = IndiceBusqueda()
+    indice.agregar(('curso', 1), 'Introducción a Python', 'Curso básico de programación')
+    indice.agregar(('modulo', 2), 'Estructuras de datos', 'Listas y diccionarios en Python')
+    indice.agregar(('leccion', 3), 'Programación orientada a objetos')
+    return indice
+
+
+def test_ignora_acentos_y_mayusculas():
+    """Los términos se comparan sin acentos y en minúsculas"""
+    indice = crear_indice()
+    assert set(indice.buscar('INTRODUCCION')) == {('curso', 1)}
+    assert set(indice.buscar('programación')) == {('curso', 1), ('leccion', 3)}
+
+
+def test_busca_por_prefijo_y_premia_la_coincidencia_exacta():
+    """Cada término coincide como prefijo y la coincidencia exacta vale el doble"""
+    indice = crear_indice()
+    assert indice.buscar('pyth') == {('curso', 1): IndiceBusqueda.PESO_NOMBRE,
+                                     ('modulo', 2): IndiceBusqueda.PESO_DESCRIPCION}
+    assert indice.buscar('python')[('curso', 1)] == 2 * IndiceBusqueda.PESO_NOMBRE
+
+
+def test_el_nombre_pesa_mas_que_la_descripcion():
+    """Un término del nombre suma más que el mismo término en la descripción"""
+    indice = crear_indice()
+    puntajes = indice.buscar('python')
+    assert puntajes[('curso', 1)] > puntajes[('modulo', 2)]
+
+
+def test_todos_los_terminos_deben_coincidir():
+    """Con varios términos solo quedan los documentos que los contienen todos, con los puntajes sumados"""
+    indice = crear_indice()
+    puntajes = indice.buscar('python listas')
+    assert set(puntajes) == {('modulo', 2)}
+    assert puntajes[('modulo', 2)] == 2 * IndiceBusqueda.PESO_DESCRIPCION * 2
+    assert indice.buscar('python inexistente') == {}
+    assert indice.buscar('') == {}
+
+
+def test_quitar_y_reindexar_actualizan_el_vocabulario():
+    """Quitar un documento borra sus términos huérfanos; reindexarlo reemplaza los anteriores"""
+    indice = crear_indice()
+    indice.quitar(('leccion', 3))
+    assert indice.buscar('objetos') == {}
+    assert 'objetos' not in indice.vocabulario
+    assert 'programacion' in indice.vocabulario
+
+    indice.agregar(('curso', 1), 'Fundamentos de Java')
+    assert indice.buscar('python') == {('modulo', 2): 2 * IndiceBusqueda.PESO_DESCRIPCION}
+    assert set(indice.buscar('java')) == {('curso', 1)}
+    assert indice.vocabulario == sorted(indice.vocabulario)
+    assert set(indice.vocabulario) == set(indice.postings)
@@ -0,0 +1,169 @@
+"""
+Pruebas unitarias del pool de conexiones (db_connect.PoolConexiones)
+
+No necesitan MySQL: mysql.connector.connect se reemplaza por una conexión
+falsa mientras corre cada prueba. Se corren con pytest.
+"""
+
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error
+
+from db_connect import PoolConexiones
+
+
+class ConexionFalsa:
+    """Lo mínimo de una conexión de mysql.connector que usa el pool"""
+
+    def __init__(self, **parametros):
+        self.parametros = parametros
+        self.in_transaction = False
+        self.cerrada = False
+        self.ping_falla = False
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False):
+        if self.ping_falla:
+            raise Error(msg='Conexión perdida')
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.cerrada = True
+
+
+def crear_pool(**opciones):
+    """Pool con conexiones falsas; db_connect usa mysql.connector.connect al crear cada una"""
+    opciones.setdefault('timeout', 0.05)
+    return PoolConexiones(**opciones)
+
+
+def con_conexiones_falsas(prueba):
+    """Ejecuta la prueba con mysql.connector.connect reemplazado por ConexionFalsa"""
+    def ejecutar():
+        original = mysql.connector.connect
+        mysql.connector.connect = ConexionFalsa
+        try:
+            prueba()
+        finally:
+            mysql.connector.connect = original
+    ejecutar.__name__ = prueba.__name__
+    ejecutar.__doc__ = prueba.__doc__
+    return ejecutar
+
+
+@con_conexiones_falsas
+def test_reutiliza_conexiones_devueltas():
+    """Una conexión devuelta se presta otra vez sin crear una nueva"""
+    pool = crear_pool(tamano=2)
+    primera = pool.obtener()
+    real = primera._conexion
+    primera.close()
+    segunda = pool.obtener()
+    assert segunda._conexion is real
+    stats = pool.estadisticas()
+    assert stats['creadas'] == 1 and stats['reutilizadas'] == 1
+    assert stats['en_uso'] == 1 and stats['abiertas'] == 1
+
+
+@con_conexiones_falsas
+def test_close_repetido_no_descuadra_el_pool():
+    """Cerrar dos veces la misma conexión la devuelve una sola vez"""
+    pool = crear_pool(tamano=2)
+    conexion = pool.obtener()
+    conexion.close()
+    conexion.close()
+    stats = pool.estadisticas()
+    assert stats['en_uso'] == 0 and stats['libres'] == 1
+
+
+@con_conexiones_falsas
+def test_pool_agotado_espera_y_falla():
+    """Sin conexiones libres ni overflow, obtener espera `timeout` y lanza Error"""
+    pool = crear_pool(tamano=1, timeout=0.05)
+    pool.obtener()
+    inicio = time.monotonic()
+    try:
+        pool.obtener()
+        assert False, 'Se esperaba un Error por pool agotado'
+    except Error:
+        pass
+    assert time.monotonic() - inicio >= 0.05
+    stats = pool.estadisticas()
+    assert stats['timeouts'] == 1 and stats['esperas'] >= 1
+
+
+@con_conexiones_falsas
+def test_overflow_se_cierra_al_devolver():
+    """Las conexiones por encima de `tamano` se cierran al devolverlas"""
+    pool = crear_pool(tamano=1, max_overflow=1)
+    primera, segunda = pool.obtener(), pool.obtener()
+    primera.close()
+    segunda.close()
+    stats = pool.estadisticas()
+    assert stats['abiertas'] == 1 and stats['libres'] == 1
+    assert segunda._conexion.cerrada
+
+
+@con_conexiones_falsas
+def test_revierte_transaccion_pendiente_al_devolver():
+    """Una conexión devuelta con una transacción abierta se revierte antes de reutilizarla"""
+    pool = crear_pool(tamano=1)
+    conexion = pool.obtener()
+    conexion._conexion.in_transaction = True
+    conexion.close()
+    assert conexion._conexion.rollbacks == 1
+    assert not conexion._conexion.in_transaction
+
+
+@con_conexiones_falsas
+def test_recicla_conexiones_viejas_y_descarta_las_caidas():
+    """Las conexiones más viejas que `reciclaje` o que no responden al ping se reemplazan"""
+    pool = crear_pool(tamano=1, reciclaje=0.01)
+    vieja = pool.obtener()
+    vieja.close()
+    time.sleep(0.02)
+    nueva = pool.obtener()
+    assert nueva._conexion is not vieja._conexion and vieja._conexion.cerrada
+    nueva.close()
+
+    pool = crear_pool(tamano=1, reciclaje=0, ping_intervalo=0)
+    caida = pool.obtener()
+    caida._conexion.ping_falla = True
+    caida.close()
+    otra = pool.obtener()
+    assert otra._conexion is not caida._conexion
+    stats = pool.estadisticas()
+    assert stats['descartadas'] == 1 and stats['creadas'] == 2
+
+
+@con_conexiones_falsas
+def test_estadisticas_consistentes_con_varios_hilos():
+    """Con muchos hilos, cada préstamo cuenta exactamente una vez como creada o reutilizada"""
+    pool = crear_pool(tamano=3, timeout=5)
+    hilos, prestamos = 8, 200
+    errores = []
+
+    def pedir():
+        try:
+            for _ in range(prestamos):
+                conexion = pool.obtener()
+                conexion.close()
+        except Exception as e:
+            errores.append(e)
+
+    trabajadores = [threading.Thread(target=pedir) for _ in range(hilos)]
+    for hilo in trabajadores:
+        hilo.start()
+    for hilo in trabajadores:
+        hilo.join()
+
+    assert not errores, errores
+    stats = pool.estadisticas()
+    assert stats['creadas'] + stats['reutilizadas'] == hilos * prestamos, stats
+    assert stats['en_uso'] == 0 and stats['max_en_uso'] <= 3
+    assert stats['abiertas'] == stats['libres'] <= 3
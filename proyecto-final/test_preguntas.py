@@ -8,6 +8,8 @@ import json
 
 # Configuración
 BASE_URL = "http://localhost:5000/api"
+# Profesor dueño del curso de la evaluación de prueba
+PROFESOR_ID = 1
 
 def test_crear_pregunta():
     """Prueba crear una pregunta con opciones"""
@@ -44,12 +46,12 @@ def test_crear_pregunta():
         print(f"❌ Error de conexión: {e}")
         return None
 
-def test_obtener_preguntas(evaluacion_id):
-    """Prueba obtener preguntas de una evaluación"""
+def test_obtener_preguntas(evaluacion_id, profesor_id=PROFESOR_ID):
+    """Prueba obtener preguntas de una evaluación (vista de edición del profesor)"""
     print(f"🧪 Probando obtener preguntas de evaluación {evaluacion_id}...")
     
     try:
-        response = requests.get(f"{BASE_URL}/evaluaciones/{evaluacion_id}/preguntas")
+        response = requests.get(f"{BASE_URL}/profesor/{profesor_id}/evaluaciones/{evaluacion_id}/preguntas")
         
         if response.status_code == 200:
             preguntas = response.json()
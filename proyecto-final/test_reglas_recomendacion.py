@@ -0,0 +1,143 @@
+"""
+Pruebas unitarias de las reglas de recomendación (models.CondicionRegla y ArbolDecision)
+
+Comprueban que evaluar_lote dé lo mismo que evaluar_estudiante uno por uno,
+con NumPy (si está instalado) y con listas. Se corren con pytest.
+"""
+
+import random
+
+import models
+from models import ArbolDecision, CondicionRegla, GestorContenido
+
+# Características que usa el árbol predefinido de GestorContenido
+CARACTERISTICAS = ['promedio_puntajes', 'promedio_progreso', 'recursos_revisados', 'total_recursos',
+                   'intentos_evaluacion', 'dias_desde_ultimo_acceso', 'lecciones_obligatorias_completadas',
+                   'total_lecciones_obligatorias', 'evaluaciones_aprobadas', 'total_evaluaciones']
+
+
+def evaluar(texto, **datos):
+    return CondicionRegla(texto).evaluar(datos.get)
+
+
+def test_condicion_aritmetica_y_division_segura():
+    """La división usa max(divisor, 1) y una característica ausente vale 0"""
+    assert evaluar('a / b < 1', a=0, b=0)
+    assert not evaluar('a / b < 1', a=5, b=0)
+    assert evaluar('a / b < 1', a=5, b=10)
+    assert evaluar('x == 0')
+    assert evaluar('x == 0', x=None)
+    assert evaluar('a * 2 - b + 1 > -1', a=1, b=3)
+
+
+def test_condicion_comparaciones_encadenadas_y_logicas():
+    """Se admiten comparaciones encadenadas, and, or, not y paréntesis"""
+    assert evaluar('1 < x <= 3', x=3)
+    assert not evaluar('1 < x <= 3', x=4)
+    assert evaluar('a > 1 and (b < 2 or not c)', a=2, b=5, c=0)
+    assert not evaluar('a > 1 and (b < 2 or not c)', a=2, b=5, c=1)
+
+
+def test_condicion_rechaza_lo_que_no_es_una_regla():
+    """Llamadas, atributos, cadenas, potencias y errores de sintaxis se rechazan con ValueError"""
+    for texto in ('__import__("os").system("ls")', 'a.b > 1', '"texto" == a', 'a ** 2 > 1', 'a <', ''):
+        try:
+            CondicionRegla(texto)
+            assert False, f'Se aceptó la condición {texto!r}'
+        except ValueError:
+            pass
+
+
+def test_condicion_registra_sus_caracteristicas():
+    """La condición conoce las características que usa"""
+    condicion = CondicionRegla('recursos_revisados / total_recursos < 1 or dias > 7')
+    assert condicion.caracteristicas == {'recursos_revisados', 'total_recursos', 'dias'}
+
+
+def test_condicion_vectorial_igual_a_la_individual():
+    """Con NumPy, evaluar_vector da lo mismo que evaluar fila por fila"""
+    if models.np is None:
+        return  # Sin NumPy no hay evaluador vectorial
+    condicion = CondicionRegla('a / b < 0.5 and not (c > 2 or a == b)')
+    azar = random.Random(3)
+    filas = [{nombre: azar.randint(0, 4) for nombre in 'abc'} for _ in range(200)]
+    columnas = {nombre: models.np.array([fila[nombre] for fila in filas], dtype=float) for nombre in 'abc'}
+    assert list(condicion.evaluar_vector(columnas)) == [bool(condicion.evaluar(fila.get)) for fila in filas]
+
+
+def estudiantes_aleatorios(cantidad, semilla=7):
+    """Filas con valores enteros, algunos nulos; la última característica falta en todas"""
+    azar = random.Random(semilla)
+    filas = []
+    for _ in range(cantidad):
+        fila = {}
+        for nombre in CARACTERISTICAS[:-1]:
+            fila[nombre] = None if azar.random() < 0.1 else azar.randint(0, 100 if 'promedio' in nombre else 12)
+        filas.append(fila)
+    return filas
+
+
+def evaluar_lote_ambos(arbol, filas):
+    """Resultados de evaluar_lote con el camino disponible y, si hay NumPy, también con listas"""
+    columnas = {nombre: [fila[nombre] for fila in filas] for nombre in CARACTERISTICAS[:-1]}
+    resultados = [arbol.evaluar_lote(columnas, len(filas))]
+    if models.np is not None:
+        original, models.np = models.np, None
+        try:
+            resultados.append(arbol.evaluar_lote(columnas, len(filas)))
+        finally:
+            models.np = original
+    return resultados
+
+
+def test_lote_igual_a_individual_con_el_arbol_predefinido():
+    """evaluar_lote da para cada estudiante lo mismo que evaluar_estudiante"""
+    arbol = GestorContenido().arbol_decision
+    filas = estudiantes_aleatorios(500)
+    esperados = [arbol.evaluar_estudiante(fila) for fila in filas]
+    assert len({esperado['regla_id'] for esperado in esperados}) > 3, 'Los datos deben recorrer varias ramas'
+    for resultados in evaluar_lote_ambos(arbol, filas):
+        assert resultados == esperados
+
+
+def reglas_de_prueba():
+    """Filas de Reglas_Recomendacion: raíz compuesta, una rama intermedia y tres hojas"""
+    def regla(id, condicion, accion, padre, verdadero=None, falso=None, prioridad='media'):
+        return {'ID_Regla': id, 'Condicion': condicion, 'Accion_recomendada': accion, 'Prioridad': prioridad,
+                'Nodo_padre_id': padre, 'Nodo_verdadero_id': verdadero, 'Nodo_falso_id': falso,
+                'Es_nodo_final': verdadero is None and falso is None}
+    return [
+        regla(1, 'promedio_puntajes < 60 and intentos_evaluacion >= 2', '', None, 2, 3, 'alta'),
+        regla(2, None, 'Tutoría', 1),
+        regla(3, 'evaluaciones_aprobadas / total_evaluaciones < 0.5', '', 1, 4, 5),
+        regla(4, None, 'Repasar', 3),
+        regla(5, None, 'Continuar', 3, prioridad='baja'),
+    ]
+
+
+def test_lote_igual_a_individual_con_reglas_de_la_base():
+    """Un árbol armado con desde_reglas evalúa igual en lote que de a uno"""
+    arbol = ArbolDecision.desde_reglas(reglas_de_prueba(), 'prueba')
+    filas = estudiantes_aleatorios(300, semilla=11)
+    esperados = [arbol.evaluar_estudiante(fila) for fila in filas]
+    assert {esperado['recomendacion'] for esperado in esperados} == {'Tutoría', 'Repasar', 'Continuar'}
+    for resultados in evaluar_lote_ambos(arbol, filas):
+        assert resultados == esperados
+
+
+def test_arbol_vacio_y_reglas_invalidas():
+    """Sin raíz se devuelve el resultado vacío; reglas rotas lanzan ValueError"""
+    arbol = ArbolDecision()
+    assert arbol.evaluar_estudiante({}) == ArbolDecision.RESULTADO_VACIO
+    assert arbol.evaluar_lote({}, 2) == [ArbolDecision.RESULTADO_VACIO] * 2
+
+    sin_hijo = reglas_de_prueba()
+    sin_hijo[0]['Nodo_falso_id'] = 99
+    condicion_rota = reglas_de_prueba()
+    condicion_rota[2]['Condicion'] = 'open("x")'
+    for reglas in (sin_hijo, condicion_rota, []):
+        try:
+            ArbolDecision.desde_reglas(reglas, 'rota')
+            assert False, 'Se aceptaron reglas inválidas'
+        except ValueError:
+            pass
@@ -0,0 +1,110 @@
+"""
+Pruebas unitarias del snapshot de la estructura de contenido (GestorContenido.guardar_snapshot / cargar_snapshot)
+
+Se corren con pytest; usan un directorio temporal.
+"""
+
+import os
+import tempfile
+import time
+
+import models
+from models import Curso, GestorContenido, Leccion, Modulo, Recurso
+
+WATERMARK = {'modificado_desde': '2026-01-01 00:00:00'}
+
+
+def crear_gestor():
+    """Un curso con dos módulos, lecciones con evaluaciones y recursos"""
+    gestor = GestorContenido()
+    curso = Curso(1, 'Introducción a Python', 'Curso básico', 40, id_profesor=7)
+    for modulo_id, nombre in ((10, 'Fundamentos'), (11, 'Estructuras de datos')):
+        modulo = Modulo(modulo_id, nombre, f'Módulo {nombre}', 10, curso.id)
+        modulo.orden = modulo_id - 9
+        curso.agregar_modulo(modulo)
+        for orden in (1, 2):
+            leccion_id = modulo_id * 10 + orden
+            leccion = Leccion(leccion_id, f'Lección {leccion_id}', 'Descripción', 'Contenido', 30, modulo_id,
+                              es_obligatoria=orden == 1)
+            leccion.orden = orden
+            leccion.evaluaciones = [{'id': leccion_id, 'nombre': f'Quiz {leccion_id}', 'descripcion': None,
+                                     'puntaje_aprobacion': 60.0, 'max_intentos': 3}]
+            leccion.agregar_recurso(Recurso(leccion_id * 10, f'Video {leccion_id}', 'video',
+                                            f'https://ejemplo.com/{leccion_id}', 1, 300))
+            modulo.agregar_leccion(leccion)
+    gestor.agregar_curso(curso)
+    return gestor
+
+
+def test_ida_y_vuelta_conserva_la_estructura():
+    """Un snapshot cargado reconstruye el árbol, los índices y la búsqueda"""
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'estructura.bin')
+        crear_gestor().guardar_snapshot(ruta, WATERMARK, creado=1000.0)
+
+        cargado = GestorContenido()
+        meta = cargado.cargar_snapshot(ruta)
+        assert meta == {'creado': 1000.0, 'watermark': WATERMARK}
+        assert set(cargado.modulos) == {10, 11}
+        assert set(cargado.lecciones) == {101, 102, 111, 112}
+        assert set(cargado.recursos) == {1010, 1020, 1110, 1120}
+
+        leccion = cargado.obtener_leccion(112)
+        assert leccion.padre is cargado.obtener_modulo(11)
+        assert leccion.padre.padre is cargado.obtener_curso(1)
+        assert not leccion.es_obligatoria and leccion.orden == 2
+        assert leccion.evaluaciones[0]['nombre'] == 'Quiz 112'
+        assert cargado.obtener_recurso(1120).url == 'https://ejemplo.com/112'
+        assert cargado.obtener_curso(1).id_profesor == 7
+        assert ('leccion', 112) in cargado.busqueda.buscar('leccion 112')
+
+        # Volver a guardar lo cargado produce exactamente el mismo archivo
+        copia = os.path.join(directorio, 'copia.bin')
+        cargado.guardar_snapshot(copia, meta['watermark'], creado=meta['creado'])
+        with open(ruta, 'rb') as original, open(copia, 'rb') as nuevo:
+            assert original.read() == nuevo.read()
+
+
+def test_conserva_la_fecha_de_creacion_y_respeta_max_edad():
+    """Al reescribir un snapshot con `creado` se conserva su edad; uno más viejo que max_edad no se carga"""
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'estructura.bin')
+        gestor = crear_gestor()
+        gestor.guardar_snapshot(ruta, WATERMARK)
+        creado = gestor.cargar_snapshot(ruta)['creado']
+        assert time.time() - creado < 60
+
+        viejo = time.time() - 3600
+        gestor.guardar_snapshot(ruta, {'modificado_desde': '2026-02-01 00:00:00'}, creado=viejo)
+        meta = GestorContenido().cargar_snapshot(ruta, max_edad=7200)
+        assert meta['creado'] == viejo and meta['watermark']['modificado_desde'] == '2026-02-01 00:00:00'
+
+        otro = crear_gestor()
+        assert otro.cargar_snapshot(ruta, max_edad=60) is None
+        assert set(otro.lecciones) == {101, 102, 111, 112}
+
+
+def test_archivos_invalidos_no_reemplazan_el_contenido():
+    """Un archivo ausente, truncado, corrupto o de otra versión se ignora sin tocar los cursos cargados"""
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'estructura.bin')
+        crear_gestor().guardar_snapshot(ruta, WATERMARK)
+        with open(ruta, 'rb') as archivo:
+            contenido = archivo.read()
+
+        cabecera = models.SNAPSHOT_CABECERA
+        magia, version, longitud, crc = cabecera.unpack_from(contenido)
+        variantes = {
+            'truncado': contenido[:len(contenido) // 2],
+            'corrupto': contenido[:-1] + bytes([contenido[-1] ^ 0xFF]),
+            'otra version': cabecera.pack(magia, version + 1, longitud, crc) + contenido[cabecera.size:],
+            'vacio': b'',
+        }
+        gestor = GestorContenido()
+        gestor.agregar_curso(Curso(2, 'Curso vigente'))
+        assert gestor.cargar_snapshot(os.path.join(directorio, 'no_existe.bin')) is None
+        for nombre, datos in variantes.items():
+            with open(ruta, 'wb') as archivo:
+                archivo.write(datos)
+            assert gestor.cargar_snapshot(ruta) is None, nombre
+            assert set(gestor.cursos) == {2}, nombre